@@ -0,0 +1,28 @@
+"""Add chunk checkpoint columns to accrual_jobs
+
+Revision ID: accrual_ckpt_001
+Revises: add_farmer_id_001, smart_calc_001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'accrual_ckpt_001'
+down_revision = ('add_farmer_id_001', 'smart_calc_001')
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('accrual_jobs', sa.Column('chunk_size', sa.Integer(), nullable=True))
+    op.add_column('accrual_jobs', sa.Column('chunks_completed', sa.Integer(), nullable=True, server_default='0'))
+    op.add_column('accrual_jobs', sa.Column('last_loan_id', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('accrual_jobs', 'last_loan_id')
+    op.drop_column('accrual_jobs', 'chunks_completed')
+    op.drop_column('accrual_jobs', 'chunk_size')
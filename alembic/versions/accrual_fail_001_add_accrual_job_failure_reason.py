@@ -0,0 +1,24 @@
+"""Add failure_reason to accrual_jobs
+
+Revision ID: accrual_fail_001
+Revises: partition_001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'accrual_fail_001'
+down_revision = 'partition_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('accrual_jobs', sa.Column('failure_reason', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('accrual_jobs', 'failure_reason')
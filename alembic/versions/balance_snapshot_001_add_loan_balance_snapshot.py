@@ -0,0 +1,66 @@
+"""Add loan_balance_snapshot with the current running balance per loan
+
+Revision ID: balance_snapshot_001
+Revises: hot_path_idx_001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'balance_snapshot_001'
+down_revision = 'hot_path_idx_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'loan_balance_snapshot',
+        sa.Column('loan_id', sa.Integer(), nullable=False),
+        sa.Column('balance', sa.Numeric(15, 2), nullable=False),
+        sa.Column('last_transaction_date', sa.Date(), nullable=False),
+        sa.Column('last_accrual_date', sa.Date(), nullable=True),
+        sa.Column('last_payment_id', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['loan_id'], ['loans.id']),
+        sa.PrimaryKeyConstraint('loan_id'),
+    )
+
+    # Seed from each loan's latest ledger entry
+    op.execute(
+        """
+        INSERT INTO loan_balance_snapshot (
+            loan_id, balance, last_transaction_date,
+            last_accrual_date, last_payment_id, updated_at
+        )
+        SELECT
+            latest.loan_id,
+            latest.balance,
+            latest.transaction_date,
+            (
+                SELECT max(l.transaction_date) FROM loan_ledgers l
+                WHERE l.loan_id = latest.loan_id
+                  AND l.transaction_type = 'DAILY_ACCRUAL'
+            ),
+            (
+                SELECT l.reference_id FROM loan_ledgers l
+                WHERE l.loan_id = latest.loan_id
+                  AND l.transaction_type = 'PAYMENT'
+                ORDER BY l.transaction_date DESC, l.id DESC
+                LIMIT 1
+            ),
+            now()
+        FROM (
+            SELECT DISTINCT ON (loan_id) loan_id, balance, transaction_date
+            FROM loan_ledgers
+            ORDER BY loan_id, transaction_date DESC, id DESC
+        ) AS latest
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('loan_balance_snapshot')
@@ -0,0 +1,75 @@
+"""Add composite, partial and covering indexes for EMI, ledger and payment hot paths
+
+Revision ID: hot_path_idx_001
+Revises: token_version_001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'hot_path_idx_001'
+down_revision = 'token_version_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction; these tables are large
+    # and written continuously, so avoid holding a write lock while building
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_emi_schedules_loan_due_date',
+            'emi_schedules',
+            ['loan_id', 'due_date'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_emi_schedules_unpaid_id',
+            'emi_schedules',
+            ['id'],
+            postgresql_include=['due_date', 'loan_id'],
+            postgresql_where=sa.text('is_paid = false'),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_emi_schedules_overdue_loan',
+            'emi_schedules',
+            ['loan_id', 'due_date'],
+            postgresql_include=[
+                'emi_amount',
+                'paid_amount',
+                'penal_interest',
+                'overdue_days',
+            ],
+            postgresql_where=sa.text('is_overdue = true AND is_paid = false'),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_loan_ledgers_loan_date_id',
+            'loan_ledgers',
+            ['loan_id', 'transaction_date', 'id'],
+            postgresql_include=['transaction_type', 'debit_amount', 'balance'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_payments_loan_date',
+            'payments',
+            ['loan_id', 'payment_date', 'id'],
+            postgresql_include=['amount', 'status'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table in (
+            ('ix_payments_loan_date', 'payments'),
+            ('ix_loan_ledgers_loan_date_id', 'loan_ledgers'),
+            ('ix_emi_schedules_overdue_loan', 'emi_schedules'),
+            ('ix_emi_schedules_unpaid_id', 'emi_schedules'),
+            ('ix_emi_schedules_loan_due_date', 'emi_schedules'),
+        ):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
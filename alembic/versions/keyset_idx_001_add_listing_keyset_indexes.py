@@ -0,0 +1,35 @@
+"""Add (created_at, id) indexes for keyset pagination of listings
+
+Revision ID: keyset_idx_001
+Revises: report_jobs_001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'keyset_idx_001'
+down_revision = 'report_jobs_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_loans_created_at_id', 'loans', ['created_at', 'id'])
+    op.create_index(
+        'ix_loans_branch_created_at_id', 'loans', ['branch_id', 'created_at', 'id']
+    )
+    op.create_index(
+        'ix_loans_farmer_created_at_id', 'loans', ['farmer_id', 'created_at', 'id']
+    )
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'])
+    op.create_index('ix_audit_logs_created_at_id', 'audit_logs', ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_audit_logs_created_at_id', table_name='audit_logs')
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.drop_index('ix_loans_farmer_created_at_id', table_name='loans')
+    op.drop_index('ix_loans_branch_created_at_id', table_name='loans')
+    op.drop_index('ix_loans_created_at_id', table_name='loans')
@@ -0,0 +1,190 @@
+"""Range-partition loan_ledgers and audit_logs by month
+
+Revision ID: partition_001
+Revises: balance_snapshot_001
+Create Date: 2026-10-16
+
+Each table is rebuilt as a partitioned table with one partition per month
+from its oldest row to PARTITION_MONTHS_AHEAD (3) months ahead, plus a
+DEFAULT partition, and its rows are copied across. The copy runs in the
+migration transaction and locks both tables, so run it in a maintenance
+window. Later months are created by the app.tasks.partitions task.
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'partition_001'
+down_revision = 'balance_snapshot_001'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+
+def _ledger_columns():
+    return [
+        sa.Column(
+            'id',
+            sa.Integer(),
+            server_default=sa.text("nextval('loan_ledgers_id_seq'::regclass)"),
+            nullable=False,
+        ),
+        sa.Column('loan_id', sa.Integer(), nullable=False),
+        sa.Column('transaction_date', sa.Date(), nullable=False),
+        sa.Column('transaction_type', sa.String(length=50), nullable=False),
+        sa.Column('debit_amount', sa.Numeric(15, 2), nullable=True),
+        sa.Column('credit_amount', sa.Numeric(15, 2), nullable=True),
+        sa.Column('balance', sa.Numeric(15, 2), nullable=False),
+        sa.Column('reference_type', sa.String(length=50), nullable=True),
+        sa.Column('reference_id', sa.Integer(), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('narration', sa.Text(), nullable=True),
+        sa.Column('interest_rate_applied', sa.Numeric(5, 2), nullable=True),
+        sa.Column('days_calculated', sa.Integer(), nullable=True),
+        sa.Column('created_by', sa.String(length=100), nullable=True),
+        sa.Column(
+            'created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True
+        ),
+        sa.ForeignKeyConstraint(['loan_id'], ['loans.id']),
+    ]
+
+
+def _audit_columns():
+    return [
+        sa.Column(
+            'id',
+            sa.Integer(),
+            server_default=sa.text("nextval('audit_logs_id_seq'::regclass)"),
+            nullable=False,
+        ),
+        sa.Column('actor_type', sa.String(length=20), nullable=False),
+        sa.Column('actor_id', sa.Integer(), nullable=True),
+        sa.Column('actor_name', sa.String(length=100), nullable=True),
+        sa.Column('action', sa.String(length=100), nullable=False),
+        sa.Column('entity_type', sa.String(length=50), nullable=True),
+        sa.Column('entity_id', sa.Integer(), nullable=True),
+        sa.Column('old_value', sa.Text(), nullable=True),
+        sa.Column('new_value', sa.Text(), nullable=True),
+        sa.Column('rule_applied', sa.String(length=100), nullable=True),
+        sa.Column('ip_address', sa.String(length=45), nullable=True),
+        sa.Column('user_agent', sa.String(length=255), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('extra_data', sa.Text(), nullable=True),
+        sa.Column(
+            'created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False
+        ),
+    ]
+
+
+# table -> (partition key, columns, indexes as (name, columns, include))
+TABLES = {
+    'loan_ledgers': (
+        'transaction_date',
+        _ledger_columns,
+        [
+            ('ix_loan_ledgers_id', ['id'], None),
+            ('ix_loan_ledgers_loan_id', ['loan_id'], None),
+            ('ix_loan_ledgers_transaction_date', ['transaction_date'], None),
+            (
+                'ix_loan_ledgers_loan_date_id',
+                ['loan_id', 'transaction_date', 'id'],
+                ['transaction_type', 'debit_amount', 'balance'],
+            ),
+        ],
+    ),
+    'audit_logs': (
+        'created_at',
+        _audit_columns,
+        [
+            ('ix_audit_logs_id', ['id'], None),
+            ('ix_audit_logs_created_at', ['created_at'], None),
+            ('ix_audit_logs_created_at_id', ['created_at', 'id'], None),
+        ],
+    ),
+}
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _rebuild(table, columns, indexes, create_table):
+    """Swap table for create_table(table), copying its rows and id sequence"""
+    old = f'{table}_old'
+    op.rename_table(table, old)
+    op.execute(f'ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey')
+    for name, _, _ in indexes:
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+
+    create_table(old)
+
+    names = ', '.join(
+        column.name for column in columns() if isinstance(column, sa.Column)
+    )
+    op.execute(f'INSERT INTO {table} ({names}) SELECT {names} FROM {old}')
+
+    for name, index_columns, include in indexes:
+        op.create_index(name, table, index_columns, postgresql_include=include or [])
+
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+    op.drop_table(old)
+
+
+def _audit_column_names(bind):
+    return {column['name'] for column in sa.inspect(bind).get_columns('audit_logs')}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    current = date.today().replace(day=1)
+
+    # smart_calc_001 named the audit payload column metadata, which the
+    # model maps as extra_data; databases built by create_all have extra_data
+    if 'metadata' in _audit_column_names(bind):
+        op.alter_column('audit_logs', 'metadata', new_column_name='extra_data')
+
+    for table, (column, columns, indexes) in TABLES.items():
+
+        def create_partitioned(old, table=table, column=column, columns=columns):
+            op.create_table(
+                table,
+                *columns(),
+                sa.PrimaryKeyConstraint('id', column),
+                postgresql_partition_by=f'RANGE ({column})',
+            )
+
+            # The partition key is part of the primary key; audit rows
+            # without a timestamp go to the current month
+            op.execute(f'UPDATE {old} SET {column} = now() WHERE {column} IS NULL')
+            oldest = bind.execute(sa.text(f'SELECT min({column}) FROM {old}')).scalar()
+            month = date(oldest.year, oldest.month, 1) if oldest else current
+            while month <= _add_months(current, MONTHS_AHEAD):
+                end = _add_months(month, 1)
+                op.execute(
+                    f'CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {table} '
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+                )
+                month = end
+            op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+        _rebuild(table, columns, indexes, create_partitioned)
+
+
+def downgrade() -> None:
+    # Partitions detached or archived since the upgrade are not restored
+    for table, (column, columns, indexes) in TABLES.items():
+
+        def create_plain(old, table=table, column=column, columns=columns):
+            op.create_table(table, *columns(), sa.PrimaryKeyConstraint('id'))
+            if table == 'audit_logs':
+                op.alter_column(table, column, nullable=True)
+
+        _rebuild(table, columns, indexes, create_plain)
+
+    op.alter_column('audit_logs', 'extra_data', new_column_name='metadata')
@@ -0,0 +1,54 @@
+"""Add portfolio_daily_summary table
+
+Revision ID: portfolio_summary_001
+Revises: accrual_ckpt_001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'portfolio_summary_001'
+down_revision = 'accrual_ckpt_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'portfolio_daily_summary',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('summary_date', sa.Date(), nullable=False),
+        sa.Column('branch_id', sa.Integer(), nullable=True),
+        sa.Column('total_loans', sa.Integer(), default=0),
+        sa.Column('pending_approvals', sa.Integer(), default=0),
+        sa.Column('active_loans', sa.Integer(), default=0),
+        sa.Column('overdue_loans', sa.Integer(), default=0),
+        sa.Column('recent_loans_30_days', sa.Integer(), default=0),
+        sa.Column('total_outstanding', sa.Numeric(18, 2), default=0),
+        sa.Column('disbursed_this_month_count', sa.Integer(), default=0),
+        sa.Column('disbursed_this_month_amount', sa.Numeric(18, 2), default=0),
+        sa.Column('total_farmers', sa.Integer(), default=0),
+        sa.Column('total_users', sa.Integer(), default=0),
+        sa.Column('total_branches', sa.Integer(), default=0),
+        sa.Column('status_breakdown', sa.Text()),
+        sa.Column('loans_by_type', sa.Text()),
+        sa.Column('is_stale', sa.Boolean(), server_default=sa.false()),
+        sa.Column('refreshed_at', sa.DateTime(), server_default=sa.text('now()')),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['branch_id'], ['branches.id']),
+    )
+    op.create_index('ix_portfolio_daily_summary_id', 'portfolio_daily_summary', ['id'])
+    op.create_index(
+        'ix_portfolio_daily_summary_date_branch',
+        'portfolio_daily_summary',
+        ['summary_date', 'branch_id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_portfolio_daily_summary_date_branch', table_name='portfolio_daily_summary')
+    op.drop_index('ix_portfolio_daily_summary_id', table_name='portfolio_daily_summary')
+    op.drop_table('portfolio_daily_summary')
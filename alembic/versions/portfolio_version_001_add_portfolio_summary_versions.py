@@ -0,0 +1,42 @@
+"""Track portfolio summary freshness with per-branch write versions
+
+Revision ID: portfolio_version_001
+Revises: accrual_fail_001
+Create Date: 2026-10-16
+
+Replaces portfolio_daily_summary.is_stale, which every write updated on
+the shared portfolio row inside its own transaction.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'portfolio_version_001'
+down_revision = 'accrual_fail_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'portfolio_summary_versions',
+        sa.Column('branch_key', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('branch_key'),
+    )
+    op.add_column(
+        'portfolio_daily_summary',
+        sa.Column('source_version', sa.BigInteger(), server_default='0', nullable=True),
+    )
+    op.drop_column('portfolio_daily_summary', 'is_stale')
+
+
+def downgrade() -> None:
+    op.add_column(
+        'portfolio_daily_summary',
+        sa.Column('is_stale', sa.Boolean(), server_default=sa.false(), nullable=True),
+    )
+    op.drop_column('portfolio_daily_summary', 'source_version')
+    op.drop_table('portfolio_summary_versions')
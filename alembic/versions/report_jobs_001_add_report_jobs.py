@@ -0,0 +1,55 @@
+"""Add report_jobs table
+
+Revision ID: report_jobs_001
+Revises: portfolio_summary_001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'report_jobs_001'
+down_revision = 'portfolio_summary_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'report_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('report_type', sa.String(50), nullable=False),
+        sa.Column('params_json', sa.Text()),
+        sa.Column('request_hash', sa.String(64), nullable=False),
+        sa.Column('requested_by', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(20), server_default='pending'),
+        sa.Column('progress', sa.Integer(), server_default='0'),
+        sa.Column('rows_total', sa.Integer()),
+        sa.Column('rows_written', sa.Integer(), server_default='0'),
+        sa.Column('error_message', sa.Text()),
+        sa.Column('file_path', sa.String(500)),
+        sa.Column('file_name', sa.String(255)),
+        sa.Column('file_size', sa.BigInteger()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
+        sa.Column('started_at', sa.DateTime()),
+        sa.Column('completed_at', sa.DateTime()),
+        sa.Column('expires_at', sa.DateTime()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['requested_by'], ['users.id']),
+    )
+    op.create_index('ix_report_jobs_id', 'report_jobs', ['id'])
+    op.create_index(
+        'ix_report_jobs_request_hash_status',
+        'report_jobs',
+        ['request_hash', 'status'],
+    )
+    op.create_index('ix_report_jobs_expires_at', 'report_jobs', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_report_jobs_expires_at', table_name='report_jobs')
+    op.drop_index('ix_report_jobs_request_hash_status', table_name='report_jobs')
+    op.drop_index('ix_report_jobs_id', table_name='report_jobs')
+    op.drop_table('report_jobs')
@@ -12,6 +12,7 @@ from app.core.security import decode_access_token
 from app.db.session import get_db
 from app.models.user import User, UserRole
 from app.schemas.token import TokenData
+from app.services.user_principal_cache import UserPrincipal, UserPrincipalCache
 
 security = HTTPBearer()
 
@@ -19,9 +20,10 @@ security = HTTPBearer()
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db),
-) -> User:
+) -> UserPrincipal:
     """
-    Dependency to get current authenticated user from JWT token
+    Dependency to get current authenticated user from JWT token.
+    Served from the principal cache; the users table is read only on a miss.
     """
     token = credentials.credentials
 
@@ -35,9 +37,7 @@ async def get_current_user(
             detail="Invalid authentication credentials",
         )
 
-    # Get user from database
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await UserPrincipalCache.get(db, user_id)
 
     if user is None:
         raise HTTPException(
@@ -45,6 +45,14 @@ async def get_current_user(
             detail="User not found",
         )
 
+    # Tokens issued before the last password change are revoked
+    if payload.get("tv", 0) != user.token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -55,8 +63,8 @@ async def get_current_user(
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: UserPrincipal = Depends(get_current_user),
+) -> UserPrincipal:
     """Ensure user is active"""
     if not current_user.is_active:
         raise HTTPException(
@@ -65,13 +73,32 @@ async def get_current_active_user(
     return current_user
 
 
+async def get_current_user_record(
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """Full users row of the authenticated user, for profile reads and writes"""
+    result = await db.execute(select(User).where(User.id == current_user.id))
+    user = result.scalar_one_or_none()
+
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
+
+    return user
+
+
 class RoleChecker:
     """Dependency to check if user has required role"""
 
     def __init__(self, allowed_roles: list[UserRole]):
         self.allowed_roles = allowed_roles
 
-    def __call__(self, user: User = Depends(get_current_active_user)) -> User:
+    def __call__(
+        self, user: UserPrincipal = Depends(get_current_active_user)
+    ) -> UserPrincipal:
         if user.role not in self.allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
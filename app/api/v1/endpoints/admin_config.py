@@ -10,9 +10,10 @@ from typing import List, Optional
 from pydantic import BaseModel, Field
 
 from app.db.session import get_db
-from app.models.user import User
 from app.models.loan import LoanTypeConfig, LoanType, InterestCalculationType
+from app.services.loan_type_config_cache import LoanTypeConfigCache
 from app.api.deps import require_admin
+from app.services.user_principal_cache import UserPrincipal
 
 router = APIRouter()
 
@@ -59,7 +60,7 @@ class LoanTypeConfigResponse(BaseModel):
 
 @router.get("/loan-types", response_model=List[LoanTypeConfigResponse])
 async def get_all_loan_type_configs(
-    current_user: User = Depends(require_admin), db: AsyncSession = Depends(get_db)
+    current_user: UserPrincipal = Depends(require_admin), db: AsyncSession = Depends(get_db)
 ):
     """
     Get all loan type configurations (Admin only)
@@ -93,7 +94,7 @@ async def get_all_loan_type_configs(
 @router.get("/loan-types/{loan_type}", response_model=LoanTypeConfigResponse)
 async def get_loan_type_config(
     loan_type: LoanType,
-    current_user: User = Depends(require_admin),
+    current_user: UserPrincipal = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -134,7 +135,7 @@ async def get_loan_type_config(
 async def update_loan_type_config(
     loan_type: LoanType,
     config_update: LoanTypeConfigUpdate,
-    current_user: User = Depends(require_admin),
+    current_user: UserPrincipal = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -157,6 +158,7 @@ async def update_loan_type_config(
         setattr(config, field, value)
 
     await db.commit()
+    LoanTypeConfigCache.invalidate()
     await db.refresh(config)
 
     return {
@@ -169,7 +171,7 @@ async def update_loan_type_config(
 @router.post("/loan-types/{loan_type}/toggle-status")
 async def toggle_loan_type_status(
     loan_type: LoanType,
-    current_user: User = Depends(require_admin),
+    current_user: UserPrincipal = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -188,6 +190,7 @@ async def toggle_loan_type_status(
 
     config.is_active = not config.is_active
     await db.commit()
+    LoanTypeConfigCache.invalidate()
     await db.refresh(config)
 
     return {
@@ -215,7 +218,7 @@ class SystemSettingsResponse(BaseModel):
 
 @router.get("/system-settings", response_model=SystemSettingsResponse)
 async def get_system_settings(
-    current_user: User = Depends(require_admin), db: AsyncSession = Depends(get_db)
+    current_user: UserPrincipal = Depends(require_admin), db: AsyncSession = Depends(get_db)
 ):
     """
     Get current system settings (Admin only)
@@ -228,7 +231,7 @@ async def get_system_settings(
 @router.put("/system-settings")
 async def update_system_settings(
     settings: SystemSettingsResponse,
-    current_user: User = Depends(require_admin),
+    current_user: UserPrincipal = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -244,7 +247,7 @@ async def update_system_settings(
 
 @router.get("/interest-rates/summary")
 async def get_interest_rate_summary(
-    current_user: User = Depends(require_admin), db: AsyncSession = Depends(get_db)
+    current_user: UserPrincipal = Depends(require_admin), db: AsyncSession = Depends(get_db)
 ):
     """
     Get summary of all interest rates across loan types (Admin only)
@@ -277,7 +280,7 @@ async def bulk_update_interest_rates(
     rate_adjustment_percentage: float = Query(
         ..., ge=-50, le=50, description="Percentage adjustment (+/-50%)"
     ),
-    current_user: User = Depends(require_admin),
+    current_user: UserPrincipal = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -307,6 +310,7 @@ async def bulk_update_interest_rates(
         )
 
     await db.commit()
+    LoanTypeConfigCache.invalidate()
 
     return {
         "message": f"All interest rates adjusted by {rate_adjustment_percentage}%",
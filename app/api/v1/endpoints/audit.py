@@ -3,17 +3,18 @@ Audit Log API endpoints
 View and search audit logs for compliance and monitoring
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, desc
 from datetime import datetime, timedelta
 from typing import List, Optional
 from pydantic import BaseModel
 
-from app.db.session import get_db
-from app.models.user import User
+from app.db.session import get_read_db
 from app.models.loan_ledger import AuditLog
 from app.api.deps import require_admin, get_current_user
+from app.services.user_principal_cache import UserPrincipal
+from app.utils.pagination import keyset_page, split_page
 
 router = APIRouter()
 
@@ -41,6 +42,7 @@ class AuditLogResponse(BaseModel):
 
 @router.get("/", response_model=List[AuditLogResponse])
 async def get_audit_logs(
+    response: Response,
     action: Optional[str] = Query(None, description="Filter by action type"),
     entity_type: Optional[str] = Query(
         None, description="Filter by entity type (loan, payment, user)"
@@ -53,12 +55,16 @@ async def get_audit_logs(
     end_date: Optional[datetime] = Query(None, description="End date for filter"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
     offset: int = Query(0, ge=0, description="Number of records to skip"),
-    current_user: User = Depends(require_admin),
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(
+        None, description="X-Next-Cursor value from the previous page"
+    ),
+    current_user: UserPrincipal = Depends(require_admin),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get audit logs with filters (Admin only)
-    Returns paginated audit trail
+    Returns paginated audit trail, newest first; pass the X-Next-Cursor
+    response header back as cursor for the next page
     """
     # Build query with filters
     query = select(AuditLog)
@@ -73,21 +79,21 @@ async def get_audit_logs(
     if actor_id:
         filters.append(AuditLog.actor_id == actor_id)
     if start_date:
-        filters.append(AuditLog.timestamp >= start_date)
+        filters.append(AuditLog.created_at >= start_date)
     if end_date:
-        filters.append(AuditLog.timestamp <= end_date)
+        filters.append(AuditLog.created_at <= end_date)
 
     if filters:
         query = query.where(and_(*filters))
 
-    # Order by most recent first
-    query = query.order_by(desc(AuditLog.timestamp))
-
-    # Apply pagination
-    query = query.limit(limit).offset(offset)
+    # Keyset pagination on (created_at, id), most recent first;
+    # offset is kept for old clients
+    query = keyset_page(query, AuditLog.created_at, AuditLog.id, cursor, limit)
+    if offset:
+        query = query.offset(offset)
 
     result = await db.execute(query)
-    logs = result.scalars().all()
+    logs = split_page(result.scalars().all(), limit, response)
 
     return [
         AuditLogResponse(
@@ -103,8 +109,8 @@ async def get_audit_logs(
             rule_applied=log.rule_applied,
             ip_address=log.ip_address,
             user_agent=log.user_agent,
-            details=log.details,
-            timestamp=log.timestamp,
+            details=log.description,
+            timestamp=log.created_at,
         )
         for log in logs
     ]
@@ -114,8 +120,8 @@ async def get_audit_logs(
 async def get_recent_audit_logs(
     hours: int = Query(24, ge=1, le=168, description="Number of hours to look back"),
     limit: int = Query(50, ge=1, le=500),
-    current_user: User = Depends(require_admin),
-    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(require_admin),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get recent audit logs from last N hours (Admin only)
@@ -159,8 +165,8 @@ async def get_user_activity(
     user_id: int,
     days: int = Query(30, ge=1, le=365, description="Number of days to look back"),
     limit: int = Query(100, ge=1, le=1000),
-    current_user: User = Depends(require_admin),
-    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(require_admin),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get all activities by a specific user (Admin only)
@@ -202,8 +208,8 @@ async def get_user_activity(
 @router.get("/statistics")
 async def get_audit_statistics(
     days: int = Query(30, ge=1, le=365),
-    current_user: User = Depends(require_admin),
-    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(require_admin),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get statistics about audit log activity (Admin only)
@@ -282,8 +288,8 @@ async def get_audit_statistics(
 async def get_entity_history(
     entity_type: str,
     entity_id: int,
-    current_user: User = Depends(require_admin),
-    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(require_admin),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get complete audit history for a specific entity (Admin only)
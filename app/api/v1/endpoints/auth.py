@@ -2,12 +2,13 @@
 Authentication API endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Form, Query, Response
 from fastapi.security import HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_, func, case, and_
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime
+from typing import Optional
 
 from app.db.session import get_db
 from app.models.user import User, UserRole
@@ -21,12 +22,20 @@ from app.schemas.user import (
 )
 from app.schemas.token import Token
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
+    password_needs_rehash,
     create_access_token,
     validate_password_strength,
 )
-from app.api.deps import get_current_user, require_admin_or_employee, require_admin
+from app.api.deps import (
+    get_current_user,
+    get_current_user_record,
+    require_admin_or_employee,
+    require_admin,
+)
+from app.services.user_principal_cache import UserPrincipal, UserPrincipalCache
+from app.utils.pagination import keyset_page, split_page
 
 router = APIRouter()
 security = HTTPBearer()
@@ -34,9 +43,16 @@ security = HTTPBearer()
 
 @router.get("/users/")
 async def get_users(
+    response: Response,
     role: str = None,
     include_inactive: bool = False,
-    current_user: User = Depends(require_admin_or_employee),
+    limit: Optional[int] = Query(
+        None, ge=1, le=500, description="Page size; omit for all users"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="X-Next-Cursor value from the previous page"
+    ),
+    current_user: UserPrincipal = Depends(require_admin_or_employee),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -44,6 +60,8 @@ async def get_users(
     Employee/Admin only
     By default, only returns active users (is_active=True)
     Set include_inactive=true to include deactivated users
+    With limit, pages newest first; pass the X-Next-Cursor response
+    header back as cursor for the next page
     """
     from app.models.user import UserRole
 
@@ -70,8 +88,13 @@ async def get_users(
                 detail=f"Invalid role: {role}. Valid roles are: admin, employee, farmer",
             )
 
+    if limit:
+        query = keyset_page(query, User.created_at, User.id, cursor, limit)
+
     result = await db.execute(query)
     users = result.scalars().all()
+    if limit:
+        users = split_page(users, limit, response)
 
     return [
         {
@@ -91,7 +114,7 @@ async def get_users(
 
 @router.get("/users/farmers")
 async def get_farmers(
-    current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user), db: AsyncSession = Depends(get_db)
 ):
     """
     Get list of farmers based on role:
@@ -162,7 +185,7 @@ async def get_farmers(
 
 @router.get("/users/employees")
 async def get_employees(
-    current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user), db: AsyncSession = Depends(get_db)
 ):
     """
     Get list of all employees
@@ -208,7 +231,7 @@ async def get_employees(
 @router.put("/users/employees/{employee_id}/toggle-status")
 async def toggle_employee_status(
     employee_id: int,
-    current_user: User = Depends(require_admin),
+    current_user: UserPrincipal = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -231,6 +254,7 @@ async def toggle_employee_status(
     employee.is_active = not employee.is_active
     employee.updated_at = datetime.utcnow()
     await db.commit()
+    await UserPrincipalCache.invalidate(employee.id)
     await db.refresh(employee)
 
     return {
@@ -245,7 +269,7 @@ async def toggle_employee_status(
 async def assign_employee_branch(
     employee_id: int,
     branch_id: int,
-    current_user: User = Depends(require_admin),
+    current_user: UserPrincipal = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -281,6 +305,7 @@ async def assign_employee_branch(
     employee.branch_id = branch_id
     employee.updated_at = datetime.utcnow()
     await db.commit()
+    await UserPrincipalCache.invalidate(employee.id)
     await db.refresh(employee)
 
     return {
@@ -296,7 +321,7 @@ async def assign_employee_branch(
 @router.get("/users/employees/{employee_id}/performance")
 async def get_employee_performance(
     employee_id: int,
-    current_user: User = Depends(require_admin),
+    current_user: UserPrincipal = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -404,7 +429,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     user = User(
         email=user_data.email,
         mobile=user_data.mobile,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await get_password_hash_async(user_data.password),
         full_name=user_data.full_name,
         role=user_data.role,
         aadhaar_number=user_data.aadhaar_number,
@@ -523,6 +548,24 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     return user
 
 
+def _issue_token(user: User) -> dict:
+    """Access token for the user's current token version"""
+    access_token = create_access_token(
+        data={
+            "user_id": user.id,
+            "email": user.email,
+            "role": user.role.value,
+            "tv": user.token_version or 0,
+        }
+    )
+
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_in": None,  # Non-expiring token
+    }
+
+
 @router.post("/login", response_model=Token)
 async def login(
     username: str = Form(...),
@@ -544,7 +587,7 @@ async def login(
             detail="Database unavailable. Please try again later.",
         )
 
-    if not user or not verify_password(password, user.hashed_password):
+    if not user or not await verify_password_async(password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -556,6 +599,10 @@ async def login(
             status_code=status.HTTP_403_FORBIDDEN, detail="User account is inactive"
         )
 
+    # Upgrade the hash if the bcrypt work factor has changed
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await get_password_hash_async(password)
+
     # Update last login
     try:
         user.last_login = datetime.utcnow()
@@ -566,20 +613,11 @@ async def login(
             detail="Database unavailable. Please try again later.",
         )
 
-    # Create access token
-    access_token = create_access_token(
-        data={"user_id": user.id, "email": user.email, "role": user.role.value}
-    )
-
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "expires_in": None,  # Non-expiring token
-    }
+    return _issue_token(user)
 
 
 @router.get("/me", response_model=UserSchema)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: User = Depends(get_current_user_record)):
     """Get current logged-in user information"""
     return current_user
 
@@ -587,7 +625,7 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 @router.put("/me", response_model=UserSchema)
 async def update_current_user(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_record),
     db: AsyncSession = Depends(get_db),
 ):
     """Update current user profile"""
@@ -600,6 +638,7 @@ async def update_current_user(
 
     current_user.updated_at = datetime.utcnow()
     await db.commit()
+    await UserPrincipalCache.invalidate(current_user.id)
     await db.refresh(current_user)
 
     return current_user
@@ -608,26 +647,37 @@ async def update_current_user(
 @router.post("/change-password")
 async def change_password(
     password_data: ChangePasswordRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_record),
     db: AsyncSession = Depends(get_db),
 ):
-    """Change password for current user"""
+    """
+    Change password for current user
+    Tokens issued before the change are revoked, including the caller's;
+    the response carries a fresh access token to replace it
+    """
 
     # Verify old password
-    if not verify_password(password_data.old_password, current_user.hashed_password):
+    if not await verify_password_async(
+        password_data.old_password, current_user.hashed_password
+    ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect current password"
         )
 
     # Update password
-    current_user.hashed_password = get_password_hash(password_data.new_password)
+    current_user.hashed_password = await get_password_hash_async(
+        password_data.new_password
+    )
+    # Revoke tokens issued with the old password
+    current_user.token_version = (current_user.token_version or 0) + 1
     await db.commit()
+    await UserPrincipalCache.invalidate(current_user.id)
 
-    return {"message": "Password changed successfully"}
+    return {"message": "Password changed successfully", **_issue_token(current_user)}
 
 
 @router.post("/logout")
-async def logout(current_user: User = Depends(get_current_user)):
+async def logout(current_user: UserPrincipal = Depends(get_current_user)):
     """
     Logout (client should discard token)
     For non-expiring tokens, implement token blacklist if needed
@@ -735,7 +785,7 @@ async def resend_otp(request: dict, db: AsyncSession = Depends(get_db)):
 @router.post("/create-farmer-account")
 async def create_farmer_account(
     farmer_data: dict,
-    current_user: User = Depends(require_admin_or_employee),
+    current_user: UserPrincipal = Depends(require_admin_or_employee),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -795,7 +845,7 @@ async def create_farmer_account(
             farmer_id=farmer_id,
             email=farmer_data.get("email"),
             mobile=farmer_data.get("mobile"),
-            hashed_password=get_password_hash(temp_password),
+            hashed_password=await get_password_hash_async(temp_password),
             full_name=farmer_data.get("full_name"),
             role=UserRole.FARMER,
             is_active=True,
@@ -906,7 +956,7 @@ async def create_farmer_account(
 async def delete_user(
     user_id: int,
     force: bool = False,
-    current_user: User = Depends(require_admin_or_employee),
+    current_user: UserPrincipal = Depends(require_admin_or_employee),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -978,6 +1028,7 @@ async def delete_user(
     # Soft delete - deactivate the user
     user.is_active = False
     await db.commit()
+    await UserPrincipalCache.invalidate(user.id)
 
     message = "User deleted successfully"
     if active_loans and force:
@@ -7,8 +7,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict
 
 from app.db.session import get_db
-from app.models.user import User, UserRole
+from app.models.user import UserRole
 from app.api.deps import get_current_user
+from app.services.user_principal_cache import UserPrincipal
 from app.services.branch_service import BranchService
 
 router = APIRouter()
@@ -16,7 +17,7 @@ router = APIRouter()
 
 @router.get("/")
 async def get_branches(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db), current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Get list of all branches
@@ -44,7 +45,7 @@ async def get_branches(
 @router.get("/statistics/{branch_id}", response_model=Dict)
 async def get_branch_statistics(
     branch_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -70,7 +71,7 @@ async def get_branch_statistics(
 
 @router.get("/comparison", response_model=List[Dict])
 async def get_branches_comparison(
-    current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user), db: AsyncSession = Depends(get_db)
 ):
     """
     Get comparative statistics for all branches
@@ -89,7 +90,7 @@ async def get_branches_comparison(
 @router.get("/top-performing", response_model=List[Dict])
 async def get_top_performing_branches(
     limit: int = 5,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -110,7 +111,7 @@ async def get_top_performing_branches(
 async def get_branch_monthly_trend(
     branch_id: int,
     months: int = 6,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
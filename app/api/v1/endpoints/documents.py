@@ -7,8 +7,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
 from app.db.session import get_db
-from app.models.user import User, UserRole
+from app.models.user import UserRole
 from app.api.deps import get_current_user
+from app.services.user_principal_cache import UserPrincipal
 from app.services.document_service import DocumentService
 
 router = APIRouter()
@@ -19,7 +20,7 @@ async def upload_document(
     loan_id: int,
     file: UploadFile = File(...),
     document_type: str = Form(...),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -63,7 +64,7 @@ async def upload_document(
 @router.get("/loan/{loan_id}")
 async def get_loan_documents(
     loan_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -115,7 +116,7 @@ async def get_loan_documents(
 async def verify_document(
     document_id: int,
     remarks: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -139,7 +140,7 @@ async def verify_document(
 @router.delete("/{document_id}")
 async def delete_document(
     document_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -8,8 +8,9 @@ from pydantic import BaseModel
 from typing import Dict, Optional
 
 from app.db.session import get_db
-from app.models.user import User, UserRole
+from app.models.user import UserRole
 from app.api.deps import get_current_user
+from app.services.user_principal_cache import UserPrincipal
 from app.services.loan_closure_service import LoanClosureService
 
 router = APIRouter()
@@ -26,7 +27,7 @@ class LoanClosureRequest(BaseModel):
 @router.get("/calculate/{loan_id}", response_model=Dict)
 async def calculate_closure_amount(
     loan_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -64,7 +65,7 @@ async def calculate_closure_amount(
 async def close_loan(
     loan_id: int,
     closure_request: LoanClosureRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -100,7 +101,7 @@ async def close_loan(
 @router.get("/summary")
 async def get_closed_loans_summary(
     branch_id: Optional[int] = None,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
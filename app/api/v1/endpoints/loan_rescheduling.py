@@ -9,8 +9,9 @@ from typing import Dict, Optional
 from datetime import date
 
 from app.db.session import get_db
-from app.models.user import User, UserRole
+from app.models.user import UserRole
 from app.api.deps import get_current_user
+from app.services.user_principal_cache import UserPrincipal
 from app.services.loan_rescheduling_service import LoanReschedulingService
 
 router = APIRouter()
@@ -28,7 +29,7 @@ class LoanReschedulingRequest(BaseModel):
 @router.get("/options/{loan_id}", response_model=Dict)
 async def get_rescheduling_options(
     loan_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -52,7 +53,7 @@ async def get_rescheduling_options(
 async def reschedule_loan(
     loan_id: int,
     reschedule_request: LoanReschedulingRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -99,7 +100,7 @@ async def reschedule_loan(
 
 @router.get("/list")
 async def get_rescheduled_loans(
-    current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user), db: AsyncSession = Depends(get_db)
 ):
     """
     Get list of all rescheduled loans
@@ -2,7 +2,9 @@
 Loan management API endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_
 from sqlalchemy.orm import selectinload
@@ -10,7 +12,7 @@ from typing import Optional, List
 from datetime import datetime
 
 from app.db.session import get_db
-from app.models.user import User, UserRole
+from app.models.user import User, UserRole, Branch
 from app.models.loan import Loan, LoanStatus, LoanType, LoanTypeConfig
 from app.schemas.loan import (
     LoanCreate,
@@ -23,12 +25,23 @@ from app.schemas.loan import (
     LoanWithSchedule,
 )
 from app.api.deps import get_current_user, require_admin_or_employee, require_admin
+from app.services.user_principal_cache import UserPrincipal
 from app.services.loan_service import LoanService
+from app.services.calculation_cache_service import CalculationCacheService
+from app.services.portfolio_summary_service import PortfolioSummaryService
 from app.services.ml_service import MLService
+from app.utils.pagination import keyset_page, split_page
 from pydantic import BaseModel, Field
 
 router = APIRouter()
 
+# Columns of the loan listing, by response field name
+LOAN_LIST_COLUMNS = {
+    **{name: getattr(Loan, name) for name in LoanSchema.model_fields},
+    "farmer_name": User.full_name,
+    "branch_name": Branch.name,
+}
+
 
 class LoanTypeConfigResponse(BaseModel):
     id: int
@@ -58,7 +71,7 @@ class LoanTypeConfigResponse(BaseModel):
 
 @router.get("/loan-types", response_model=List[LoanTypeConfigResponse])
 async def get_loan_types(
-    current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user), db: AsyncSession = Depends(get_db)
 ):
     """
     Get all active loan type configurations
@@ -123,7 +136,7 @@ async def get_loan_types(
 @router.post("/", response_model=LoanSchema, status_code=status.HTTP_201_CREATED)
 async def create_loan(
     loan_data: LoanCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -146,20 +159,47 @@ async def create_loan(
 
 @router.get("/", response_model=List[LoanDetail])
 async def get_loans(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None, description="X-Next-Cursor value from the previous page"
+    ),
     status: Optional[LoanStatus] = None,
     loan_type: Optional[LoanType] = None,
     farmer_id: Optional[int] = None,
     branch_id: Optional[int] = None,
-    current_user: User = Depends(get_current_user),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. id,loan_number,status",
+    ),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Get list of loans with filters
     Farmers see only their loans, employees see branch loans, admin sees all
+    Pages newest first; pass the X-Next-Cursor response header back as cursor
+    Only the listed columns are selected, with farmer and branch names joined
     """
-    query = select(Loan).options(selectinload(Loan.farmer), selectinload(Loan.branch))
+    if fields:
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in requested if name not in LOAN_LIST_COLUMNS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}",
+            )
+    else:
+        requested = list(LOAN_LIST_COLUMNS)
+
+    # id and created_at are always selected for the keyset cursor
+    selected = dict.fromkeys(["id", "created_at", *requested])
+    query = select(*(LOAN_LIST_COLUMNS[name].label(name) for name in selected))
+    if "farmer_name" in selected:
+        query = query.outerjoin(User, Loan.farmer_id == User.id)
+    if "branch_name" in selected:
+        query = query.outerjoin(Branch, Loan.branch_id == Branch.id)
 
     # Apply role-based filtering
     if current_user.role == UserRole.FARMER:
@@ -177,29 +217,33 @@ async def get_loans(
     if branch_id and current_user.role == UserRole.ADMIN:
         query = query.where(Loan.branch_id == branch_id)
 
-    # Pagination
-    query = query.offset(skip).limit(limit).order_by(Loan.created_at.desc())
+    # Keyset pagination on (created_at, id); skip is kept for old clients
+    query = keyset_page(query, Loan.created_at, Loan.id, cursor, limit)
+    if skip:
+        query = query.offset(skip)
 
     result = await db.execute(query)
-    loans = result.scalars().all()
-
-    # Convert to LoanDetail with farmer and branch names
-    loan_details = []
-    for loan in loans:
-        loan_detail = LoanDetail(
-            **loan.__dict__,
-            farmer_name=loan.farmer.full_name if loan.farmer else None,
-            branch_name=loan.branch.name if loan.branch else None
+    rows = split_page(result.all(), limit, response)
+
+    if fields:
+        # Partial rows don't fit LoanDetail, so they bypass the response model
+        return JSONResponse(
+            content=jsonable_encoder(
+                [{name: row._mapping[name] for name in requested} for row in rows]
+            ),
+            headers=dict(response.headers),
         )
-        loan_details.append(loan_detail)
 
-    return loan_details
+    return [
+        {**row._mapping, "approved_by_name": None, "emi_schedule": []}
+        for row in rows
+    ]
 
 
 @router.get("/search/{loan_number}", response_model=LoanDetail)
 async def search_loan_by_number(
     loan_number: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Search loan by loan number"""
@@ -235,7 +279,7 @@ async def search_loan_by_number(
 @router.get("/{loan_id}", response_model=LoanDetail)
 async def get_loan(
     loan_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Get loan details with EMI schedule"""
@@ -275,7 +319,7 @@ async def get_loan(
 async def update_loan(
     loan_id: int,
     loan_update: LoanUpdate,
-    current_user: User = Depends(require_admin_or_employee),
+    current_user: UserPrincipal = Depends(require_admin_or_employee),
     db: AsyncSession = Depends(get_db),
 ):
     """Update loan details (employee/admin only)"""
@@ -294,6 +338,8 @@ async def update_loan(
         setattr(loan, field, value)
 
     await db.commit()
+    await CalculationCacheService().invalidate_loan(loan.id)
+    await PortfolioSummaryService.mark_stale(db, [loan.branch_id])
     await db.refresh(loan)
 
     return loan
@@ -302,7 +348,7 @@ async def update_loan(
 @router.get("/{loan_id}/emi-schedule")
 async def get_loan_emi_schedule(
     loan_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Get EMI schedule for a loan"""
@@ -342,7 +388,7 @@ async def get_loan_emi_schedule(
 async def approve_specific_loan(
     loan_id: int,
     approval_data: dict,
-    current_user: User = Depends(require_admin_or_employee),
+    current_user: UserPrincipal = Depends(require_admin_or_employee),
     db: AsyncSession = Depends(get_db),
 ):
     """Approve a specific loan by ID"""
@@ -356,6 +402,8 @@ async def approve_specific_loan(
     loan.approved_by_id = current_user.id
 
     await db.commit()
+    await CalculationCacheService().invalidate_loan(loan.id)
+    await PortfolioSummaryService.mark_stale(db, [loan.branch_id])
     await db.refresh(loan)
 
     return {"message": "Loan approved successfully", "loan": loan}
@@ -365,7 +413,7 @@ async def approve_specific_loan(
 async def reject_specific_loan(
     loan_id: int,
     rejection_data: dict,
-    current_user: User = Depends(require_admin_or_employee),
+    current_user: UserPrincipal = Depends(require_admin_or_employee),
     db: AsyncSession = Depends(get_db),
 ):
     """Reject a specific loan by ID"""
@@ -379,6 +427,8 @@ async def reject_specific_loan(
     loan.approved_by_id = current_user.id
 
     await db.commit()
+    await CalculationCacheService().invalidate_loan(loan.id)
+    await PortfolioSummaryService.mark_stale(db, [loan.branch_id])
     await db.refresh(loan)
 
     return {"message": "Loan rejected", "loan": loan}
@@ -387,7 +437,7 @@ async def reject_specific_loan(
 @router.post("/{loan_id}/disburse")
 async def disburse_loan(
     loan_id: int,
-    current_user: User = Depends(require_admin_or_employee),
+    current_user: UserPrincipal = Depends(require_admin_or_employee),
     db: AsyncSession = Depends(get_db),
 ):
     """Disburse an approved loan"""
@@ -410,6 +460,8 @@ async def disburse_loan(
     loan.disbursement_date = date.today()
 
     await db.commit()
+    await CalculationCacheService().invalidate_loan(loan.id)
+    await PortfolioSummaryService.mark_stale(db, [loan.branch_id])
     await db.refresh(loan)
 
     return {"message": "Loan disbursed successfully", "loan": loan}
@@ -418,7 +470,7 @@ async def disburse_loan(
 @router.post("/approve", response_model=LoanSchema)
 async def approve_loan(
     approval_data: LoanApproval,
-    current_user: User = Depends(require_admin_or_employee),
+    current_user: UserPrincipal = Depends(require_admin_or_employee),
     db: AsyncSession = Depends(get_db),
 ):
     """Approve or reject loan application"""
@@ -430,7 +482,7 @@ async def approve_loan(
 @router.post("/reschedule", response_model=LoanSchema)
 async def reschedule_loan(
     reschedule_data: LoanReschedule,
-    current_user: User = Depends(require_admin_or_employee),
+    current_user: UserPrincipal = Depends(require_admin_or_employee),
     db: AsyncSession = Depends(get_db),
 ):
     """Reschedule an existing loan"""
@@ -443,7 +495,7 @@ async def reschedule_loan(
 async def get_loan_summary(
     branch_id: Optional[int] = None,
     farmer_id: Optional[int] = None,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Get loan summary statistics"""
@@ -467,7 +519,7 @@ async def get_loan_summary(
 @router.get("/{loan_id}/risk-assessment")
 async def get_risk_assessment(
     loan_id: int,
-    current_user: User = Depends(require_admin_or_employee),
+    current_user: UserPrincipal = Depends(require_admin_or_employee),
     db: AsyncSession = Depends(get_db),
 ):
     """Get ML-based risk assessment for a loan"""
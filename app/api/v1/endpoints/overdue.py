@@ -2,15 +2,16 @@
 Endpoints for overdue EMI tracking and management
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict
 import pandas as pd
 import io
 
 from app.db.session import get_db
-from app.models.user import User, UserRole
+from app.models.user import UserRole
 from app.api.deps import get_current_user
+from app.services.user_principal_cache import UserPrincipal
 from app.services.overdue_service import OverdueService
 
 router = APIRouter()
@@ -18,7 +19,7 @@ router = APIRouter()
 
 @router.post("/check-overdue", response_model=Dict)
 async def check_overdue_emis(
-    current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user), db: AsyncSession = Depends(get_db)
 ):
     """
     Check and update overdue EMIs for all active loans
@@ -36,10 +37,15 @@ async def check_overdue_emis(
 
 @router.get("/summary", response_model=Dict)
 async def get_overdue_summary(
-    current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    sort_by: str = Query("severity", pattern="^(severity|amount|penal|oldest)$"),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """
-    Get summary of all overdue loans
+    Get summary of all overdue loans, most severe first by default
+    Totals cover every overdue loan; loans holds one page
     Employee/Admin only
     """
     if current_user.role not in [UserRole.EMPLOYEE, UserRole.ADMIN]:
@@ -48,14 +54,16 @@ async def get_overdue_summary(
             detail="Only employees and admins can view overdue summary",
         )
 
-    summary = await OverdueService.get_overdue_loans_summary(db)
+    summary = await OverdueService.get_overdue_loans_summary(
+        db, skip=skip, limit=limit, sort_by=sort_by
+    )
     return summary
 
 
 @router.get("/loan/{loan_id}")
 async def get_loan_overdue_emis(
     loan_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -106,7 +114,7 @@ async def get_loan_overdue_emis(
 async def mark_loan_defaulted(
     loan_id: int,
     days_threshold: int = 90,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -133,7 +141,7 @@ async def mark_loan_defaulted(
 @router.post("/import-excel")
 async def import_overdue_excel(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -8,7 +8,7 @@ from sqlalchemy import select
 from typing import List, Optional
 
 from app.db.session import get_db
-from app.models.user import User, UserRole
+from app.models.user import UserRole
 from app.models.payment import Payment, PaymentStatus
 from app.schemas.payment import (
     PaymentCreate,
@@ -16,6 +16,7 @@ from app.schemas.payment import (
     LoanLedgerSummary,
 )
 from app.api.deps import get_current_user, require_admin_or_employee
+from app.services.user_principal_cache import UserPrincipal
 from app.services.payment_service import PaymentService
 
 router = APIRouter()
@@ -24,7 +25,7 @@ router = APIRouter()
 @router.post("/", response_model=PaymentSchema, status_code=status.HTTP_201_CREATED)
 async def create_payment(
     payment_data: PaymentCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -51,7 +52,7 @@ async def get_payments(
     limit: int = Query(20, ge=1, le=100),
     loan_id: Optional[int] = None,
     status: Optional[PaymentStatus] = None,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -91,7 +92,7 @@ async def get_payments(
 @router.get("/{payment_id}", response_model=PaymentSchema)
 async def get_payment(
     payment_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Get payment details"""
@@ -110,7 +111,7 @@ async def get_payment(
 @router.get("/receipt/{payment_id}")
 async def download_receipt(
     payment_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Download payment receipt PDF"""
@@ -137,7 +138,7 @@ async def download_receipt(
 @router.get("/ledger/{loan_id}", response_model=LoanLedgerSummary)
 async def get_loan_ledger(
     loan_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Get complete loan ledger"""
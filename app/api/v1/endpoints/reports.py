@@ -2,129 +2,311 @@
 Reports and export API endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    status,
+    Response,
+    Query,
+    BackgroundTasks,
+)
+from fastapi.responses import StreamingResponse, FileResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 from sqlalchemy.orm import selectinload
+from pydantic import BaseModel, Field
 from datetime import date, datetime
-from typing import Optional, List
+from typing import Optional, List, Literal
 import csv
 import io
-
-from app.db.session import get_db
-from app.models.user import User, UserRole
+import logging
+import os
+import tempfile
+
+from app.db.session import (
+    get_db,
+    get_read_db,
+    get_read_sessionmaker,
+    AsyncSessionLocal,
+)
+from app.models.user import UserRole
 from app.models.loan import Loan, LoanStatus, LoanType
 from app.api.deps import get_current_user, require_admin_or_employee
+from app.services.user_principal_cache import UserPrincipal
+from app.services.report_export_service import ReportExportService, LOAN_EXPORT_HEADER
+from app.services.report_service import ReportService
+from app.services.report_job_service import ReportJobService
+from app.tasks.reports import run_report_job
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+MAX_REPORT_RANGE_MONTHS = 60
 
-@router.get("/loans/export")
-async def export_loans_csv(
-    status_filter: Optional[LoanStatus] = None,
-    loan_type_filter: Optional[LoanType] = None,
-    from_date: Optional[date] = None,
-    to_date: Optional[date] = None,
-    current_user: User = Depends(require_admin_or_employee),
+
+class ReportJobRequest(BaseModel):
+    """Request model for a background report job"""
+
+    report_type: Literal["loans_export", "monthly_report", "emi_schedules"]
+    branch_id: Optional[int] = None  # Admins only; employees get their branch
+
+    # loans_export
+    status_filter: Optional[LoanStatus] = None
+    loan_type_filter: Optional[LoanType] = None
+    from_date: Optional[date] = None
+    to_date: Optional[date] = None
+
+    # monthly_report
+    year: Optional[int] = None
+    month: Optional[int] = Field(None, ge=1, le=12)
+
+    # emi_schedules
+    loan_id: Optional[int] = None
+
+    force: bool = False  # Regenerate even if a matching artifact exists
+
+
+def _report_job_response(job) -> dict:
+    return {
+        "job_id": job.id,
+        "report_type": job.report_type,
+        "status": job.status,
+        "progress": job.progress,
+        "rows_total": job.rows_total,
+        "rows_written": job.rows_written,
+        "file_name": job.file_name,
+        "file_size": job.file_size,
+        "error_message": job.error_message,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+        "expires_at": job.expires_at.isoformat() if job.expires_at else None,
+    }
+
+
+async def _run_report_job_inline(job_id: int):
+    """Fallback when no Celery broker is reachable"""
+    # Report rows are read from the replica when one is usable
+    stream_factory = await get_read_sessionmaker()
+    async with AsyncSessionLocal() as session, stream_factory() as stream:
+        await ReportJobService.run(session, stream, job_id)
+
+
+async def _get_authorized_job(
+    db: AsyncSession, job_id: int, current_user: UserPrincipal
+):
+    job = await ReportJobService.get_job(db, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Report job not found"
+        )
+    # Jobs are shared across requesters with the same scope, so
+    # non-admins may open any job covering their own branch
+    if current_user.role != UserRole.ADMIN and (
+        current_user.branch_id is None
+        or ReportJobService.branch_scope(job) != current_user.branch_id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized"
+        )
+    return job
+
+
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_report_job(
+    request: ReportJobRequest,
+    background_tasks: BackgroundTasks,
+    current_user: UserPrincipal = Depends(require_admin_or_employee),
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Export loans data to CSV
+    Queue a loans export, monthly report or EMI schedule export.
+    An identical request with a pending, running or unexpired job
+    returns that job instead of generating the report again.
     """
+    branch_id = request.branch_id
+    if current_user.role == UserRole.EMPLOYEE:
+        if not current_user.branch_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Employee is not assigned to a branch",
+            )
+        branch_id = current_user.branch_id
+
+    if request.report_type == "loans_export":
+        params = {
+            "branch_id": branch_id,
+            "status_filter": (
+                request.status_filter.value if request.status_filter else None
+            ),
+            "loan_type_filter": (
+                request.loan_type_filter.value if request.loan_type_filter else None
+            ),
+            "from_date": request.from_date.isoformat() if request.from_date else None,
+            "to_date": request.to_date.isoformat() if request.to_date else None,
+        }
+    elif request.report_type == "monthly_report":
+        today = date.today()
+        params = {
+            "branch_id": branch_id,
+            "year": request.year or today.year,
+            "month": request.month or today.month,
+        }
+    else:
+        params = {"branch_id": branch_id, "loan_id": request.loan_id}
+
+    job, created = await ReportJobService.submit(
+        db,
+        request.report_type,
+        params,
+        requested_by=current_user.id,
+        force=request.force,
+    )
 
-    # Build query
-    query = select(Loan).options(selectinload(Loan.farmer), selectinload(Loan.branch))
+    if created:
+        try:
+            run_report_job.delay(job.id)
+        except Exception as e:
+            logger.warning(
+                f"Celery unavailable, running report job {job.id} in-process: {str(e)}"
+            )
+            background_tasks.add_task(_run_report_job_inline, job.id)
 
-    # Apply role-based filtering
-    filters = []
-    if current_user.role == UserRole.EMPLOYEE:
-        filters.append(Loan.branch_id == current_user.branch_id)
+    response = _report_job_response(job)
+    response["reused"] = not created
+    return response
 
-    # Apply optional filters
-    if status_filter:
-        filters.append(Loan.status == status_filter)
-    if loan_type_filter:
-        filters.append(Loan.loan_type == loan_type_filter)
-    if from_date:
-        filters.append(
-            Loan.created_at >= datetime.combine(from_date, datetime.min.time())
-        )
-    if to_date:
-        filters.append(
-            Loan.created_at <= datetime.combine(to_date, datetime.max.time())
-        )
 
-    if filters:
-        query = query.where(and_(*filters))
+@router.get("/jobs/{job_id}")
+async def get_report_job(
+    job_id: int,
+    current_user: UserPrincipal = Depends(require_admin_or_employee),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Report job status and progress
+    """
+    job = await _get_authorized_job(db, job_id, current_user)
+    return _report_job_response(job)
 
-    query = query.order_by(Loan.created_at.desc())
 
-    result = await db.execute(query)
-    loans = result.scalars().all()
+@router.get("/jobs/{job_id}/download")
+async def download_report_job(
+    job_id: int,
+    current_user: UserPrincipal = Depends(require_admin_or_employee),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Download a completed report job's gzip-compressed artifact
+    """
+    job = await _get_authorized_job(db, job_id, current_user)
 
-    # Create CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
+    if job.status != "completed":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Report job is {job.status}",
+        )
+    if (
+        (job.expires_at and job.expires_at <= datetime.utcnow())
+        or not job.file_path
+        or not os.path.exists(job.file_path)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE, detail="Report artifact has expired"
+        )
 
-    # Write header
-    writer.writerow(
-        [
-            "Loan Number",
-            "Farmer Name",
-            "Branch Name",
-            "Loan Type",
-            "Principal Amount",
-            "Interest Rate",
-            "Tenure (Months)",
-            "EMI Amount",
-            "Total Payable",
-            "Total Outstanding",
-            "Status",
-            "Sanction Date",
-            "Disbursement Date",
-            "Created At",
-        ]
+    return FileResponse(
+        job.file_path, media_type="application/gzip", filename=job.file_name
     )
 
-    # Write data
-    for loan in loans:
-        writer.writerow(
-            [
-                loan.loan_number,
-                loan.farmer.full_name if loan.farmer else "",
-                loan.branch.name if loan.branch else "",
-                loan.loan_type.value,
-                f"{loan.principal_amount:.2f}",
-                f"{loan.interest_rate:.2f}",
-                loan.tenure_months,
-                f"{loan.emi_amount:.2f}" if loan.emi_amount else "",
-                f"{loan.total_amount_payable:.2f}",
-                f"{loan.total_outstanding:.2f}",
-                loan.status.value,
-                loan.sanction_date.isoformat() if loan.sanction_date else "",
-                loan.disbursement_date.isoformat() if loan.disbursement_date else "",
-                loan.created_at.isoformat(),
-            ]
-        )
 
-    # Return CSV file
-    csv_content = output.getvalue()
-    output.close()
+@router.get("/loans/export")
+async def export_loans_csv(
+    status_filter: Optional[LoanStatus] = None,
+    loan_type_filter: Optional[LoanType] = None,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    current_user: UserPrincipal = Depends(require_admin_or_employee),
+):
+    """
+    Export loans data to CSV (streamed) or XLSX
+    """
 
-    filename = f"loans_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    # Apply role-based filtering
+    branch_id = None
+    if current_user.role == UserRole.EMPLOYEE:
+        if not current_user.branch_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Employee is not assigned to a branch",
+            )
+        branch_id = current_user.branch_id
+
+    query = ReportExportService.loan_export_query(
+        branch_id=branch_id,
+        status_filter=status_filter,
+        loan_type_filter=loan_type_filter,
+        from_date=from_date,
+        to_date=to_date,
+    )
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    session_factory = await get_read_sessionmaker()
+
+    if format == "xlsx":
+        # constant_memory keeps one row in memory; the finished file is sent
+        # from disk and removed once the response completes
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+        try:
+            async with session_factory() as session:
+                await ReportExportService.write_xlsx(
+                    session,
+                    query,
+                    LOAN_EXPORT_HEADER,
+                    ReportExportService.loan_export_values,
+                    path,
+                    sheet_name="Loans",
+                )
+        except Exception:
+            os.remove(path)
+            raise
+
+        return FileResponse(
+            path,
+            media_type=XLSX_MEDIA_TYPE,
+            filename=f"loans_export_{timestamp}.xlsx",
+            background=BackgroundTask(os.remove, path),
+        )
 
-    return Response(
-        content=csv_content,
+    async def stream_csv():
+        # Own session: the cursor outlives the request's dependency scope
+        async with session_factory() as session:
+            async for chunk in ReportExportService.iter_csv(
+                session,
+                query,
+                LOAN_EXPORT_HEADER,
+                ReportExportService.loan_export_row,
+            ):
+                yield chunk
+
+    return StreamingResponse(
+        stream_csv(),
         media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
+        headers={
+            "Content-Disposition": f"attachment; filename=loans_export_{timestamp}.csv"
+        },
     )
 
 
 @router.get("/emi-schedule/export/{loan_id}")
 async def export_emi_schedule_csv(
     loan_id: int,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Export EMI schedule for a specific loan to CSV
@@ -217,8 +399,8 @@ async def export_emi_schedule_csv(
 async def get_loan_summary_report(
     from_date: Optional[date] = None,
     to_date: Optional[date] = None,
-    current_user: User = Depends(require_admin_or_employee),
-    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(require_admin_or_employee),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get comprehensive loan summary report
@@ -295,188 +477,92 @@ async def get_loan_summary_report(
 async def get_monthly_report(
     year: Optional[int] = None,
     month: Optional[int] = None,
-    current_user: User = Depends(require_admin_or_employee),
-    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(require_admin_or_employee),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get monthly performance report
     If year/month not provided, uses current month
     """
-    try:
-        from calendar import monthrange
-        import sys
-
-        # Use current year/month if not provided
-        if not year or not month:
-            today = date.today()
-            year = year or today.year
-            month = month or today.month
+    # Use current year/month if not provided
+    if not year or not month:
+        today = date.today()
+        year = year or today.year
+        month = month or today.month
+
+    # Validate month
+    if month < 1 or month > 12:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Month must be between 1 and 12",
+        )
 
-        # Validate month
-        if month < 1 or month > 12:
+    branch_id = None
+    if current_user.role == UserRole.EMPLOYEE:
+        if not current_user.branch_id:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Month must be between 1 and 12",
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Employee is not assigned to a branch",
             )
+        branch_id = current_user.branch_id
 
-        # Calculate date range for the month
-        first_day = date(year, month, 1)
-        last_day = date(year, month, monthrange(year, month)[1])
-
-        print(
-            f"DEBUG: Generating report for {first_day} to {last_day}", file=sys.stderr
+    try:
+        return await ReportService.monthly_report(db, year, month, branch_id)
+    except Exception as e:
+        logger.error(f"Error generating monthly report: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error generating monthly report: {str(e)}",
         )
-        sys.stderr.flush()
-
-        # Base filter
-        filters = [
-            Loan.created_at >= datetime.combine(first_day, datetime.min.time()),
-            Loan.created_at <= datetime.combine(last_day, datetime.max.time()),
-        ]
-
-        if current_user.role == UserRole.EMPLOYEE:
-            filters.append(Loan.branch_id == current_user.branch_id)
-
-        # Get loans for the month
-        query = select(Loan).where(and_(*filters))
-        result = await db.execute(query)
-        loans = result.scalars().all()
-
-        print(f"DEBUG: Found {len(loans)} loans", file=sys.stderr)
-        sys.stderr.flush()
-
-        # Calculate statistics
-        total_loans_created = len(loans)
-        total_amount_sanctioned = sum(float(loan.principal_amount) for loan in loans)
 
-        loans_by_status = {}
-        for loan in loans:
-            status_val = loan.status.value
-            loans_by_status[status_val] = loans_by_status.get(status_val, 0) + 1
 
-        # Get disbursed loans in the month
-        disbursement_filters = [
-            Loan.disbursement_date >= first_day,
-            Loan.disbursement_date <= last_day,
-        ]
-        if current_user.role == UserRole.EMPLOYEE:
-            disbursement_filters.append(Loan.branch_id == current_user.branch_id)
-
-        disbursed_query = select(Loan).where(and_(*disbursement_filters))
-        disbursed_result = await db.execute(disbursed_query)
-        disbursed_loans = disbursed_result.scalars().all()
+@router.get("/monthly/range")
+async def get_monthly_report_range(
+    from_year: int,
+    from_month: int = Query(..., ge=1, le=12),
+    to_year: Optional[int] = None,
+    to_month: Optional[int] = Query(None, ge=1, le=12),
+    current_user: UserPrincipal = Depends(require_admin_or_employee),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Get monthly performance reports for a range of months in one call
+    If to_year/to_month not provided, the range ends at the current month
+    """
+    today = date.today()
+    to_year = to_year or today.year
+    to_month = to_month or today.month
 
-        total_disbursed = len(disbursed_loans)
-        total_disbursed_amount = sum(
-            float(loan.principal_amount) for loan in disbursed_loans
+    month_count = (to_year - from_year) * 12 + (to_month - from_month) + 1
+    if month_count < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Range must end on or after its start month",
         )
-
-        print(f"DEBUG: {total_disbursed} disbursed loans", file=sys.stderr)
-        sys.stderr.flush()
-
-        # Get payments for the month
-        from app.models.payment import Payment, PaymentStatus
-
-        payment_query = select(Payment).where(
-            Payment.payment_date >= first_day,
-            Payment.payment_date <= last_day,
-            Payment.status == PaymentStatus.SUCCESS,
+    if month_count > MAX_REPORT_RANGE_MONTHS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range cannot exceed {MAX_REPORT_RANGE_MONTHS} months",
         )
 
-        payment_result = await db.execute(payment_query)
-        all_payments = payment_result.scalars().all()
-
-        # Filter by branch if employee
-        if current_user.role == UserRole.EMPLOYEE:
-            branch_loan_result = await db.execute(
-                select(Loan.id).where(Loan.branch_id == current_user.branch_id)
+    branch_id = None
+    if current_user.role == UserRole.EMPLOYEE:
+        if not current_user.branch_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Employee is not assigned to a branch",
             )
-            branch_loan_ids = {lid for (lid,) in branch_loan_result.all()}
-            payments = [p for p in all_payments if p.loan_id in branch_loan_ids]
-        else:
-            payments = all_payments
-
-        total_payments = len(payments)
-        total_payment_amount = sum(float(payment.amount) for payment in payments)
-
-        print(f"DEBUG: {total_payments} payments", file=sys.stderr)
-        sys.stderr.flush()
-
-        # Calculate collection efficiency
-        from app.models.loan import EMISchedule
-
-        emi_query = select(EMISchedule).where(
-            EMISchedule.due_date >= first_day, EMISchedule.due_date <= last_day
-        )
-
-        emi_result = await db.execute(emi_query)
-        all_emis = emi_result.scalars().all()
+        branch_id = current_user.branch_id
 
-        # Filter by branch if employee
-        if current_user.role == UserRole.EMPLOYEE:
-            emis_due = [emi for emi in all_emis if emi.loan_id in branch_loan_ids]
-        else:
-            emis_due = all_emis
-
-        print(f"DEBUG: {len(emis_due)} EMIs due", file=sys.stderr)
-        sys.stderr.flush()
-
-        total_emis_due = len(emis_due)
-        total_amount_due = sum(float(emi.emi_amount) for emi in emis_due)
-        emis_paid = sum(1 for emi in emis_due if emi.is_paid)
-        amount_collected = sum(
-            float(emi.paid_amount or 0) for emi in emis_due if emi.is_paid
-        )
-
-        collection_rate = (
-            (emis_paid / total_emis_due * 100) if total_emis_due > 0 else 0
-        )
-        collection_efficiency = (
-            (amount_collected / total_amount_due * 100) if total_amount_due > 0 else 0
-        )
-
-        print(f"DEBUG: Returning report data", file=sys.stderr)
-        sys.stderr.flush()
-
-        return {
-            "report_period": {
-                "month": month,
-                "year": year,
-                "month_name": date(year, month, 1).strftime("%B %Y"),
-                "generated_at": datetime.now().isoformat(),
-            },
-            "loan_statistics": {
-                "loans_created": total_loans_created,
-                "amount_sanctioned": round(total_amount_sanctioned, 2),
-                "loans_disbursed": total_disbursed,
-                "amount_disbursed": round(total_disbursed_amount, 2),
-                "loans_by_status": loans_by_status,
-            },
-            "collection_statistics": {
-                "emis_due": total_emis_due,
-                "amount_due": round(total_amount_due, 2),
-                "emis_paid": emis_paid,
-                "amount_collected": round(amount_collected, 2),
-                "collection_rate_percentage": round(collection_rate, 2),
-                "collection_efficiency_percentage": round(collection_efficiency, 2),
-            },
-            "payment_statistics": {
-                "total_payments": total_payments,
-                "total_amount": round(total_payment_amount, 2),
-            },
-        }
-
-    except Exception as e:
-        import traceback
-        import sys
-
-        error_msg = traceback.format_exc()
-        print("\n" + "=" * 80, file=sys.stderr)
-        print("ERROR in get_monthly_report:", file=sys.stderr)
-        print(error_msg, file=sys.stderr)
-        print("=" * 80 + "\n", file=sys.stderr)
-        sys.stderr.flush()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error generating monthly report: {str(e)}",
-        )
+    months = await ReportService.monthly_series(
+        db, from_year, from_month, to_year, to_month, branch_id
+    )
+    return {
+        "report_period": {
+            "from": f"{from_year}-{from_month:02d}",
+            "to": f"{to_year}-{to_month:02d}",
+            "month_count": month_count,
+            "generated_at": datetime.now().isoformat(),
+        },
+        "months": months,
+    }
@@ -11,7 +11,8 @@ from decimal import Decimal
 from pydantic import BaseModel, Field
 
 from app.api.deps import get_db, get_current_user
-from app.models.user import User
+from app.db.session import get_read_db
+from app.services.user_principal_cache import UserPrincipal
 from app.services.smart_calculator import SmartCalculator
 from app.services.daily_accrual_service import DailyAccrualService
 
@@ -57,6 +58,14 @@ class LoanComparisonRequest(BaseModel):
     loan_types: List[str] = Field(description="List of loan types to compare")
 
 
+class LoanComparisonGridRequest(BaseModel):
+    principal_amounts: List[Decimal] = Field(min_length=1, max_length=50)
+    tenure_months: List[int] = Field(min_length=1, max_length=120)
+    loan_types: Optional[List[str]] = Field(
+        default=None, description="Loan types to compare (all active if omitted)"
+    )
+
+
 class SmartRecommendationRequest(BaseModel):
     loan_id: int
     farmer_monthly_income: Optional[Decimal] = None
@@ -92,7 +101,7 @@ class InterestForDaysRequest(BaseModel):
 
 @router.get("/loans")
 async def get_calculator_loans(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db), current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Get loans accessible to current user for calculator
@@ -156,7 +165,7 @@ async def get_calculator_loans(
 async def calculate_pro_rata_interest(
     request: ProRataInterestRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     ✔ Calculate pro-rata (daily) interest for exact date range
@@ -187,7 +196,7 @@ async def calculate_pro_rata_interest(
 async def calculate_interest_for_days(
     request: InterestForDaysRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     ✔ Calculate interest for any loan type, amount, and number of days
@@ -314,7 +323,7 @@ async def calculate_interest_for_days(
 async def calculate_interest_projections(
     request: InterestProjectionRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     ✔ Calculate what farmer owes:
@@ -340,7 +349,7 @@ async def calculate_interest_projections(
 async def calculate_overdue_with_penalty(
     request: OverdueCalculationRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     ✔ Calculate overdue interest with tiered penalty
@@ -371,7 +380,7 @@ async def calculate_overdue_with_penalty(
 async def generate_loan_ledger(
     request: LoanLedgerRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     ✔ Generate full loan ledger like banks
@@ -398,7 +407,7 @@ async def generate_loan_ledger(
 async def generate_emi_amortization(
     request: EMIAmortizationRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     ✔ Generate EMI amortization table (HDFC/Union Bank style)
@@ -427,7 +436,7 @@ async def generate_emi_amortization(
 async def compare_loan_schemes(
     request: LoanComparisonRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     ✔ Compare multiple loan schemes for same amount
@@ -452,11 +461,42 @@ async def compare_loan_schemes(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/compare/loan-schemes/grid")
+async def compare_loan_schemes_grid(
+    request: LoanComparisonGridRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    """
+    ✔ Compare every scheme across many amounts and tenures at once
+
+    Returns principal × tenure × scheme matrices of EMI, total interest,
+    total payable and early-closure savings, plus the best scheme per cell
+    """
+    if any(p <= 0 for p in request.principal_amounts):
+        raise HTTPException(status_code=400, detail="Principal amounts must be positive")
+    if any(t <= 0 or t > 120 for t in request.tenure_months):
+        raise HTTPException(
+            status_code=400, detail="Tenure must be between 1 and 120 months"
+        )
+
+    calculator = SmartCalculator(db)
+
+    try:
+        return await calculator.compare_loan_schemes_grid(
+            principals=request.principal_amounts,
+            tenures=request.tenure_months,
+            loan_types=request.loan_types,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.post("/recommendations/smart")
 async def get_smart_recommendations(
     request: SmartRecommendationRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     ✔ AI-powered smart recommendations using Gemini
@@ -484,7 +524,7 @@ async def get_smart_recommendations(
 async def simulate_payment(
     request: SimulatePaymentRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     Simulate effect of payment on loan
@@ -529,7 +569,7 @@ async def check_rate_switching(
     loan_id: int,
     as_of_date: Optional[date] = Query(None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     Check if rate switching applies for loan
@@ -549,7 +589,7 @@ async def check_rate_switching(
 async def calculate_penalty(
     request: PenaltyCalculationRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     Calculate tiered penalty based on overdue buckets
@@ -577,7 +617,7 @@ async def calculate_penalty(
 async def ai_explain_calculation(
     request: AIExplanationRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     Use Gemini AI to explain calculation in simple terms
@@ -602,7 +642,7 @@ async def ai_explain_calculation(
 async def suggest_repayment_plan(
     request: RepaymentPlanRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     Use AI to suggest optimal repayment plan
@@ -628,7 +668,7 @@ async def comprehensive_loan_analysis(
     include_ai: bool = Query(False, description="Include AI explanations"),
     language: str = Query("english", description="Language for AI explanation"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     Complete loan analysis with all calculations
@@ -670,7 +710,7 @@ async def comprehensive_loan_analysis(
 async def run_daily_accrual(
     accrual_date: Optional[date] = Query(None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     Manually trigger daily accrual job
@@ -689,12 +729,37 @@ async def run_daily_accrual(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/admin/catch-up-accrual")
+async def catch_up_accrual(
+    from_date: date = Query(..., description="First missed accrual date"),
+    to_date: Optional[date] = Query(None, description="Last date (default today)"),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    """
+    Backfill daily accrual for a range of missed dates in one pass
+    Admin only - days already completed are skipped
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    accrual_service = DailyAccrualService(db)
+
+    try:
+        result = await accrual_service.catch_up_accrual(from_date, to_date)
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/admin/batch-calculation")
 async def run_batch_calculation(
     calculation_type: str = Query(..., description="outstanding or penalty"),
     as_of_date: Optional[date] = Query(None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     Run batch calculation across all loans
@@ -718,8 +783,8 @@ async def run_batch_calculation(
 @router.get("/admin/accrual-history")
 async def get_accrual_history(
     days: int = Query(7, gt=0, le=90),
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     Get history of accrual job executions
@@ -769,3 +834,35 @@ async def get_accrual_history(
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/admin/calculation-cache-stats")
+async def get_calculation_cache_stats(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    """
+    Calculation cache effectiveness
+    Hit/miss counts for this worker plus stored entries per calculation type
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    from app.models.loan_ledger import CalculationCache
+    from sqlalchemy import select, func
+
+    result = await db.execute(
+        select(
+            CalculationCache.calculation_type,
+            func.count(CalculationCache.id),
+            func.coalesce(func.sum(CalculationCache.accessed_count), 0),
+        ).group_by(CalculationCache.calculation_type)
+    )
+
+    return {
+        "process": SmartCalculator.get_cache_stats(),
+        "stored": {
+            calculation_type: {"entries": entries, "total_hits": int(hits)}
+            for calculation_type, entries, hits in result.all()
+        },
+    }
@@ -3,6 +3,7 @@ Celery configuration for background tasks
 """
 
 from celery import Celery
+from celery.signals import worker_init
 from app.core.config import settings
 
 celery_app = Celery(
@@ -12,7 +13,9 @@ celery_app = Celery(
     include=[
         "app.tasks.notifications",
         "app.tasks.interest_calculation",
+        "app.tasks.daily_accrual",
         "app.tasks.reports",
+        "app.tasks.partitions",
     ],
 )
 
@@ -30,6 +33,14 @@ celery_app.conf.update(
     worker_max_tasks_per_child=1000,
 )
 
+
+@worker_init.connect
+def _configure_worker_db(**kwargs):
+    from app.db.session import use_worker_engine
+
+    use_worker_engine()
+
+
 # Beat schedule for periodic tasks
 celery_app.conf.beat_schedule = {
     "send-emi-reminders-daily": {
@@ -47,6 +58,21 @@ celery_app.conf.beat_schedule = {
         "schedule": 86400.0,  # Every 24 hours
         "options": {"expires": 3600},
     },
+    "refresh-branch-analytics": {
+        "task": "app.tasks.reports.refresh_branch_analytics",
+        "schedule": float(settings.BRANCH_ANALYTICS_REFRESH_SECONDS),
+        "options": {"expires": settings.BRANCH_ANALYTICS_REFRESH_SECONDS},
+    },
+    "cleanup-report-artifacts": {
+        "task": "app.tasks.reports.cleanup_report_artifacts",
+        "schedule": float(settings.REPORT_ARTIFACT_CLEANUP_SECONDS),
+        "options": {"expires": settings.REPORT_ARTIFACT_CLEANUP_SECONDS},
+    },
+    "ensure-table-partitions": {
+        "task": "app.tasks.partitions.ensure_partitions",
+        "schedule": 86400.0,  # Every 24 hours
+        "options": {"expires": 3600},
+    },
 }
 
 if __name__ == "__main__":
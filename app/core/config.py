@@ -24,6 +24,33 @@ class Settings(BaseSettings):
     DB_SSL_INSECURE: bool = Field(default=False, env="DB_SSL_INSECURE")
     DB_SSL_CA_CERT_PEM: str = Field(default="", env="DB_SSL_CA_CERT_PEM")
 
+    # Read replica for dashboards, reports and audit listings (optional)
+    DATABASE_READ_URL: str = Field(default="", env="DATABASE_READ_URL")
+    DB_READ_MAX_LAG_SECONDS: int = Field(default=30, env="DB_READ_MAX_LAG_SECONDS")
+    DB_READ_LAG_CHECK_SECONDS: int = Field(default=10, env="DB_READ_LAG_CHECK_SECONDS")
+
+    # Connection pooling: auto, direct, pgbouncer or null (see app.db.session)
+    DB_POOL_MODE: str = Field(default="auto", env="DB_POOL_MODE")
+    DB_WORKER_POOL_MODE: str = Field(default="null", env="DB_WORKER_POOL_MODE")
+    DB_CONNECT_TIMEOUT_SECONDS: int = Field(default=10, env="DB_CONNECT_TIMEOUT_SECONDS")
+    # direct mode
+    DB_POOL_SIZE: int = Field(default=10, env="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(default=20, env="DB_MAX_OVERFLOW")
+    DB_POOL_TIMEOUT_SECONDS: int = Field(default=30, env="DB_POOL_TIMEOUT_SECONDS")
+    DB_POOL_RECYCLE_SECONDS: int = Field(default=1800, env="DB_POOL_RECYCLE_SECONDS")
+    DB_STATEMENT_CACHE_SIZE: int = Field(default=100, env="DB_STATEMENT_CACHE_SIZE")
+    # pgbouncer mode (transaction pooling)
+    DB_PGBOUNCER_POOL_SIZE: int = Field(default=5, env="DB_PGBOUNCER_POOL_SIZE")
+    DB_PGBOUNCER_MAX_OVERFLOW: int = Field(
+        default=10, env="DB_PGBOUNCER_MAX_OVERFLOW"
+    )
+    DB_PGBOUNCER_POOL_TIMEOUT_SECONDS: int = Field(
+        default=10, env="DB_PGBOUNCER_POOL_TIMEOUT_SECONDS"
+    )
+    DB_PGBOUNCER_POOL_RECYCLE_SECONDS: int = Field(
+        default=300, env="DB_PGBOUNCER_POOL_RECYCLE_SECONDS"
+    )
+
     # Security
     SECRET_KEY: str = Field(
         default="GKAUQiSuMPq-Bh8zmNYVtOD9JYcAbvd6x8-KvXMGVMg", env="SECRET_KEY"
@@ -33,6 +60,27 @@ class Settings(BaseSettings):
         default=0, env="ACCESS_TOKEN_EXPIRE_MINUTES"
     )  # 0 means non-expiring
 
+    # Password Hashing (bcrypt)
+    PASSWORD_HASH_ROUNDS: int = Field(default=12, env="PASSWORD_HASH_ROUNDS")
+    PASSWORD_HASH_MAX_WORKERS: int = Field(default=4, env="PASSWORD_HASH_MAX_WORKERS")
+    PASSWORD_HASH_MAX_PENDING: int = Field(
+        default=64, env="PASSWORD_HASH_MAX_PENDING"
+    )
+
+    # Authenticated-user principal cache
+    USER_PRINCIPAL_CACHE_ENABLED: bool = Field(
+        default=True, env="USER_PRINCIPAL_CACHE_ENABLED"
+    )
+    USER_PRINCIPAL_CACHE_TTL_SECONDS: int = Field(
+        default=5 * 60, env="USER_PRINCIPAL_CACHE_TTL_SECONDS"
+    )
+    USER_PRINCIPAL_LOCAL_TTL_SECONDS: int = Field(
+        default=5, env="USER_PRINCIPAL_LOCAL_TTL_SECONDS"
+    )
+    USER_PRINCIPAL_LOCAL_MAX_ENTRIES: int = Field(
+        default=10000, env="USER_PRINCIPAL_LOCAL_MAX_ENTRIES"
+    )
+
     # Redis
     REDIS_URL: str = Field(default="", env="REDIS_URL")
 
@@ -90,6 +138,60 @@ class Settings(BaseSettings):
     PENAL_INTEREST_RATE: float = Field(default=2.0, env="PENAL_INTEREST_RATE")
     OVERDUE_DAYS_FOR_PENALTY: int = Field(default=90, env="OVERDUE_DAYS_FOR_PENALTY")
 
+    # Calculation Cache
+    CALCULATION_CACHE_TTL_SECONDS: int = Field(
+        default=24 * 60 * 60, env="CALCULATION_CACHE_TTL_SECONDS"
+    )
+    CALC_REDIS_CACHE_ENABLED: bool = Field(default=True, env="CALC_REDIS_CACHE_ENABLED")
+    CALC_REDIS_CACHE_TTL_SECONDS: int = Field(
+        default=60 * 60, env="CALC_REDIS_CACHE_TTL_SECONDS"
+    )
+    CALC_REDIS_CACHE_MAX_ENTRY_BYTES: int = Field(
+        default=256 * 1024, env="CALC_REDIS_CACHE_MAX_ENTRY_BYTES"
+    )
+    LOAN_TYPE_CONFIG_CACHE_TTL_SECONDS: int = Field(
+        default=5 * 60, env="LOAN_TYPE_CONFIG_CACHE_TTL_SECONDS"
+    )
+
+    # Dashboard
+    PORTFOLIO_SUMMARY_MAX_AGE_SECONDS: int = Field(
+        default=15 * 60, env="PORTFOLIO_SUMMARY_MAX_AGE_SECONDS"
+    )
+    BRANCH_ANALYTICS_CACHE_TTL_SECONDS: int = Field(
+        default=30 * 60, env="BRANCH_ANALYTICS_CACHE_TTL_SECONDS"
+    )
+    BRANCH_ANALYTICS_REFRESH_SECONDS: int = Field(
+        default=10 * 60, env="BRANCH_ANALYTICS_REFRESH_SECONDS"
+    )
+
+    # Report Jobs
+    REPORT_ARTIFACT_DIR: str = Field(default="reports", env="REPORT_ARTIFACT_DIR")
+    REPORT_ARTIFACT_RETENTION_HOURS: int = Field(
+        default=24, env="REPORT_ARTIFACT_RETENTION_HOURS"
+    )
+    REPORT_ARTIFACT_CLEANUP_SECONDS: int = Field(
+        default=60 * 60, env="REPORT_ARTIFACT_CLEANUP_SECONDS"
+    )
+    REPORT_JOB_STALE_MINUTES: int = Field(default=60, env="REPORT_JOB_STALE_MINUTES")
+
+    # Daily Accrual
+    ACCRUAL_CHUNK_SIZE: int = Field(default=5000, env="ACCRUAL_CHUNK_SIZE")
+    ACCRUAL_SHARD_BY: str = Field(default="branch", env="ACCRUAL_SHARD_BY")  # branch, hash
+    ACCRUAL_SHARD_COUNT: int = Field(default=8, env="ACCRUAL_SHARD_COUNT")
+
+    # Overdue sweep (EMIs per id-range batch)
+    OVERDUE_SWEEP_BATCH_SIZE: int = Field(default=5000, env="OVERDUE_SWEEP_BATCH_SIZE")
+
+    # Monthly partitions of loan_ledgers and audit_logs
+    PARTITION_MONTHS_AHEAD: int = Field(default=3, env="PARTITION_MONTHS_AHEAD")
+    PARTITION_ARCHIVE_DIR: str = Field(default="archives", env="PARTITION_ARCHIVE_DIR")
+    LEDGER_PARTITION_RETENTION_MONTHS: int = Field(
+        default=36, env="LEDGER_PARTITION_RETENTION_MONTHS"
+    )
+    AUDIT_LOG_PARTITION_RETENTION_MONTHS: int = Field(
+        default=24, env="AUDIT_LOG_PARTITION_RETENTION_MONTHS"
+    )
+
     # File Upload
     MAX_UPLOAD_SIZE: int = Field(
         default=10 * 1024 * 1024, env="MAX_UPLOAD_SIZE"
@@ -2,8 +2,11 @@
 Security utilities for authentication and authorization
 """
 
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Dict, Optional, Union
 from jose import JWTError, jwt
 import bcrypt
 from fastapi import HTTPException, status
@@ -20,10 +23,91 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.PASSWORD_HASH_ROUNDS)
     return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when a hash was made with a different bcrypt work factor"""
+    try:
+        # $2b$<rounds>$<salt+hash>
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return rounds != settings.PASSWORD_HASH_ROUNDS
+
+
+# ==================== NON-BLOCKING HASHING ====================
+# bcrypt releases the GIL, so hashing in a small dedicated pool keeps the
+# event loop free. Requests beyond PASSWORD_HASH_MAX_PENDING are refused
+# with 503 instead of queueing without bound.
+
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_lock = threading.Lock()
+_hash_stats = {
+    "pending": 0,  # Submitted, not finished (queued + running)
+    "peak_pending": 0,
+    "completed": 0,
+    "rejected": 0,
+}
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        with _hash_lock:
+            if _hash_executor is None:
+                _hash_executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_MAX_WORKERS,
+                    thread_name_prefix="password-hash",
+                )
+    return _hash_executor
+
+
+async def _run_in_hash_pool(fn, *args):
+    with _hash_lock:
+        if _hash_stats["pending"] >= settings.PASSWORD_HASH_MAX_PENDING:
+            _hash_stats["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy. Please try again shortly.",
+                headers={"Retry-After": "1"},
+            )
+        _hash_stats["pending"] += 1
+        _hash_stats["peak_pending"] = max(
+            _hash_stats["peak_pending"], _hash_stats["pending"]
+        )
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), fn, *args)
+    finally:
+        with _hash_lock:
+            _hash_stats["pending"] -= 1
+            _hash_stats["completed"] += 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password in the bounded hashing pool"""
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash in the bounded hashing pool"""
+    return await _run_in_hash_pool(get_password_hash, password)
+
+
+def password_hash_metrics() -> Dict:
+    """Queue depth and throughput of the hashing pool"""
+    with _hash_lock:
+        stats = dict(_hash_stats)
+    stats["max_workers"] = settings.PASSWORD_HASH_MAX_WORKERS
+    stats["max_pending"] = settings.PASSWORD_HASH_MAX_PENDING
+    stats["queued"] = max(0, stats["pending"] - stats["max_workers"])
+    stats["rounds"] = settings.PASSWORD_HASH_ROUNDS
+    return stats
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create JWT access token
@@ -2,25 +2,48 @@
 Database session management
 """
 
+import logging
 import ssl
+import time
+from uuid import uuid4
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
 from app.core.config import settings
 
-# Create async engine
-_engine_kwargs = {
-    "echo": settings.ENVIRONMENT == "development",
-    "future": True,
-    "pool_pre_ping": True,
-    "connect_args": {"statement_cache_size": 0, "prepared_statement_cache_size": 0},
-}
-
-# When running behind PgBouncer in transaction/statement pooling mode (common on Render),
-# connection-level state like prepared statements is not reliable. NullPool avoids
-# reusing DB connections across requests.
-if settings.ENVIRONMENT != "development":
+logger = logging.getLogger(__name__)
+
+POOL_MODES = ("direct", "pgbouncer", "null")
+
+
+def resolve_pool_mode(mode: str = None) -> str:
+    """
+    Pooling mode of an engine:
+
+    - direct: pooled connections straight to Postgres, with asyncpg and
+      SQLAlchemy prepared-statement caches enabled
+    - pgbouncer: pooled connections to PgBouncer in transaction pooling
+      mode; statement caches are off and prepared statements get unique
+      names, since consecutive transactions may run on different servers
+    - null: NullPool, a new connection per checkout
+
+    auto (the default) is direct in development and null elsewhere, which
+    is safe behind any pooler; deployments that reach Postgres directly
+    should set DB_POOL_MODE=direct.
+    """
+    mode = (mode or settings.DB_POOL_MODE).lower()
+    if mode == "auto":
+        return "direct" if settings.ENVIRONMENT == "development" else "null"
+    if mode not in POOL_MODES:
+        raise ValueError(
+            f"Invalid DB_POOL_MODE '{mode}', expected auto or one of {POOL_MODES}"
+        )
+    return mode
+
+
+def _ssl_connect_arg():
     # Supabase (and many hosted Postgres providers) require SSL.
     # asyncpg expects an SSL context or True/False.
     # Using a CA bundle avoids CERTIFICATE_VERIFY_FAILED errors on some PaaS images.
@@ -28,28 +51,68 @@ if settings.ENVIRONMENT != "development":
         insecure_ctx = ssl.create_default_context()
         insecure_ctx.check_hostname = False
         insecure_ctx.verify_mode = ssl.CERT_NONE
-        _engine_kwargs["connect_args"]["ssl"] = insecure_ctx
         print("⚠️  DB_SSL_INSECURE=true: SSL certificate verification is DISABLED")
+        return insecure_ctx
+
+    if getattr(settings, "DB_SSL_CA_CERT_PEM", ""):
+        ctx = ssl.create_default_context()
+        ctx.load_verify_locations(cadata=settings.DB_SSL_CA_CERT_PEM)
+        return ctx
+
+    try:
+        import certifi
+
+        return ssl.create_default_context(cafile=certifi.where())
+    except Exception:
+        return True
+
+
+def _engine_kwargs(pool_mode: str) -> dict:
+    connect_args = {"timeout": settings.DB_CONNECT_TIMEOUT_SECONDS}
+    kwargs = {
+        "echo": settings.ENVIRONMENT == "development",
+        "future": True,
+        "pool_pre_ping": True,
+        "connect_args": connect_args,
+    }
+
+    if pool_mode == "direct":
+        connect_args["statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+        connect_args["prepared_statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+        kwargs["pool_size"] = settings.DB_POOL_SIZE
+        kwargs["max_overflow"] = settings.DB_MAX_OVERFLOW
+        kwargs["pool_timeout"] = settings.DB_POOL_TIMEOUT_SECONDS
+        kwargs["pool_recycle"] = settings.DB_POOL_RECYCLE_SECONDS
     else:
-        if getattr(settings, "DB_SSL_CA_CERT_PEM", ""):
-            ctx = ssl.create_default_context()
-            ctx.load_verify_locations(cadata=settings.DB_SSL_CA_CERT_PEM)
-            _engine_kwargs["connect_args"]["ssl"] = ctx
+        # Connection-level state like prepared statements is not reliable
+        # behind PgBouncer in transaction/statement pooling mode (common on Render)
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        if pool_mode == "pgbouncer":
+            connect_args["prepared_statement_name_func"] = (
+                lambda: f"__asyncpg_{uuid4()}__"
+            )
+            kwargs["pool_size"] = settings.DB_PGBOUNCER_POOL_SIZE
+            kwargs["max_overflow"] = settings.DB_PGBOUNCER_MAX_OVERFLOW
+            kwargs["pool_timeout"] = settings.DB_PGBOUNCER_POOL_TIMEOUT_SECONDS
+            kwargs["pool_recycle"] = settings.DB_PGBOUNCER_POOL_RECYCLE_SECONDS
         else:
-            try:
-                import certifi
+            kwargs["poolclass"] = NullPool
+
+    if settings.ENVIRONMENT != "development":
+        connect_args["ssl"] = _ssl_connect_arg()
+
+    return kwargs
 
-                _engine_kwargs["connect_args"]["ssl"] = ssl.create_default_context(
-                    cafile=certifi.where()
-                )
-            except Exception:
-                _engine_kwargs["connect_args"]["ssl"] = True
-    _engine_kwargs["poolclass"] = NullPool
-else:
-    _engine_kwargs["pool_size"] = 10
-    _engine_kwargs["max_overflow"] = 20
 
-engine = create_async_engine(settings.DATABASE_URL, **_engine_kwargs)
+def build_engine(url: str, pool_mode: str = None):
+    """Create an async engine for url in the given (or configured) pooling mode"""
+    return create_async_engine(url, **_engine_kwargs(resolve_pool_mode(pool_mode)))
+
+
+# Create async engine
+pool_mode = resolve_pool_mode()
+engine = build_engine(settings.DATABASE_URL, pool_mode)
 
 # Create async session factory
 AsyncSessionLocal = sessionmaker(
@@ -60,6 +123,101 @@ AsyncSessionLocal = sessionmaker(
     autoflush=False,
 )
 
+# Optional read replica for read-only endpoints (dashboards, reports, audit)
+read_engine = (
+    build_engine(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else None
+)
+AsyncReadSessionLocal = (
+    sessionmaker(
+        read_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+    if read_engine is not None
+    else None
+)
+
+# Seconds the replica is behind the primary; 0 when it has replayed all WAL
+# it received, so an idle primary does not read as lag
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+    """
+)
+
+_replica_state = {"usable": False, "lag_seconds": None, "checked_at": None}
+
+
+async def replica_status() -> dict:
+    """
+    Reachability and lag of the read replica, probed at most every
+    DB_READ_LAG_CHECK_SECONDS. The replica is usable while its lag is
+    within DB_READ_MAX_LAG_SECONDS.
+    """
+    if read_engine is None:
+        return {"configured": False, "usable": False, "lag_seconds": None}
+
+    checked_at = _replica_state["checked_at"]
+    now = time.monotonic()
+    if checked_at is None or now - checked_at >= settings.DB_READ_LAG_CHECK_SECONDS:
+        # Claim the probe first so concurrent requests keep the last result
+        _replica_state["checked_at"] = now
+        try:
+            async with read_engine.connect() as conn:
+                lag = float((await conn.execute(REPLICA_LAG_QUERY)).scalar() or 0)
+            _replica_state["lag_seconds"] = round(lag, 3)
+            _replica_state["usable"] = lag <= settings.DB_READ_MAX_LAG_SECONDS
+            if not _replica_state["usable"]:
+                logger.warning(
+                    f"Read replica lag {lag:.1f}s exceeds "
+                    f"{settings.DB_READ_MAX_LAG_SECONDS}s, reading from primary"
+                )
+        except Exception as e:
+            logger.warning(f"Read replica unavailable, reading from primary: {str(e)}")
+            _replica_state["lag_seconds"] = None
+            _replica_state["usable"] = False
+
+    return {
+        "configured": True,
+        "usable": _replica_state["usable"],
+        "lag_seconds": _replica_state["lag_seconds"],
+    }
+
+
+async def get_read_sessionmaker() -> sessionmaker:
+    """AsyncReadSessionLocal while the replica is usable, else AsyncSessionLocal"""
+    if AsyncReadSessionLocal is not None and (await replica_status())["usable"]:
+        return AsyncReadSessionLocal
+    return AsyncSessionLocal
+
+
+def use_worker_engine():
+    """
+    Rebind AsyncSessionLocal for a Celery worker process. Tasks run each
+    coroutine in a fresh event loop via asyncio.run, and pooled asyncpg
+    connections cannot cross event loops, so workers use
+    DB_WORKER_POOL_MODE (null by default).
+    """
+    global engine, read_engine, pool_mode
+
+    worker_mode = resolve_pool_mode(settings.DB_WORKER_POOL_MODE)
+    if worker_mode == pool_mode:
+        return
+    engine = build_engine(settings.DATABASE_URL, worker_mode)
+    AsyncSessionLocal.configure(bind=engine)
+    if read_engine is not None:
+        read_engine = build_engine(settings.DATABASE_READ_URL, worker_mode)
+        AsyncReadSessionLocal.configure(bind=read_engine)
+    pool_mode = worker_mode
+
 
 async def get_db() -> AsyncSession:
     """Dependency for getting async database session"""
@@ -72,3 +230,17 @@ async def get_db() -> AsyncSession:
             raise
         finally:
             await session.close()
+
+
+async def get_read_db() -> AsyncSession:
+    """
+    Dependency for read-only endpoints: a session on the read replica
+    when DATABASE_READ_URL is set and the replica is within the lag limit,
+    otherwise on the primary. Nothing is committed.
+    """
+    session_factory = await get_read_sessionmaker()
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -12,8 +12,9 @@ from sqlalchemy import text
 from sqlalchemy.engine.url import make_url
 
 from app.core.config import settings
+from app.core.security import password_hash_metrics
 from app.api.v1.api import api_router
-from app.db.session import engine
+from app.db.session import engine, pool_mode, replica_status
 from app.db.base import Base
 
 # Create FastAPI app
@@ -53,6 +54,7 @@ app.add_middleware(
     allow_credentials=allow_credentials,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include API router
@@ -116,6 +118,12 @@ async def health_check():
     )
 
 
+@app.get("/health/password-hashing", tags=["Health"])
+async def health_password_hashing():
+    """Queue depth and throughput of the bcrypt hashing pool"""
+    return password_hash_metrics()
+
+
 @app.get("/health/db", tags=["Health"])
 async def health_db_check():
     """Database connectivity health check."""
@@ -127,6 +135,9 @@ async def health_db_check():
             content={
                 "status": "healthy",
                 "database": "connected",
+                "pool_mode": pool_mode,
+                "pool": engine.pool.status(),
+                "replica": await replica_status(),
                 "timestamp": datetime.utcnow().isoformat(),
             },
         )
@@ -7,7 +7,15 @@ from app.models.user import User, Branch
 from app.models.loan import Loan, LoanTypeConfig, EMISchedule
 from app.models.payment import Payment
 from app.models.notification import Notification, NotificationTemplate
-from app.models.loan_ledger import LoanLedger, AccrualJob, CalculationCache, AuditLog
+from app.models.loan_ledger import (
+    LoanLedger,
+    LoanBalanceSnapshot,
+    AccrualJob,
+    CalculationCache,
+    AuditLog,
+)
+from app.models.portfolio_summary import PortfolioDailySummary, PortfolioSummaryVersion
+from app.models.report_job import ReportJob
 
 __all__ = [
     "Base",
@@ -18,9 +26,13 @@ __all__ = [
     "EMISchedule",
     "Payment",
     "LoanLedger",
+    "LoanBalanceSnapshot",
     "Notification",
     "NotificationTemplate",
     "AccrualJob",
     "CalculationCache",
     "AuditLog",
+    "PortfolioDailySummary",
+    "PortfolioSummaryVersion",
+    "ReportJob",
 ]
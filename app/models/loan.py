@@ -13,6 +13,8 @@ from sqlalchemy import (
     Date,
     DateTime,
     Text,
+    Index,
+    text,
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime, date
@@ -149,6 +151,13 @@ class Loan(Base, TimestampMixin):
         "EMISchedule", back_populates="loan", cascade="all, delete-orphan"
     )
 
+    # Keyset pagination of the loan listing, overall and per role scope
+    __table_args__ = (
+        Index("ix_loans_created_at_id", "created_at", "id"),
+        Index("ix_loans_branch_created_at_id", "branch_id", "created_at", "id"),
+        Index("ix_loans_farmer_created_at_id", "farmer_id", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<Loan {self.loan_number} - {self.loan_type}>"
 
@@ -223,5 +232,30 @@ class EMISchedule(Base, TimestampMixin):
     overdue_days = Column(Integer, default=0)
     penal_interest = Column(Float, default=0.0)
 
+    __table_args__ = (
+        # Per-loan schedule reads (payment allocation, calculator, accrual)
+        Index("ix_emi_schedules_loan_due_date", "loan_id", "due_date"),
+        # Overdue sweep: unpaid EMIs walked in id order
+        Index(
+            "ix_emi_schedules_unpaid_id",
+            "id",
+            postgresql_include=["due_date", "loan_id"],
+            postgresql_where=text("is_paid = false"),
+        ),
+        # Overdue summary and per-loan overdue EMIs, answered from the index
+        Index(
+            "ix_emi_schedules_overdue_loan",
+            "loan_id",
+            "due_date",
+            postgresql_include=[
+                "emi_amount",
+                "paid_amount",
+                "penal_interest",
+                "overdue_days",
+            ],
+            postgresql_where=text("is_overdue = true AND is_paid = false"),
+        ),
+    )
+
     def __repr__(self):
         return f"<EMI {self.loan.loan_number} - Installment {self.installment_number}>"
@@ -12,6 +12,9 @@ from sqlalchemy import (
     Date,
     ForeignKey,
     Text,
+    Index,
+    DDL,
+    event,
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -27,11 +30,13 @@ class LoanLedger(Base):
 
     __tablename__ = "loan_ledgers"
 
-    id = Column(Integer, primary_key=True, index=True)
+    # Range partitioned by month on transaction_date, which therefore has
+    # to be part of the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     loan_id = Column(Integer, ForeignKey("loans.id"), nullable=False, index=True)
 
     # Transaction details
-    transaction_date = Column(Date, nullable=False, index=True)
+    transaction_date = Column(Date, primary_key=True, nullable=False, index=True)
     transaction_type = Column(
         String(50), nullable=False
     )  # ACCRUAL, PAYMENT, RATE_CHANGE, etc.
@@ -60,6 +65,40 @@ class LoanLedger(Base):
     # Relationships
     loan = relationship("Loan", back_populates="ledger_entries")
 
+    __table_args__ = (
+        # Ledger lookups by loan and day, and latest balance before a date
+        # (backward scan in (transaction_date, id) order); the included
+        # columns let these be answered without touching the heap
+        Index(
+            "ix_loan_ledgers_loan_date_id",
+            "loan_id",
+            "transaction_date",
+            "id",
+            postgresql_include=["transaction_type", "debit_amount", "balance"],
+        ),
+        {"postgresql_partition_by": "RANGE (transaction_date)"},
+    )
+
+
+class LoanBalanceSnapshot(Base):
+    """
+    Current running balance per loan: the balance of the loan's latest
+    ledger entry, kept in the same transaction as every ledger insert so
+    accrual and payment posting read it by primary key
+    """
+
+    __tablename__ = "loan_balance_snapshot"
+
+    loan_id = Column(Integer, ForeignKey("loans.id"), primary_key=True)
+    balance = Column(Numeric(15, 2), nullable=False)
+
+    # Date of the ledger entry the balance is taken from
+    last_transaction_date = Column(Date, nullable=False)
+    last_accrual_date = Column(Date)
+    last_payment_id = Column(Integer)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 
 class AccrualJob(Base):
     """
@@ -84,7 +123,13 @@ class AccrualJob(Base):
     loans_processed = Column(Integer, default=0)
     total_accrual_amount = Column(Numeric(15, 2), default=0)
     errors_count = Column(Integer, default=0)
-    error_details = Column(Text)
+    error_details = Column(Text)  # JSON list of per-loan errors
+    failure_reason = Column(Text)  # Error that stopped a failed run
+
+    # Checkpoint for chunked, resumable runs
+    chunk_size = Column(Integer)
+    chunks_completed = Column(Integer, default=0)
+    last_loan_id = Column(Integer)  # Highest loan id of the last committed chunk
 
     # Timing
     started_at = Column(DateTime)
@@ -136,7 +181,8 @@ class AuditLog(Base):
 
     __tablename__ = "audit_logs"
 
-    id = Column(Integer, primary_key=True, index=True)
+    # Range partitioned by month on created_at (part of the primary key)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
 
     # Actor
     actor_type = Column(String(20), nullable=False)  # user, system, worker
@@ -162,4 +208,24 @@ class AuditLog(Base):
     extra_data = Column(Text)  # JSON for additional context
 
     # Timestamp
-    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    created_at = Column(
+        DateTime, primary_key=True, default=datetime.utcnow, index=True
+    )
+
+    # Keyset pagination of the audit listing
+    __table_args__ = (
+        Index("ix_audit_logs_created_at_id", "created_at", "id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+
+# Monthly partitions are created by PartitionService; the DEFAULT partition
+# takes rows outside them, so tables built with create_all accept inserts
+for _partitioned in (LoanLedger.__table__, AuditLog.__table__):
+    event.listen(
+        _partitioned,
+        "after_create",
+        DDL("CREATE TABLE %(table)s_default PARTITION OF %(table)s DEFAULT").execute_if(
+            dialect="postgresql"
+        ),
+    )
@@ -13,6 +13,7 @@ from sqlalchemy import (
     Text,
     Enum as SQLEnum,
     Boolean,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -111,5 +112,16 @@ class Payment(Base, TimestampMixin):
     is_reconciled = Column(Boolean, default=False)
     reconciled_date = Column(DateTime, nullable=True)
 
+    # Payments per loan by date (calculator history, accrual payment totals)
+    __table_args__ = (
+        Index(
+            "ix_payments_loan_date",
+            "loan_id",
+            "payment_date",
+            "id",
+            postgresql_include=["amount", "status"],
+        ),
+    )
+
     def __repr__(self):
         return f"<Payment {self.transaction_id} - ₹{self.amount}>"
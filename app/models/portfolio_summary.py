@@ -0,0 +1,77 @@
+"""
+Portfolio Daily Summary Model
+Materialized dashboard aggregates, one row per branch per day
+"""
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    BigInteger,
+    Numeric,
+    DateTime,
+    Date,
+    ForeignKey,
+    Text,
+    Index,
+)
+from datetime import datetime
+
+from app.db.base import Base
+
+
+class PortfolioDailySummary(Base):
+    """
+    Dashboard overview aggregates for a branch on a day.
+    The row with branch_id NULL covers the whole portfolio.
+    source_version is the PortfolioSummaryVersion the row was computed
+    from; readers refresh a row whose branch versions have moved on.
+    """
+
+    __tablename__ = "portfolio_daily_summary"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    summary_date = Column(Date, nullable=False)
+    branch_id = Column(Integer, ForeignKey("branches.id"), nullable=True)
+
+    # Loan counts
+    total_loans = Column(Integer, default=0)
+    pending_approvals = Column(Integer, default=0)
+    active_loans = Column(Integer, default=0)
+    overdue_loans = Column(Integer, default=0)
+    recent_loans_30_days = Column(Integer, default=0)
+
+    # Amounts
+    total_outstanding = Column(Numeric(18, 2), default=0)
+    disbursed_this_month_count = Column(Integer, default=0)
+    disbursed_this_month_amount = Column(Numeric(18, 2), default=0)
+
+    # People
+    total_farmers = Column(Integer, default=0)
+    total_users = Column(Integer, default=0)
+    total_branches = Column(Integer, default=0)
+
+    # Breakdowns
+    status_breakdown = Column(Text)  # JSON object: status -> count
+    loans_by_type = Column(Text)  # JSON array: loan_type, count, total_amount
+
+    # Freshness
+    source_version = Column(BigInteger, default=0)
+    refreshed_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_portfolio_daily_summary_date_branch", "summary_date", "branch_id"),
+    )
+
+
+class PortfolioSummaryVersion(Base):
+    """
+    Write counter per branch, bumped after every committed loan or payment
+    write. branch_key 0 counts loans without a branch. Each writer touches
+    only its own branch's row, in its own short transaction.
+    """
+
+    __tablename__ = "portfolio_summary_versions"
+
+    branch_key = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,61 @@
+"""
+Report Job Model
+Background report exports and their on-disk artifacts
+"""
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DateTime,
+    ForeignKey,
+    Text,
+    BigInteger,
+    Index,
+)
+from datetime import datetime
+
+from app.db.base import Base
+
+
+class ReportJob(Base):
+    """
+    A report export run off the request path by a Celery worker.
+    Jobs with the same request_hash share one artifact while it is
+    pending, running, or completed and not yet expired.
+    """
+
+    __tablename__ = "report_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Request
+    report_type = Column(String(50), nullable=False)  # loans_export, monthly_report, emi_schedules
+    params_json = Column(Text)  # JSON of report parameters, including branch scope
+    request_hash = Column(String(64), nullable=False)
+    requested_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    # Status
+    status = Column(
+        String(20), default="pending"
+    )  # pending, running, completed, failed, expired
+    progress = Column(Integer, default=0)  # Percent complete
+    rows_total = Column(Integer)
+    rows_written = Column(Integer, default=0)
+    error_message = Column(Text)
+
+    # Artifact (gzip-compressed)
+    file_path = Column(String(500))
+    file_name = Column(String(255))
+    file_size = Column(BigInteger)
+
+    # Timing
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    completed_at = Column(DateTime)
+    expires_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_report_jobs_request_hash_status", "request_hash", "status"),
+        Index("ix_report_jobs_expires_at", "expires_at"),
+    )
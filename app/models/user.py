@@ -10,6 +10,7 @@ from sqlalchemy import (
     Enum as SQLEnum,
     ForeignKey,
     DateTime,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -70,6 +71,9 @@ class User(Base, TimestampMixin):
     # Last login
     last_login = Column(DateTime, nullable=True)
 
+    # Bumped on password change; tokens carrying an older version are rejected
+    token_version = Column(Integer, nullable=False, default=0)
+
     # Relationships
     branch = relationship(
         "Branch", back_populates="employees", foreign_keys=[branch_id]
@@ -80,6 +84,9 @@ class User(Base, TimestampMixin):
     )
     notifications = relationship("Notification", back_populates="user")
 
+    # Keyset pagination of the user listing
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),)
+
     def __repr__(self):
         return f"<User {self.email} ({self.role})>"
 
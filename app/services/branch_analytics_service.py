@@ -0,0 +1,347 @@
+"""
+Branch analytics service
+Set-based multi-branch metrics, cached and refreshed on a schedule
+"""
+
+import heapq
+import json
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, func, case, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from redis.asyncio.client import Redis as RedisClient
+from redis.asyncio import from_url as redis_from_url
+
+from app.models.loan import Loan, LoanStatus, EMISchedule
+from app.models.payment import Payment, PaymentStatus
+from app.models.user import User, UserRole, Branch
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BranchAnalyticsService:
+    """
+    All-branch analytics in five grouped queries (branches, loans,
+    collections, NPA, users) joined on branch_id in memory.
+    The result is cached in Redis (or in-process without Redis) and
+    refreshed by the app.tasks.reports.refresh_branch_analytics beat task.
+    """
+
+    CACHE_KEY = "analytics:branches"
+
+    _redis: Optional[RedisClient] = None
+    _cached: Optional[Dict] = None
+    _cached_at: Optional[datetime] = None
+
+    @classmethod
+    async def _get_redis(cls) -> Optional[RedisClient]:
+        if not settings.REDIS_URL:
+            return None
+
+        if cls._redis is None:
+            try:
+                cls._redis = redis_from_url(settings.REDIS_URL, decode_responses=True)
+            except Exception:
+                cls._redis = None
+        return cls._redis
+
+    @classmethod
+    async def get(cls, db: AsyncSession, refresh: bool = False) -> Dict:
+        """Cached analytics, recomputed when missing, expired or forced"""
+        if not refresh:
+            cached = await cls._read_cache()
+            if cached is not None:
+                return cached
+        return await cls.refresh(db)
+
+    @classmethod
+    async def refresh(cls, db: AsyncSession) -> Dict:
+        """Recompute analytics for every branch and store them in the cache"""
+        analytics = await cls.compute(db)
+        await cls._write_cache(analytics)
+        return analytics
+
+    @classmethod
+    async def _read_cache(cls) -> Optional[Dict]:
+        redis = await cls._get_redis()
+        if redis is not None:
+            try:
+                payload = await redis.get(cls.CACHE_KEY)
+                return json.loads(payload) if payload else None
+            except Exception as e:
+                logger.warning(f"Branch analytics cache read failed: {str(e)}")
+                cls._redis = None
+
+        ttl = timedelta(seconds=settings.BRANCH_ANALYTICS_CACHE_TTL_SECONDS)
+        if cls._cached is not None and datetime.utcnow() - cls._cached_at < ttl:
+            return cls._cached
+        return None
+
+    @classmethod
+    async def _write_cache(cls, analytics: Dict):
+        cls._cached = analytics
+        cls._cached_at = datetime.utcnow()
+
+        redis = await cls._get_redis()
+        if redis is not None:
+            try:
+                await redis.set(
+                    cls.CACHE_KEY,
+                    json.dumps(analytics, default=str),
+                    ex=settings.BRANCH_ANALYTICS_CACHE_TTL_SECONDS,
+                )
+            except Exception as e:
+                logger.warning(f"Branch analytics cache write failed: {str(e)}")
+                cls._redis = None
+
+    @staticmethod
+    async def compute(db: AsyncSession) -> Dict:
+        """Metrics for all branches, system totals and top-5 rankings"""
+        month_start = datetime.now().replace(
+            day=1, hour=0, minute=0, second=0, microsecond=0
+        )
+        npa_threshold = date.today() - timedelta(days=90)
+
+        # Branches with their manager's name
+        Manager = aliased(User)
+        result = await db.execute(
+            select(Branch, Manager.full_name.label("manager_name"))
+            .outerjoin(Manager, Branch.manager_id == Manager.id)
+            .order_by(Branch.id)
+        )
+        branches = result.all()
+
+        # Loan statistics per branch
+        result = await db.execute(
+            select(
+                Loan.branch_id,
+                func.count(Loan.id).label("total_loans"),
+                func.count(
+                    case((Loan.status == LoanStatus.PENDING_APPROVAL, 1))
+                ).label("pending"),
+                func.count(case((Loan.status == LoanStatus.APPROVED, 1))).label(
+                    "approved"
+                ),
+                func.count(case((Loan.status == LoanStatus.ACTIVE, 1))).label("active"),
+                func.count(case((Loan.status == LoanStatus.CLOSED, 1))).label("closed"),
+                func.count(case((Loan.status == LoanStatus.REJECTED, 1))).label(
+                    "rejected"
+                ),
+                func.sum(Loan.principal_amount).label("total_principal"),
+                func.sum(Loan.total_outstanding).label("outstanding_balance"),
+            ).group_by(Loan.branch_id)
+        )
+        loan_stats = {row.branch_id: row for row in result.all()}
+
+        # Collections this month per branch
+        result = await db.execute(
+            select(
+                Loan.branch_id,
+                func.count(Payment.id).label("payment_count"),
+                func.sum(Payment.amount).label("total_collected"),
+            )
+            .join(Loan, Payment.loan_id == Loan.id)
+            .where(
+                and_(
+                    Payment.status == PaymentStatus.SUCCESS,
+                    Payment.created_at >= month_start,
+                )
+            )
+            .group_by(Loan.branch_id)
+        )
+        collection_stats = {row.branch_id: row for row in result.all()}
+
+        # NPA per branch: active loans with an EMI unpaid for over 90 days
+        npa_loans = select(EMISchedule.loan_id).where(
+            and_(EMISchedule.is_paid == False, EMISchedule.due_date < npa_threshold)
+        )
+        result = await db.execute(
+            select(
+                Loan.branch_id,
+                func.count(Loan.id).label("npa_count"),
+                func.sum(Loan.total_outstanding).label("npa_amount"),
+            )
+            .where(and_(Loan.status == LoanStatus.ACTIVE, Loan.id.in_(npa_loans)))
+            .group_by(Loan.branch_id)
+        )
+        npa_stats = {row.branch_id: row for row in result.all()}
+
+        # Farmers and employees per branch
+        result = await db.execute(
+            select(
+                User.branch_id,
+                func.count(case((User.role == UserRole.FARMER, 1))).label("farmers"),
+                func.count(case((User.role == UserRole.EMPLOYEE, 1))).label(
+                    "employees"
+                ),
+            )
+            .where(User.branch_id.isnot(None))
+            .group_by(User.branch_id)
+        )
+        user_stats = {row.branch_id: row for row in result.all()}
+
+        branch_analytics = [
+            BranchAnalyticsService._branch_metrics(
+                branch,
+                manager_name,
+                loan_stats.get(branch.id),
+                collection_stats.get(branch.id),
+                npa_stats.get(branch.id),
+                user_stats.get(branch.id),
+            )
+            for branch, manager_name in branches
+        ]
+
+        total_loans = sum(b["loan_statistics"]["total_loans"] for b in branch_analytics)
+        total_outstanding = sum(
+            b["loan_statistics"]["outstanding_balance"] for b in branch_analytics
+        )
+        total_collections = sum(
+            b["collection_statistics"]["this_month_amount"] for b in branch_analytics
+        )
+        total_npa = sum(b["npa_statistics"]["npa_amount"] for b in branch_analytics)
+
+        return {
+            "branch_count": len(branches),
+            "branches": branch_analytics,
+            "system_totals": {
+                "total_loans": total_loans,
+                "total_outstanding": round(total_outstanding, 2),
+                "total_collections_this_month": round(total_collections, 2),
+                "total_npa": round(total_npa, 2),
+                "system_npa_percentage": round(
+                    (total_npa / total_outstanding * 100)
+                    if total_outstanding > 0
+                    else 0,
+                    2,
+                ),
+            },
+            "rankings": BranchAnalyticsService._rankings(branch_analytics),
+            "generated_at": datetime.now().isoformat(),
+        }
+
+    @staticmethod
+    def _branch_metrics(branch, manager_name, loans, collections, npa, users) -> Dict:
+        total_loans = loans.total_loans if loans else 0
+        active_loans = loans.active if loans else 0
+        total_outstanding = float(loans.outstanding_balance or 0) if loans else 0.0
+        total_collected = float(collections.total_collected or 0) if collections else 0.0
+        npa_amount = float(npa.npa_amount or 0) if npa else 0.0
+        farmer_count = users.farmers if users else 0
+        employee_count = users.employees if users else 0
+
+        npa_percentage = (
+            (npa_amount / total_outstanding * 100) if total_outstanding > 0 else 0
+        )
+        loans_per_employee = total_loans / employee_count if employee_count > 0 else 0
+        farmers_per_employee = (
+            farmer_count / employee_count if employee_count > 0 else 0
+        )
+        avg_loan_size = total_outstanding / active_loans if active_loans else 0
+
+        # Collection efficiency (collections vs outstanding)
+        collection_efficiency = (
+            (total_collected / total_outstanding * 100) if total_outstanding > 0 else 0
+        )
+
+        return {
+            "branch_id": branch.id,
+            "branch_name": branch.name,
+            "branch_code": branch.code,
+            "location": {
+                "address": branch.address,
+                "city": branch.district,
+                "state": branch.state,
+                "pincode": branch.pincode,
+            },
+            "contact": {
+                "phone": branch.contact_number,
+                "email": branch.email,
+                "manager": manager_name,
+            },
+            "loan_statistics": {
+                "total_loans": total_loans,
+                "pending": loans.pending if loans else 0,
+                "approved": loans.approved if loans else 0,
+                "active": active_loans,
+                "closed": loans.closed if loans else 0,
+                "rejected": loans.rejected if loans else 0,
+                "total_principal": float(loans.total_principal or 0) if loans else 0.0,
+                "outstanding_balance": total_outstanding,
+            },
+            "collection_statistics": {
+                "this_month_count": collections.payment_count if collections else 0,
+                "this_month_amount": total_collected,
+                "collection_efficiency": round(collection_efficiency, 2),
+            },
+            "npa_statistics": {
+                "npa_count": npa.npa_count if npa else 0,
+                "npa_amount": npa_amount,
+                "npa_percentage": round(npa_percentage, 2),
+            },
+            "resource_statistics": {
+                "farmer_count": farmer_count,
+                "employee_count": employee_count,
+                "loans_per_employee": round(loans_per_employee, 2),
+                "farmers_per_employee": round(farmers_per_employee, 2),
+                "avg_loan_size": round(avg_loan_size, 2),
+            },
+            "status": {
+                "is_active": branch.is_active,
+                "created_at": (
+                    branch.created_at.isoformat() if branch.created_at else None
+                ),
+            },
+        }
+
+    @staticmethod
+    def _rankings(branch_analytics: List[Dict]) -> Dict:
+        """Top-5 branches by outstanding, collections and NPA"""
+        top_by_outstanding = heapq.nlargest(
+            5,
+            branch_analytics,
+            key=lambda x: x["loan_statistics"]["outstanding_balance"],
+        )
+        top_by_collections = heapq.nlargest(
+            5,
+            branch_analytics,
+            key=lambda x: x["collection_statistics"]["this_month_amount"],
+        )
+        best_by_npa = heapq.nsmallest(
+            5, branch_analytics, key=lambda x: x["npa_statistics"]["npa_percentage"]
+        )
+
+        return {
+            "top_by_outstanding": [
+                {
+                    "rank": idx + 1,
+                    "branch_id": b["branch_id"],
+                    "branch_name": b["branch_name"],
+                    "outstanding": b["loan_statistics"]["outstanding_balance"],
+                }
+                for idx, b in enumerate(top_by_outstanding)
+            ],
+            "top_by_collections": [
+                {
+                    "rank": idx + 1,
+                    "branch_id": b["branch_id"],
+                    "branch_name": b["branch_name"],
+                    "collections": b["collection_statistics"]["this_month_amount"],
+                }
+                for idx, b in enumerate(top_by_collections)
+            ],
+            "best_by_npa": [
+                {
+                    "rank": idx + 1,
+                    "branch_id": b["branch_id"],
+                    "branch_name": b["branch_name"],
+                    "npa_percentage": b["npa_statistics"]["npa_percentage"],
+                }
+                for idx, b in enumerate(best_by_npa)
+            ],
+        }
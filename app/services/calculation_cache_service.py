@@ -0,0 +1,162 @@
+"""
+Redis calculation cache shared across workers
+Generation-tagged keys make per-loan invalidation O(1)
+"""
+
+import json
+import logging
+import time
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+
+from redis.asyncio.client import Redis as RedisClient
+from redis.asyncio import from_url as redis_from_url
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CalculationCacheService:
+    """
+    Smart calculator results in Redis.
+
+    Every loan has a generation counter at ``calc:loan:{id}:gen``. Values are
+    stored under ``calc:loan:{id}:g{generation}:{type}:{as_of_date}``, so
+    invalidating a loan is a single INCR: old entries become unreachable and
+    expire on their TTL (or are evicted first under volatile-lru).
+    Redis failures degrade to a cache miss, never to an error.
+    """
+
+    _redis: Optional[RedisClient] = None
+
+    def __init__(self, redis_client: Optional[RedisClient] = None):
+        self._client = redis_client
+
+    @classmethod
+    def _use_redis(cls) -> bool:
+        return bool(settings.REDIS_URL) and settings.CALC_REDIS_CACHE_ENABLED
+
+    async def _get_redis(self) -> Optional[RedisClient]:
+        if self._client is not None:
+            return self._client
+
+        if not self._use_redis():
+            return None
+
+        cls = type(self)
+        if cls._redis is None:
+            try:
+                cls._redis = redis_from_url(settings.REDIS_URL, decode_responses=True)
+            except Exception:
+                cls._redis = None
+        return cls._redis
+
+    def _drop_redis(self):
+        if self._client is None:
+            type(self)._redis = None
+
+    @staticmethod
+    def _generation_key(loan_id: int) -> str:
+        return f"calc:loan:{loan_id}:gen"
+
+    @staticmethod
+    def _value_key(
+        loan_id: int, generation: int, calculation_type: str, as_of_date: date
+    ) -> str:
+        return (
+            f"calc:loan:{loan_id}:g{generation}:{calculation_type}:"
+            f"{as_of_date.isoformat()}"
+        )
+
+    @staticmethod
+    def _generation_seed() -> int:
+        # A counter that was evicted or never set restarts from the clock,
+        # so it can't land back on a generation that still has live values
+        return int(time.time() * 1000)
+
+    async def _get_generation(self, redis: RedisClient, loan_id: int) -> int:
+        key = self._generation_key(loan_id)
+        generation = await redis.get(key)
+        if generation is None:
+            await redis.set(key, self._generation_seed(), nx=True)
+            generation = await redis.get(key)
+        return int(generation)
+
+    async def get(
+        self, loan_id: int, as_of_date: date, calculation_type: str
+    ) -> Tuple[Optional[int], Optional[Dict]]:
+        """
+        Current generation of the loan and the cached result for it (or None).
+        Pass the generation back to set() so a result computed from rows read
+        before a concurrent invalidation is stored under the old generation.
+        """
+        redis = await self._get_redis()
+        if redis is None:
+            return None, None
+
+        try:
+            generation = await self._get_generation(redis, loan_id)
+            payload = await redis.get(
+                self._value_key(loan_id, generation, calculation_type, as_of_date)
+            )
+        except Exception as e:
+            logger.warning(f"Calculation cache read failed: {str(e)}")
+            self._drop_redis()
+            return None, None
+
+        return generation, json.loads(payload) if payload else None
+
+    async def set(
+        self,
+        loan_id: int,
+        as_of_date: date,
+        calculation_type: str,
+        value: Dict,
+        generation: Optional[int] = None,
+    ):
+        """Store a result under the given (default: current) generation"""
+        redis = await self._get_redis()
+        if redis is None:
+            return
+
+        payload = json.dumps(value, default=str)
+        if len(payload) > settings.CALC_REDIS_CACHE_MAX_ENTRY_BYTES:
+            return
+
+        try:
+            if generation is None:
+                generation = await self._get_generation(redis, loan_id)
+            await redis.set(
+                self._value_key(loan_id, generation, calculation_type, as_of_date),
+                payload,
+                ex=settings.CALC_REDIS_CACHE_TTL_SECONDS,
+            )
+        except Exception as e:
+            logger.warning(f"Calculation cache write failed: {str(e)}")
+            self._drop_redis()
+
+    async def invalidate_loan(self, loan_id: int):
+        """Invalidate every cached result for a loan"""
+        await self.invalidate_loans([loan_id])
+
+    async def invalidate_loans(self, loan_ids: Iterable[int]):
+        """Bump the generation of many loans in one round trip"""
+        loan_ids = list(loan_ids)
+        if not loan_ids:
+            return
+
+        redis = await self._get_redis()
+        if redis is None:
+            return
+
+        try:
+            pipe = redis.pipeline(transaction=False)
+            seed = self._generation_seed()
+            for loan_id in loan_ids:
+                pipe.set(self._generation_key(loan_id), seed, nx=True)
+                pipe.incr(self._generation_key(loan_id))
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Calculation cache invalidation failed: {str(e)}")
+            self._drop_redis()
@@ -5,10 +5,10 @@ Runs as scheduled job (cron/worker)
 """
 
 from datetime import datetime, date, timedelta
-from decimal import Decimal
-from typing import List, Dict
+from decimal import Decimal, ROUND_HALF_UP
+from typing import List, Dict, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, func, insert
 import logging
 import hashlib
 import json
@@ -16,10 +16,16 @@ import json
 from app.models.loan import Loan, LoanStatus
 from app.models.payment import Payment
 from app.models.loan_ledger import LoanLedger, AccrualJob, AuditLog
+from app.core.config import settings
 from app.services.smart_calculator import SmartCalculator
+from app.services.loan_balance_service import LoanBalanceService
+from app.services.portfolio_summary_service import PortfolioSummaryService
 
 logger = logging.getLogger(__name__)
 
+# Loan statuses that accrue daily interest
+ACCRUING_STATUSES = [LoanStatus.APPROVED, LoanStatus.ACTIVE]
+
 
 class DailyAccrualService:
     """
@@ -32,12 +38,27 @@ class DailyAccrualService:
         self.redis = redis_client
         self.calculator = SmartCalculator(db, redis_client)
 
-    async def run_daily_accrual(self, accrual_date: date = None) -> Dict:
+        # Loans posted to since the last commit; their cached results are
+        # invalidated only once the commit lands, so a concurrent reader
+        # can't cache pre-commit rows under the new generation
+        self._accrued_loan_ids: set = set()
+
+    async def run_daily_accrual(
+        self, accrual_date: date = None, bulk: bool = True, chunk_size: int = None
+    ) -> Dict:
         """
         Main entry point for daily accrual job
         Processes all active loans and posts ledger entries
+
+        Loans are processed in loan-id ranges of chunk_size, each committed
+        with a checkpoint on the AccrualJob, so a failed or interrupted run
+        resumes after the last finished chunk instead of starting over.
+
+        bulk=True uses the set-based engine (a few queries and one multi-row
+        insert per chunk); bulk=False walks loans one by one
         """
         accrual_date = accrual_date or date.today()
+        chunk_size = chunk_size or settings.ACCRUAL_CHUNK_SIZE
 
         # Check if already processed (idempotency)
         existing_job = await self._get_job_for_date(accrual_date)
@@ -51,44 +72,69 @@ class DailyAccrualService:
 
         # Create or update job record
         job = await self._create_or_update_job(accrual_date, "running")
+        resumed_from = job.last_loan_id
+        errors = self._load_job_errors(job) if resumed_from else []
+
+        if resumed_from:
+            logger.info(
+                f"Resuming accrual for {accrual_date} after loan {resumed_from}"
+            )
+        else:
+            job.job_type = "DAILY_ACCRUAL"
+            job.loans_processed = 0
+            job.total_accrual_amount = Decimal(0)
+            job.chunks_completed = 0
+            job.errors_count = 0
+            job.error_details = None
+        job.chunk_size = chunk_size
+        await self.db.commit()
 
         try:
-            # Get all active loans
-            active_loans = await self._get_active_loans()
-
-            total_accrual = Decimal(0)
-            processed_count = 0
-            errors = []
-
-            # Process each loan
-            for loan in active_loans:
-                try:
-                    accrual_amount = await self._accrue_interest_for_loan(
-                        loan, accrual_date
+            while True:
+                after_id = job.last_loan_id or 0
+                chunk_end = await self._get_chunk_end(accrual_date, after_id, chunk_size)
+                if chunk_end is None:
+                    break
+
+                id_range = (after_id, chunk_end)
+                if bulk:
+                    processed_count, chunk_accrual, chunk_errors = (
+                        await self._run_bulk_accrual(accrual_date, id_range)
+                    )
+                else:
+                    processed_count, chunk_accrual, chunk_errors = (
+                        await self._run_per_loan_accrual(accrual_date, id_range)
                     )
-                    total_accrual += accrual_amount
-                    processed_count += 1
 
-                except Exception as e:
-                    logger.error(f"Error accruing for loan {loan.id}: {str(e)}")
-                    errors.append({"loan_id": loan.id, "error": str(e)})
+                # Checkpoint the chunk together with its ledger rows
+                errors.extend(chunk_errors)
+                job.last_loan_id = chunk_end
+                job.chunks_completed = (job.chunks_completed or 0) + 1
+                job.loans_processed = (job.loans_processed or 0) + processed_count
+                job.total_accrual_amount = (
+                    job.total_accrual_amount or Decimal(0)
+                ) + chunk_accrual
+                job.errors_count = len(errors)
+                job.error_details = json.dumps(errors) if errors else None
+                await self.db.commit()
+                await self.invalidate_posted_loans()
 
             # Update job as completed
             job.status = "completed"
-            job.loans_processed = processed_count
-            job.total_accrual_amount = total_accrual
-            job.errors_count = len(errors)
-            job.error_details = json.dumps(errors) if errors else None
             job.completed_at = datetime.utcnow()
             job.duration_seconds = (job.completed_at - job.started_at).total_seconds()
 
+            # Rebuild today's dashboard summary after the nightly run
+            await PortfolioSummaryService.refresh(self.db)
             await self.db.commit()
 
+            total_accrual = job.total_accrual_amount or Decimal(0)
+
             # Log audit entry
             await self._log_audit(
                 actor_type="system",
                 action="DAILY_ACCRUAL",
-                description=f"Processed {processed_count} loans, total accrual: ₹{total_accrual}",
+                description=f"Processed {job.loans_processed} loans, total accrual: ₹{total_accrual}",
                 metadata={"job_id": job.id, "accrual_date": accrual_date.isoformat()},
             )
 
@@ -96,21 +142,541 @@ class DailyAccrualService:
                 "status": "completed",
                 "job_id": job.id,
                 "accrual_date": accrual_date.isoformat(),
-                "loans_processed": processed_count,
+                "loans_processed": job.loans_processed,
                 "total_accrual": float(total_accrual),
+                "chunks_completed": job.chunks_completed,
+                "resumed_from_loan_id": resumed_from,
                 "errors": errors,
             }
 
         except Exception as e:
-            # Mark job as failed
+            # Drop the unfinished chunk; earlier chunks stay committed
+            await self.db.rollback()
+            self._accrued_loan_ids.clear()
+
+            # Mark job as failed, keeping the checkpoint for the next run
+            job = await self._get_job_for_date(accrual_date)
             job.status = "failed"
-            job.error_details = str(e)
+            job.failure_reason = str(e)
             job.completed_at = datetime.utcnow()
             await self.db.commit()
 
-            logger.error(f"Daily accrual failed: {str(e)}")
+            logger.error(
+                f"Daily accrual failed after loan {job.last_loan_id}: {str(e)}"
+            )
             raise
 
+    # ==================== MULTI-DAY CATCH-UP ====================
+
+    async def catch_up_accrual(
+        self, from_date: date, to_date: date = None, chunk_size: int = None
+    ) -> Dict:
+        """
+        Backfill DAILY_ACCRUAL entries for every day in [from_date, to_date]
+        in one pass over the portfolio instead of one run per missed day
+
+        Each loan's range is split at its rate-switch date and payment dates;
+        daily interest is computed once per segment and the per-day ledger
+        rows are posted with one multi-row insert per loan-id chunk. Days
+        whose AccrualJob is already completed are left untouched.
+        """
+        to_date = to_date or date.today()
+        chunk_size = chunk_size or settings.ACCRUAL_CHUNK_SIZE
+        if from_date > to_date:
+            raise ValueError("from_date must be on or before to_date")
+
+        days = [
+            from_date + timedelta(days=offset)
+            for offset in range((to_date - from_date).days + 1)
+        ]
+        completed = await self._get_completed_job_dates(from_date, to_date)
+        pending_days = [d for d in days if d not in completed]
+
+        if not pending_days:
+            return {
+                "status": "already_completed",
+                "from_date": from_date.isoformat(),
+                "to_date": to_date.isoformat(),
+                "days_processed": 0,
+            }
+
+        jobs = {}
+        for day in pending_days:
+            job = await self._create_or_update_job(day, "running")
+            job.job_type = "DAILY_ACCRUAL_CATCH_UP"
+            jobs[day] = job
+        await self.db.commit()
+
+        day_totals = {day: [0, Decimal(0)] for day in pending_days}
+        errors = []
+        entries_posted = 0
+        after_id = 0
+
+        try:
+            while True:
+                chunk_end = await self._get_chunk_end(to_date, after_id, chunk_size)
+                if chunk_end is None:
+                    break
+
+                id_range = (after_id, chunk_end)
+                ledger_rows, chunk_errors = await self._run_catch_up_chunk(
+                    set(pending_days), from_date, to_date, id_range, day_totals
+                )
+                if ledger_rows:
+                    await self.db.execute(insert(LoanLedger), ledger_rows)
+                    await LoanBalanceService.apply_entries(self.db, ledger_rows)
+                await self.db.commit()
+
+                await self._invalidate_cache(
+                    *{row["loan_id"] for row in ledger_rows}
+                )
+
+                entries_posted += len(ledger_rows)
+                errors.extend(chunk_errors)
+                after_id = chunk_end
+
+            completed_at = datetime.utcnow()
+            for day, job in jobs.items():
+                job.status = "completed"
+                job.loans_processed, job.total_accrual_amount = day_totals[day]
+                job.errors_count = len(errors)
+                job.error_details = json.dumps(errors) if errors else None
+                job.completed_at = completed_at
+                job.duration_seconds = (completed_at - job.started_at).total_seconds()
+
+            total_accrual = sum((t[1] for t in day_totals.values()), Decimal(0))
+
+            await self._log_audit(
+                actor_type="system",
+                action="DAILY_ACCRUAL_CATCH_UP",
+                description=(
+                    f"Backfilled {len(pending_days)} days, {entries_posted} entries, "
+                    f"total accrual: ₹{total_accrual}"
+                ),
+                metadata={
+                    "from_date": from_date.isoformat(),
+                    "to_date": to_date.isoformat(),
+                },
+            )
+            await PortfolioSummaryService.refresh(self.db)
+            await self.db.commit()
+
+            return {
+                "status": "completed",
+                "from_date": from_date.isoformat(),
+                "to_date": to_date.isoformat(),
+                "days_processed": len(pending_days),
+                "days_skipped": len(days) - len(pending_days),
+                "entries_posted": entries_posted,
+                "total_accrual": float(total_accrual),
+                "errors": errors,
+            }
+
+        except Exception as e:
+            await self.db.rollback()
+
+            for day in pending_days:
+                job = await self._get_job_for_date(day)
+                job.status = "failed"
+                job.failure_reason = str(e)
+                job.completed_at = datetime.utcnow()
+            await self.db.commit()
+
+            logger.error(f"Accrual catch-up failed after loan {after_id}: {str(e)}")
+            raise
+
+    async def _run_catch_up_chunk(
+        self,
+        pending_days: set,
+        from_date: date,
+        to_date: date,
+        id_range: Tuple[int, int],
+        day_totals: Dict,
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """Build the catch-up ledger rows for one loan-id chunk"""
+        loan_scope = self._accruing_loan_ids(to_date, id_range)
+
+        loans = await self._get_accrual_candidates(to_date, id_range)
+        paid_before = await self._get_paid_totals(
+            loan_scope, from_date - timedelta(days=1)
+        )
+        payments = await self._get_payments_by_day(loan_scope, from_date, to_date)
+        opening_balances = await LoanBalanceService.get_balances(
+            self.db, loan_scope, from_date
+        )
+        day_entries = await self._get_ledger_days(loan_scope, from_date, to_date)
+
+        ledger_rows = []
+        errors = []
+
+        for loan in loans:
+            try:
+                ledger_rows.extend(
+                    await self._catch_up_rows_for_loan(
+                        loan,
+                        pending_days,
+                        from_date,
+                        to_date,
+                        paid_before.get(loan.id, Decimal(0)),
+                        payments.get(loan.id, {}),
+                        opening_balances.get(
+                            loan.id, Decimal(str(loan.principal_amount))
+                        ),
+                        day_entries.get(loan.id, {}),
+                        day_totals,
+                    )
+                )
+            except Exception as e:
+                logger.error(f"Error catching up loan {loan.id}: {str(e)}")
+                errors.append({"loan_id": loan.id, "error": str(e)})
+
+        return ledger_rows, errors
+
+    async def _catch_up_rows_for_loan(
+        self,
+        loan,
+        pending_days: set,
+        from_date: date,
+        to_date: date,
+        paid_before: Decimal,
+        payments_by_day: Dict[date, Decimal],
+        opening_balance: Decimal,
+        day_entries: Dict[date, Dict],
+        day_totals: Dict,
+    ) -> List[Dict]:
+        """
+        Per-day accrual rows for one loan, matching a day-by-day replay
+        Interest only changes at segment boundaries (rate switch, payments)
+        """
+        principal = Decimal(str(loan.principal_amount))
+        boundaries = set(payments_by_day) | {
+            self.calculator._get_rate_switch_date(loan)
+        }
+
+        rows = []
+        paid = paid_before
+        balance = opening_balance
+        annual_rate = None
+        daily_interest = None
+
+        day = from_date
+        while day <= to_date:
+            paid += payments_by_day.get(day, Decimal(0))
+            existing = day_entries.get(day)
+
+            if (
+                day not in pending_days
+                or day < loan.disbursement_date
+                or (existing and existing["accrual"] is not None)
+            ):
+                if existing and existing["accrual"] is not None and day in pending_days:
+                    day_totals[day][0] += 1
+                    day_totals[day][1] += existing["accrual"]
+                if existing:
+                    balance = existing["balance"]
+                day += timedelta(days=1)
+                continue
+
+            if daily_interest is None or day in boundaries:
+                annual_rate = await self.calculator._get_rate_for_period(loan, day)
+                daily_interest = self.calculator._calculate_daily_interest(
+                    principal - paid, annual_rate, 1
+                ).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+            balance = balance + daily_interest
+            rows.append(
+                self._accrual_ledger_row(
+                    loan.id, day, daily_interest, balance, annual_rate
+                )
+            )
+            day_totals[day][0] += 1
+            day_totals[day][1] += daily_interest
+            day += timedelta(days=1)
+
+        return rows
+
+    # ==================== SHARDED (FAN-OUT) ACCRUAL ====================
+
+    async def start_sharded_accrual(
+        self, accrual_date: date, shard_by: str = "branch", shard_count: int = None
+    ) -> Dict:
+        """
+        Open the AccrualJob for a fan-out run and list the shards to dispatch
+        Shards are branch ids (shard_by="branch") or loan-id hash buckets
+        (shard_by="hash") that workers process independently
+        """
+        existing_job = await self._get_job_for_date(accrual_date)
+        if existing_job and existing_job.status == "completed":
+            logger.info(f"Accrual for {accrual_date} already completed")
+            return {
+                "status": "already_completed",
+                "job_id": existing_job.id,
+                "accrual_date": accrual_date.isoformat(),
+                "shards": [],
+            }
+
+        job = await self._create_or_update_job(accrual_date, "running")
+        job.job_type = "DAILY_ACCRUAL_FANOUT"
+        job.loans_processed = 0
+        job.total_accrual_amount = Decimal(0)
+        job.chunks_completed = 0
+        job.errors_count = 0
+        job.error_details = None
+        job.last_loan_id = None
+
+        if shard_by == "branch":
+            result = await self.db.execute(
+                select(Loan.branch_id)
+                .where(*self._accruing_loan_conditions(accrual_date))
+                .distinct()
+                .order_by(Loan.branch_id)
+            )
+            shards = [branch_id for (branch_id,) in result.all()]
+            shard_count = len(shards)
+        elif shard_by == "hash":
+            shard_count = shard_count or settings.ACCRUAL_SHARD_COUNT
+            shards = list(range(shard_count))
+        else:
+            raise ValueError(f"Unknown shard_by: {shard_by}")
+
+        await self.db.commit()
+
+        return {
+            "status": "running",
+            "job_id": job.id,
+            "accrual_date": accrual_date.isoformat(),
+            "shard_by": shard_by,
+            "shard_count": shard_count,
+            "shards": shards,
+        }
+
+    async def run_accrual_shard(
+        self,
+        accrual_date: date,
+        shard_by: str,
+        shard_key: int,
+        shard_count: int = None,
+        bulk: bool = True,
+        chunk_size: int = None,
+    ) -> Dict:
+        """
+        Accrue one shard in committed loan-id chunks
+        Safe to retry: loans already posted for the date are skipped
+        """
+        chunk_size = chunk_size or settings.ACCRUAL_CHUNK_SIZE
+        shard = self._shard_condition(shard_by, shard_key, shard_count)
+
+        loans_processed = 0
+        chunks_completed = 0
+        total_accrual = Decimal(0)
+        errors = []
+        after_id = 0
+
+        while True:
+            chunk_end = await self._get_chunk_end(
+                accrual_date, after_id, chunk_size, shard
+            )
+            if chunk_end is None:
+                break
+
+            id_range = (after_id, chunk_end)
+            if bulk:
+                processed_count, chunk_accrual, chunk_errors = (
+                    await self._run_bulk_accrual(accrual_date, id_range, shard)
+                )
+            else:
+                processed_count, chunk_accrual, chunk_errors = (
+                    await self._run_per_loan_accrual(accrual_date, id_range, shard)
+                )
+            await self.db.commit()
+            await self.invalidate_posted_loans()
+
+            loans_processed += processed_count
+            chunks_completed += 1
+            total_accrual += chunk_accrual
+            errors.extend(chunk_errors)
+            after_id = chunk_end
+
+        return {
+            "shard_key": shard_key,
+            "loans_processed": loans_processed,
+            "chunks_completed": chunks_completed,
+            "total_accrual": str(total_accrual),
+            "errors": errors,
+        }
+
+    async def finalize_sharded_accrual(
+        self, accrual_date: date, shard_results: List[Dict]
+    ) -> Dict:
+        """
+        Combine shard totals into the AccrualJob record
+        A shard result carrying "failed" marks the whole job failed so the
+        next fan-out re-dispatches it
+        """
+        job = await self._get_job_for_date(accrual_date)
+        if job is None:
+            raise ValueError(f"No accrual job for {accrual_date}")
+
+        failed_shards = [r for r in shard_results if r.get("failed")]
+        errors = [e for r in shard_results for e in r.get("errors", [])]
+        total_accrual = sum(
+            (Decimal(r.get("total_accrual", "0")) for r in shard_results), Decimal(0)
+        )
+
+        job.loans_processed = sum(r.get("loans_processed", 0) for r in shard_results)
+        job.total_accrual_amount = total_accrual
+        job.chunks_completed = sum(r.get("chunks_completed", 0) for r in shard_results)
+        job.errors_count = len(errors) + len(failed_shards)
+        job.status = "failed" if failed_shards else "completed"
+        job.error_details = json.dumps(errors) if errors else None
+        job.failure_reason = json.dumps(failed_shards) if failed_shards else None
+        job.completed_at = datetime.utcnow()
+        job.duration_seconds = (job.completed_at - job.started_at).total_seconds()
+
+        if not failed_shards:
+            await self._log_audit(
+                actor_type="worker",
+                action="DAILY_ACCRUAL",
+                description=(
+                    f"Processed {job.loans_processed} loans across "
+                    f"{len(shard_results)} shards, total accrual: ₹{total_accrual}"
+                ),
+                metadata={"job_id": job.id, "accrual_date": accrual_date.isoformat()},
+            )
+            await PortfolioSummaryService.refresh(self.db)
+
+        await self.db.commit()
+
+        return {
+            "status": job.status,
+            "job_id": job.id,
+            "accrual_date": accrual_date.isoformat(),
+            "shards": len(shard_results),
+            "failed_shards": [r["shard_key"] for r in failed_shards],
+            "loans_processed": job.loans_processed,
+            "total_accrual": float(total_accrual),
+            "errors": errors,
+        }
+
+    async def _run_per_loan_accrual(
+        self, accrual_date: date, id_range: Tuple[int, int], shard=None
+    ) -> Tuple[int, Decimal, List[Dict]]:
+        """Accrue loan by loan (one set of queries per loan)"""
+        result = await self.db.execute(
+            select(Loan)
+            .where(*self._accruing_loan_conditions(accrual_date, id_range, shard))
+            .order_by(Loan.id)
+        )
+        active_loans = result.scalars().all()
+
+        total_accrual = Decimal(0)
+        processed_count = 0
+        errors = []
+
+        for loan in active_loans:
+            try:
+                accrual_amount = await self._accrue_interest_for_loan(
+                    loan, accrual_date
+                )
+                total_accrual += accrual_amount
+                processed_count += 1
+
+            except Exception as e:
+                logger.error(f"Error accruing for loan {loan.id}: {str(e)}")
+                errors.append({"loan_id": loan.id, "error": str(e)})
+
+        return processed_count, total_accrual, errors
+
+    async def _run_bulk_accrual(
+        self, accrual_date: date, id_range: Tuple[int, int], shard=None
+    ) -> Tuple[int, Decimal, List[Dict]]:
+        """
+        Set-based accrual for a loan-id range
+        Loads loans, paid totals, latest balances and already-posted entries
+        in one query each, computes interest in memory and posts all ledger
+        rows with a single multi-row insert
+        """
+        loan_scope = self._accruing_loan_ids(accrual_date, id_range, shard)
+
+        loans = await self._get_accrual_candidates(accrual_date, id_range, shard)
+        paid_totals = await self._get_paid_totals(loan_scope, accrual_date)
+        latest_balances = await LoanBalanceService.get_balances(
+            self.db, loan_scope, accrual_date
+        )
+        posted = await self._get_posted_accruals(loan_scope, accrual_date)
+
+        total_accrual = Decimal(0)
+        processed_count = 0
+        errors = []
+        ledger_rows = []
+
+        for loan in loans:
+            try:
+                if loan.id in posted:
+                    # Already accrued for this date (idempotent re-run)
+                    total_accrual += posted[loan.id]
+                    processed_count += 1
+                    continue
+
+                principal = Decimal(str(loan.principal_amount))
+                outstanding = principal - paid_totals.get(loan.id, Decimal(0))
+                annual_rate = await self.calculator._get_rate_for_period(
+                    loan, accrual_date
+                )
+                interest_amount = self.calculator._calculate_daily_interest(
+                    outstanding, annual_rate, 1
+                ).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+                prev_balance = latest_balances.get(loan.id, principal)
+                ledger_rows.append(
+                    self._accrual_ledger_row(
+                        loan.id,
+                        accrual_date,
+                        interest_amount,
+                        prev_balance + interest_amount,
+                        annual_rate,
+                    )
+                )
+                total_accrual += interest_amount
+                processed_count += 1
+
+            except Exception as e:
+                logger.error(f"Error accruing for loan {loan.id}: {str(e)}")
+                errors.append({"loan_id": loan.id, "error": str(e)})
+
+        if ledger_rows:
+            # executemany on an insert() is sent as batched multi-row VALUES
+            await self.db.execute(insert(LoanLedger), ledger_rows)
+            await LoanBalanceService.apply_entries(self.db, ledger_rows)
+
+        self._accrued_loan_ids.update(row["loan_id"] for row in ledger_rows)
+
+        return processed_count, total_accrual, errors
+
+    def _accrual_ledger_row(
+        self,
+        loan_id: int,
+        accrual_date: date,
+        interest_amount: Decimal,
+        new_balance: Decimal,
+        annual_rate: Decimal,
+    ) -> Dict:
+        """Build a DAILY_ACCRUAL ledger row for bulk insert"""
+        return {
+            "loan_id": loan_id,
+            "transaction_date": accrual_date,
+            "transaction_type": "DAILY_ACCRUAL",
+            "debit_amount": interest_amount,
+            "credit_amount": Decimal(0),
+            "balance": new_balance,
+            "reference_type": "DAILY_ACCRUAL",
+            "description": f"Daily interest accrual for {accrual_date}",
+            "narration": f"Interest @ {annual_rate}% for 1 day",
+            "interest_rate_applied": annual_rate,
+            "days_calculated": 1,
+            "created_by": "system",
+        }
+
     async def _accrue_interest_for_loan(
         self, loan: Loan, accrual_date: date
     ) -> Decimal:
@@ -134,7 +700,9 @@ class DailyAccrualService:
         interest_amount = Decimal(str(calc_result["interest_amount"]))
 
         # Get previous balance
-        prev_balance = await self._get_latest_balance(loan.id, accrual_date)
+        prev_balance = await LoanBalanceService.get_balance(
+            self.db, loan.id, accrual_date
+        )
         new_balance = prev_balance + interest_amount
 
         # Create ledger entry
@@ -155,9 +723,10 @@ class DailyAccrualService:
 
         self.db.add(ledger_entry)
         await self.db.flush()
+        await LoanBalanceService.apply_entries(self.db, [ledger_entry])
 
-        # Invalidate cache for this loan
-        await self._invalidate_cache(loan.id)
+        # Invalidated after the chunk commits
+        self._accrued_loan_ids.add(loan.id)
 
         return interest_amount
 
@@ -166,10 +735,13 @@ class DailyAccrualService:
     ):
         """
         Post payment transaction to ledger
-        Called when payment is received
+        Called when payment is received. Does not commit; call
+        invalidate_posted_loans() once the caller has committed.
         """
         # Get previous balance
-        prev_balance = await self._get_latest_balance(loan_id, payment_date)
+        prev_balance = await LoanBalanceService.get_balance(
+            self.db, loan_id, payment_date
+        )
         new_balance = prev_balance - payment_amount
 
         # Create ledger entry
@@ -189,9 +761,10 @@ class DailyAccrualService:
 
         self.db.add(ledger_entry)
         await self.db.flush()
+        await LoanBalanceService.apply_entries(self.db, [ledger_entry])
 
-        # Invalidate cache
-        await self._invalidate_cache(loan_id)
+        # Invalidated once the caller commits
+        self._accrued_loan_ids.add(loan_id)
 
         # Log audit
         await self._log_audit(
@@ -273,6 +846,7 @@ class DailyAccrualService:
         if job:
             job.status = status
             job.started_at = datetime.utcnow()
+            job.failure_reason = None
         else:
             job = AccrualJob(
                 job_date=accrual_date,
@@ -288,12 +862,171 @@ class DailyAccrualService:
     async def _get_active_loans(self) -> List[Loan]:
         """Get all active loans"""
         result = await self.db.execute(
-            select(Loan).where(
-                Loan.status.in_([LoanStatus.APPROVED, LoanStatus.DISBURSED])
-            )
+            select(Loan).where(Loan.status.in_(ACCRUING_STATUSES))
         )
         return result.scalars().all()
 
+    def _accruing_loan_conditions(
+        self, accrual_date: date, id_range: Tuple[int, int] = None, shard=None
+    ) -> list:
+        """
+        Filter for loans that accrue interest on the given date
+        id_range is an (exclusive lower, inclusive upper) loan-id bound,
+        shard an optional extra condition from _shard_condition
+        """
+        conditions = [
+            Loan.status.in_(ACCRUING_STATUSES),
+            Loan.disbursement_date.isnot(None),
+            Loan.disbursement_date <= accrual_date,
+        ]
+        if id_range:
+            conditions += [Loan.id > id_range[0], Loan.id <= id_range[1]]
+        if shard is not None:
+            conditions.append(shard)
+        return conditions
+
+    def _accruing_loan_ids(
+        self, accrual_date: date, id_range: Tuple[int, int] = None, shard=None
+    ):
+        """Subquery of loan ids that accrue on the given date"""
+        return select(Loan.id).where(
+            *self._accruing_loan_conditions(accrual_date, id_range, shard)
+        )
+
+    def _shard_condition(self, shard_by: str, shard_key: int, shard_count: int = None):
+        """Condition selecting one shard's loans (by branch or loan-id hash)"""
+        if shard_by == "branch":
+            return Loan.branch_id == shard_key
+        if shard_by == "hash":
+            return Loan.id % shard_count == shard_key
+        raise ValueError(f"Unknown shard_by: {shard_by}")
+
+    async def _get_chunk_end(
+        self, accrual_date: date, after_id: int, chunk_size: int, shard=None
+    ) -> Optional[int]:
+        """Highest loan id of the next chunk of accruing loans, None when done"""
+        chunk = (
+            select(Loan.id)
+            .where(
+                *self._accruing_loan_conditions(accrual_date, shard=shard),
+                Loan.id > after_id,
+            )
+            .order_by(Loan.id)
+            .limit(chunk_size)
+            .subquery()
+        )
+        return await self.db.scalar(select(func.max(chunk.c.id)))
+
+    def _load_job_errors(self, job: AccrualJob) -> List[Dict]:
+        """Per-loan errors recorded by earlier chunks of a resumed job"""
+        try:
+            errors = json.loads(job.error_details) if job.error_details else []
+        except ValueError:
+            return []
+        return errors if isinstance(errors, list) else []
+
+    async def _get_accrual_candidates(
+        self, accrual_date: date, id_range: Tuple[int, int] = None, shard=None
+    ) -> list:
+        """Get the columns needed for accrual for every accruing loan"""
+        result = await self.db.execute(
+            select(
+                Loan.id,
+                Loan.loan_type,
+                Loan.principal_amount,
+                Loan.interest_rate,
+                Loan.disbursement_date,
+            )
+            .where(*self._accruing_loan_conditions(accrual_date, id_range, shard))
+            .order_by(Loan.id)
+        )
+        return result.all()
+
+    async def _get_paid_totals(self, loan_scope, as_of_date: date) -> Dict[int, Decimal]:
+        """Total payments per loan up to and including the given date"""
+        result = await self.db.execute(
+            select(Payment.loan_id, func.sum(Payment.amount))
+            .where(
+                Payment.loan_id.in_(loan_scope),
+                Payment.payment_date <= as_of_date,
+            )
+            .group_by(Payment.loan_id)
+        )
+        return {
+            loan_id: Decimal(str(total or 0)) for loan_id, total in result.all()
+        }
+
+    async def _get_posted_accruals(
+        self, loan_scope, accrual_date: date
+    ) -> Dict[int, Decimal]:
+        """DAILY_ACCRUAL amounts already posted for the given date"""
+        result = await self.db.execute(
+            select(LoanLedger.loan_id, LoanLedger.debit_amount).where(
+                LoanLedger.loan_id.in_(loan_scope),
+                LoanLedger.transaction_date == accrual_date,
+                LoanLedger.transaction_type == "DAILY_ACCRUAL",
+            )
+        )
+        return {loan_id: amount for loan_id, amount in result.all()}
+
+    async def _get_completed_job_dates(self, from_date: date, to_date: date) -> set:
+        """Dates in range whose accrual job has completed"""
+        result = await self.db.execute(
+            select(AccrualJob.job_date).where(
+                AccrualJob.job_date.between(from_date, to_date),
+                AccrualJob.status == "completed",
+            )
+        )
+        return {job_date for (job_date,) in result.all()}
+
+    async def _get_payments_by_day(
+        self, loan_scope, from_date: date, to_date: date
+    ) -> Dict[int, Dict[date, Decimal]]:
+        """Payment totals per loan per day within the range"""
+        result = await self.db.execute(
+            select(Payment.loan_id, Payment.payment_date, func.sum(Payment.amount))
+            .where(
+                Payment.loan_id.in_(loan_scope),
+                Payment.payment_date.between(from_date, to_date),
+            )
+            .group_by(Payment.loan_id, Payment.payment_date)
+        )
+        payments = {}
+        for loan_id, payment_date, total in result.all():
+            payments.setdefault(loan_id, {})[payment_date] = Decimal(str(total or 0))
+        return payments
+
+    async def _get_ledger_days(
+        self, loan_scope, from_date: date, to_date: date
+    ) -> Dict[int, Dict[date, Dict]]:
+        """
+        Existing ledger activity per loan per day within the range:
+        the day's closing balance and any DAILY_ACCRUAL already posted
+        """
+        result = await self.db.execute(
+            select(
+                LoanLedger.loan_id,
+                LoanLedger.transaction_date,
+                LoanLedger.transaction_type,
+                LoanLedger.debit_amount,
+                LoanLedger.balance,
+            )
+            .where(
+                LoanLedger.loan_id.in_(loan_scope),
+                LoanLedger.transaction_date.between(from_date, to_date),
+            )
+            .order_by(LoanLedger.loan_id, LoanLedger.transaction_date, LoanLedger.id)
+        )
+        days = {}
+        for loan_id, txn_date, txn_type, debit, balance in result.all():
+            entry = days.setdefault(loan_id, {}).setdefault(
+                txn_date, {"accrual": None, "balance": balance}
+            )
+            entry["balance"] = balance
+            if txn_type == "DAILY_ACCRUAL":
+                entry["accrual"] = debit
+        return days
+
     async def _get_ledger_entry(
         self, loan_id: int, transaction_date: date, transaction_type: str
     ) -> LoanLedger:
@@ -309,37 +1042,18 @@ class DailyAccrualService:
         )
         return result.scalar_one_or_none()
 
-    async def _get_latest_balance(self, loan_id: int, before_date: date) -> Decimal:
-        """Get latest ledger balance before given date"""
-        result = await self.db.execute(
-            select(LoanLedger)
-            .where(
-                and_(
-                    LoanLedger.loan_id == loan_id,
-                    LoanLedger.transaction_date < before_date,
-                )
-            )
-            .order_by(LoanLedger.transaction_date.desc())
-            .limit(1)
-        )
-        entry = result.scalar_one_or_none()
-
-        if entry:
-            return entry.balance
+    async def _invalidate_cache(self, *loan_ids: int):
+        """Invalidate all cached calculations for the given loans"""
+        for loan_id in loan_ids:
+            self.calculator.invalidate(loan_id)
 
-        # If no entries, get loan principal
-        loan_result = await self.db.execute(select(Loan).where(Loan.id == loan_id))
-        loan = loan_result.scalar_one()
-        return loan.principal_amount
+        # One pipelined generation bump instead of a KEYS scan per loan
+        await self.calculator.shared_cache.invalidate_loans(loan_ids)
 
-    async def _invalidate_cache(self, loan_id: int):
-        """Invalidate all cached calculations for a loan"""
-        if self.redis:
-            # Delete Redis cache keys
-            pattern = f"calc:loan:{loan_id}:*"
-            keys = await self.redis.keys(pattern)
-            if keys:
-                await self.redis.delete(*keys)
+    async def invalidate_posted_loans(self):
+        """Invalidate loans posted to since the last commit; call after commit"""
+        loan_ids, self._accrued_loan_ids = self._accrued_loan_ids, set()
+        await self._invalidate_cache(*loan_ids)
 
     async def _get_overdue_days(self, loan_id: int, as_of_date: date) -> int:
         """Calculate overdue days for a loan"""
@@ -401,7 +1115,7 @@ class DailyAccrualService:
             entity_type=entity_type,
             entity_id=entity_id,
             description=description,
-            metadata=json.dumps(metadata) if metadata else None,
+            extra_data=json.dumps(metadata) if metadata else None,
             old_value=json.dumps(old_value) if old_value else None,
             new_value=json.dumps(new_value) if new_value else None,
             rule_applied=rule_applied,
@@ -3,10 +3,13 @@ Interest calculation service for different loan types
 """
 
 from datetime import date, timedelta
-from typing import Optional, Tuple
+from typing import Optional, Sequence, Tuple
 import math
 
+import numpy as np
+
 from app.models.loan import Loan, InterestCalculationType
+from app.services.amortization_engine import amortize, calculate_emis, round_paisa
 
 
 class InterestCalculator:
@@ -97,39 +100,47 @@ class InterestCalculator:
         Generate complete EMI amortization schedule
         Returns list of dicts with installment details
         """
-        emi = InterestCalculator.calculate_emi(principal, annual_rate, tenure_months)
-        monthly_rate = (annual_rate / 12.0) / 100.0
+        return InterestCalculator.generate_emi_schedules(
+            [(principal, annual_rate, tenure_months, start_date)]
+        )[0]
 
-        schedule = []
-        outstanding = principal
-
-        for month in range(1, tenure_months + 1):
-            interest_component = outstanding * monthly_rate
-            principal_component = emi - interest_component
-
-            # Last month adjustment to handle rounding
-            if month == tenure_months:
-                principal_component = outstanding
-                emi_amount = outstanding + interest_component
-            else:
-                emi_amount = emi
-
-            outstanding -= principal_component
-
-            due_date = start_date + timedelta(days=30 * month)
-
-            schedule.append(
-                {
-                    "installment_number": month,
-                    "due_date": due_date,
-                    "emi_amount": round(emi_amount, 2),
-                    "principal_component": round(principal_component, 2),
-                    "interest_component": round(interest_component, 2),
-                    "outstanding_principal": round(max(0, outstanding), 2),
-                }
+    @staticmethod
+    def generate_emi_schedules(
+        loans: Sequence[Tuple[float, float, int, date]]
+    ) -> list[list[dict]]:
+        """
+        Generate EMI schedules for many loans in one vectorized pass
+        Takes (principal, annual_rate, tenure_months, start_date) per loan
+        """
+        if not loans:
+            return []
+
+        principals, rates, tenures, start_dates = zip(*loans)
+        emis = calculate_emis(principals, rates, tenures)
+        columns = amortize(principals, rates, tenures, emis)
+
+        emi_amount = round_paisa(columns["payment"]).tolist()
+        principal_component = round_paisa(columns["principal"]).tolist()
+        interest_component = round_paisa(columns["interest"]).tolist()
+        outstanding = round_paisa(np.maximum(columns["outstanding"], 0)).tolist()
+
+        schedules = []
+        for row, (tenure_months, start_date) in enumerate(zip(tenures, start_dates)):
+            schedules.append(
+                [
+                    {
+                        "installment_number": month,
+                        "due_date": start_date + timedelta(days=30 * month),
+                        "emi_amount": emi_amount[row][month - 1],
+                        "principal_component": principal_component[row][month - 1],
+                        "interest_component": interest_component[row][month - 1],
+                        "outstanding_principal": outstanding[row][month - 1],
+                    }
+                    for month in range(1, tenure_months + 1)
+                ]
             )
 
-        return schedule
+        return schedules
 
     @staticmethod
     def calculate_penal_interest(
@@ -0,0 +1,187 @@
+"""
+Loan balance service
+Per-loan running balance snapshot maintained alongside the loan ledger
+"""
+
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, Union
+
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.loan import Loan
+from app.models.loan_ledger import LoanLedger, LoanBalanceSnapshot
+
+# Rows per upsert statement (6 bind parameters each)
+UPSERT_BATCH_SIZE = 1000
+
+
+def _entry_value(entry: Union[Dict, LoanLedger], name: str):
+    """Field of an insert() row dict or a LoanLedger object"""
+    if isinstance(entry, dict):
+        return entry.get(name)
+    return getattr(entry, name, None)
+
+
+class LoanBalanceService:
+    """
+    Service for the loan_balance_snapshot table.
+
+    Every ledger insert is followed by apply_entries in the same
+    transaction, so a loan's snapshot always holds the balance of its
+    latest ledger entry. Balance reads use the snapshot when it predates
+    the requested date and fall back to the ledger otherwise (re-runs and
+    backdated postings).
+    """
+
+    @staticmethod
+    async def get_balance(db: AsyncSession, loan_id: int, before_date: date) -> Decimal:
+        """Latest balance of a loan before the given date"""
+        result = await db.execute(
+            select(
+                LoanBalanceSnapshot.balance, LoanBalanceSnapshot.last_transaction_date
+            ).where(LoanBalanceSnapshot.loan_id == loan_id)
+        )
+        snapshot = result.first()
+        if snapshot is not None and snapshot.last_transaction_date < before_date:
+            return snapshot.balance
+
+        result = await db.execute(
+            select(LoanLedger.balance)
+            .where(
+                LoanLedger.loan_id == loan_id,
+                LoanLedger.transaction_date < before_date,
+            )
+            .order_by(LoanLedger.transaction_date.desc(), LoanLedger.id.desc())
+            .limit(1)
+        )
+        balance = result.scalar_one_or_none()
+        if balance is not None:
+            return balance
+
+        # No entries yet: the loan starts at its principal
+        principal = await db.scalar(
+            select(Loan.principal_amount).where(Loan.id == loan_id)
+        )
+        return Decimal(str(principal))
+
+    @staticmethod
+    async def get_balances(
+        db: AsyncSession, loan_scope, before_date: date
+    ) -> Dict[int, Decimal]:
+        """
+        Latest balance per loan before the given date, for loan ids in
+        loan_scope (a list or a select of ids). Loans without ledger
+        entries are left out.
+        """
+        is_current = (
+            LoanBalanceSnapshot.loan_id.in_(loan_scope),
+            LoanBalanceSnapshot.last_transaction_date < before_date,
+        )
+        result = await db.execute(
+            select(LoanBalanceSnapshot.loan_id, LoanBalanceSnapshot.balance).where(
+                *is_current
+            )
+        )
+        balances = {loan_id: balance for loan_id, balance in result.all()}
+
+        # Loans whose snapshot is missing or not older than before_date
+        ranked = (
+            select(
+                LoanLedger.loan_id,
+                LoanLedger.balance,
+                func.row_number()
+                .over(
+                    partition_by=LoanLedger.loan_id,
+                    order_by=(
+                        LoanLedger.transaction_date.desc(),
+                        LoanLedger.id.desc(),
+                    ),
+                )
+                .label("rn"),
+            )
+            .where(
+                LoanLedger.loan_id.in_(loan_scope),
+                LoanLedger.loan_id.not_in(
+                    select(LoanBalanceSnapshot.loan_id).where(*is_current)
+                ),
+                LoanLedger.transaction_date < before_date,
+            )
+            .subquery()
+        )
+        result = await db.execute(
+            select(ranked.c.loan_id, ranked.c.balance).where(ranked.c.rn == 1)
+        )
+        balances.update({loan_id: balance for loan_id, balance in result.all()})
+        return balances
+
+    @staticmethod
+    async def apply_entries(
+        db: AsyncSession, entries: Iterable[Union[Dict, LoanLedger]]
+    ):
+        """
+        Advance snapshots to ledger entries just added in this transaction
+        (insert() rows or LoanLedger objects). A snapshot only moves forward:
+        entries dated before its last_transaction_date leave it unchanged.
+        """
+        latest = {}
+        for entry in entries:
+            loan_id = _entry_value(entry, "loan_id")
+            transaction_date = _entry_value(entry, "transaction_date")
+            transaction_type = _entry_value(entry, "transaction_type")
+            reference_id = _entry_value(entry, "reference_id")
+            values = latest.setdefault(
+                loan_id,
+                {
+                    "loan_id": loan_id,
+                    "balance": None,
+                    "last_transaction_date": None,
+                    "last_accrual_date": None,
+                    "last_payment_id": None,
+                },
+            )
+            # Later entries of the same date win, as in ledger (date, id) order
+            if (
+                values["last_transaction_date"] is None
+                or transaction_date >= values["last_transaction_date"]
+            ):
+                values["balance"] = _entry_value(entry, "balance")
+                values["last_transaction_date"] = transaction_date
+            if transaction_type == "DAILY_ACCRUAL" and (
+                values["last_accrual_date"] is None
+                or transaction_date > values["last_accrual_date"]
+            ):
+                values["last_accrual_date"] = transaction_date
+            if transaction_type == "PAYMENT" and reference_id:
+                values["last_payment_id"] = reference_id
+
+        rows = list(latest.values())
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            stmt = pg_insert(LoanBalanceSnapshot).values(
+                rows[start : start + UPSERT_BATCH_SIZE]
+            )
+            excluded = stmt.excluded
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[LoanBalanceSnapshot.loan_id],
+                    set_={
+                        "balance": excluded.balance,
+                        "last_transaction_date": excluded.last_transaction_date,
+                        "last_accrual_date": func.coalesce(
+                            excluded.last_accrual_date,
+                            LoanBalanceSnapshot.last_accrual_date,
+                        ),
+                        "last_payment_id": func.coalesce(
+                            excluded.last_payment_id,
+                            LoanBalanceSnapshot.last_payment_id,
+                        ),
+                        "updated_at": func.now(),
+                    },
+                    where=(
+                        LoanBalanceSnapshot.last_transaction_date
+                        <= excluded.last_transaction_date
+                    ),
+                )
+            )
@@ -9,6 +9,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.loan import Loan, LoanStatus, EMISchedule
 from app.models.payment import Payment, PaymentType
+from app.services.calculation_cache_service import CalculationCacheService
+from app.services.portfolio_summary_service import PortfolioSummaryService
 
 
 class LoanClosureService:
@@ -117,6 +119,8 @@ class LoanClosureService:
             remarks = f"Loan closed with final payment of ₹{closure_amount}"
 
         await db.commit()
+        await CalculationCacheService().invalidate_loan(loan.id)
+        await PortfolioSummaryService.mark_stale(db, [loan.branch_id])
         await db.refresh(loan)
 
         return loan
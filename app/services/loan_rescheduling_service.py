@@ -10,6 +10,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.loan import Loan, LoanStatus, EMISchedule, LoanTypeConfig
 from app.services.interest_calculator import InterestCalculator
 from app.services.loan_service import LoanService
+from app.services.calculation_cache_service import CalculationCacheService
+from app.services.portfolio_summary_service import PortfolioSummaryService
 
 
 class LoanReschedulingService:
@@ -100,6 +102,8 @@ class LoanReschedulingService:
             await LoanService.generate_emi_schedule(db, loan)
 
         await db.commit()
+        await CalculationCacheService().invalidate_loan(loan.id)
+        await PortfolioSummaryService.mark_stale(db, [loan.branch_id])
         await db.refresh(loan)
 
         return loan
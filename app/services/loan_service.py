@@ -4,6 +4,7 @@ Loan service for business logic
 
 from typing import Optional, List
 from datetime import date, datetime, timedelta
+from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, func
 from sqlalchemy.orm import selectinload
@@ -14,6 +15,9 @@ from app.models.user import User
 from app.models.loan_ledger import LoanLedger
 from app.schemas.loan import LoanCreate, LoanUpdate, LoanApproval, LoanReschedule
 from app.services.interest_calculator import InterestCalculator
+from app.services.calculation_cache_service import CalculationCacheService
+from app.services.portfolio_summary_service import PortfolioSummaryService
+from app.services.loan_balance_service import LoanBalanceService
 
 
 class LoanService:
@@ -100,6 +104,7 @@ class LoanService:
             await LoanService.generate_emi_schedule(db, loan)
 
         await db.commit()
+        await PortfolioSummaryService.mark_stale(db, [loan.branch_id])
         await db.refresh(loan)
 
         return loan
@@ -169,24 +174,28 @@ class LoanService:
                     await LoanService.generate_emi_schedule(db, loan)
 
                 # Create disbursement ledger entry
+                principal = Decimal(str(loan.principal_amount))
                 ledger_entry = LoanLedger(
                     loan_id=loan.id,
-                    entry_date=approval_data.disbursement_date,
+                    transaction_date=approval_data.disbursement_date,
                     transaction_type="DISBURSEMENT",
-                    debit=loan.principal_amount,
-                    credit=0.0,
-                    principal_amount=loan.principal_amount,
-                    outstanding_principal=loan.principal_amount,
-                    outstanding_interest=0.0,
-                    total_outstanding=loan.principal_amount,
-                    narration=f"Loan disbursed - {loan.loan_number}",
+                    debit_amount=principal,
+                    credit_amount=Decimal(0),
+                    balance=principal,
+                    reference_type="DISBURSEMENT",
+                    description=f"Loan disbursed - {loan.loan_number}",
+                    narration=f"Principal of ₹{principal} disbursed",
+                    created_by="system",
                 )
                 db.add(ledger_entry)
+                await LoanBalanceService.apply_entries(db, [ledger_entry])
         else:
             loan.status = LoanStatus.REJECTED
             loan.approval_remarks = approval_data.remarks
 
         await db.commit()
+        await CalculationCacheService().invalidate_loan(loan.id)
+        await PortfolioSummaryService.mark_stale(db, [loan.branch_id])
         await db.refresh(loan)
 
         return loan
@@ -253,6 +262,8 @@ class LoanService:
             await LoanService.generate_emi_schedule(db, new_loan)
 
         await db.commit()
+        await CalculationCacheService().invalidate_loan(old_loan.id)
+        await PortfolioSummaryService.mark_stale(db, [old_loan.branch_id])
         await db.refresh(new_loan)
 
         return new_loan
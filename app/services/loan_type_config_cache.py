@@ -0,0 +1,61 @@
+"""
+Process-wide cache of loan type configurations
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.loan import LoanTypeConfig
+from app.core.config import settings
+
+
+class LoanTypeConfigCache:
+    """
+    All LoanTypeConfig rows as plain dicts keyed by loan type value,
+    loaded with one query and shared by every request in the process.
+    Admin config writes call invalidate(); other processes pick changes
+    up within LOAN_TYPE_CONFIG_CACHE_TTL_SECONDS.
+    """
+
+    _configs: Optional[Dict[str, Dict]] = None
+    _loaded_at: Optional[datetime] = None
+
+    @classmethod
+    def _is_fresh(cls) -> bool:
+        if cls._configs is None or cls._loaded_at is None:
+            return False
+        ttl = timedelta(seconds=settings.LOAN_TYPE_CONFIG_CACHE_TTL_SECONDS)
+        return datetime.utcnow() - cls._loaded_at < ttl
+
+    @classmethod
+    async def get_all(cls, db: AsyncSession) -> Dict[str, Dict]:
+        """Every loan type config, active or not"""
+        if not cls._is_fresh():
+            result = await db.execute(select(LoanTypeConfig))
+            cls._configs = {
+                config.loan_type.value: {
+                    column.name: getattr(config, column.name)
+                    for column in LoanTypeConfig.__table__.columns
+                }
+                for config in result.scalars().all()
+            }
+            cls._loaded_at = datetime.utcnow()
+        return cls._configs
+
+    @classmethod
+    async def get_active(cls, db: AsyncSession) -> Dict[str, Dict]:
+        """Loan type configs that are open for new loans"""
+        configs = await cls.get_all(db)
+        return {
+            loan_type: config
+            for loan_type, config in configs.items()
+            if config["is_active"]
+        }
+
+    @classmethod
+    def invalidate(cls):
+        cls._configs = None
+        cls._loaded_at = None
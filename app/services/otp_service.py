@@ -13,6 +13,7 @@ from sqlalchemy import select, delete
 
 from app.models.user import User
 from app.core.config import settings
+from app.services.user_principal_cache import UserPrincipalCache
 import logging
 
 from redis.asyncio import Redis
@@ -281,7 +282,10 @@ class OTPService:
         db: AsyncSession, identifier: str, otp: str, new_password: str
     ) -> Dict:
         """Verify OTP and reset password"""
-        from app.core.security import get_password_hash, validate_password_strength
+        from app.core.security import (
+            get_password_hash_async,
+            validate_password_strength,
+        )
 
         # Verify OTP
         if not await OTPStore.verify_otp(identifier, otp):
@@ -302,10 +306,12 @@ class OTPService:
             return {"success": False, "message": "User not found"}
 
         # Update password
-        user.hashed_password = get_password_hash(new_password)
+        user.hashed_password = await get_password_hash_async(new_password)
+        user.token_version = (user.token_version or 0) + 1
         user.updated_at = datetime.utcnow()
 
         await db.commit()
+        await UserPrincipalCache.invalidate(user.id)
 
         logger.info(f"Password reset successful for user: {user.email}")
 
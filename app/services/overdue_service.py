@@ -3,32 +3,38 @@ Service for handling overdue EMI tracking and penal interest calculation
 """
 
 from datetime import date, datetime
-from typing import List, Dict
-from sqlalchemy import select
+from typing import List, Dict, Optional
+from sqlalchemy import select, update, func, literal, Date
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.loan import Loan, LoanStatus, EMISchedule, LoanTypeConfig
 from app.models.user import User
+from app.services.calculation_cache_service import CalculationCacheService
+from app.services.portfolio_summary_service import PortfolioSummaryService
+from app.core.config import settings
 
 
 class OverdueService:
     """Service for managing overdue loans and EMIs"""
 
+    SUMMARY_SORTS = ("severity", "amount", "penal", "oldest")
+
     @staticmethod
-    async def check_and_update_overdue_emis(db: AsyncSession) -> Dict:
+    async def check_and_update_overdue_emis(
+        db: AsyncSession, batch_size: Optional[int] = None
+    ) -> Dict:
         """
         Check all active loans for overdue EMIs and update their status
         Returns summary of overdue EMIs found
+
+        Unpaid past-due EMIs are swept in id ranges of batch_size. Each
+        range takes two UPDATE statements: one sets overdue_days and
+        is_overdue, and one joined to loans and loan_type_configs sets
+        penal_interest where the penalty threshold is reached. Each range
+        is committed on its own.
         """
         today = date.today()
-
-        # Get all unpaid EMIs that are past due date
-        result = await db.execute(
-            select(EMISchedule).where(
-                EMISchedule.is_paid == False, EMISchedule.due_date < today
-            )
-        )
-        overdue_emis = result.scalars().all()
+        batch_size = batch_size or settings.OVERDUE_SWEEP_BATCH_SIZE
 
         summary = {
             "total_overdue": 0,
@@ -36,44 +42,83 @@ class OverdueService:
             "total_penal_interest": 0.0,
         }
 
-        for emi in overdue_emis:
-            # Calculate overdue days
-            emi.overdue_days = (today - emi.due_date).days
-            emi.is_overdue = True
-
-            # Get loan to fetch penal interest rate
-            loan_result = await db.execute(select(Loan).where(Loan.id == emi.loan_id))
-            loan = loan_result.scalar_one_or_none()
-
-            if loan and emi.overdue_days > 0:
-                # Get loan type config for penal interest settings
-                config_result = await db.execute(
-                    select(LoanTypeConfig).where(
-                        LoanTypeConfig.loan_type == loan.loan_type
-                    )
-                )
-                config = config_result.scalar_one_or_none()
+        after_id = 0
+        while True:
+            batch_end = await OverdueService._get_sweep_batch_end(
+                db, today, after_id, batch_size
+            )
+            if batch_end is None:
+                break
 
-                # Calculate penal interest only if overdue exceeds threshold
-                if config and emi.overdue_days >= config.overdue_days_for_penalty:
-                    penal_rate = config.penal_interest_rate / 100  # Convert to decimal
+            in_batch = (
+                EMISchedule.id > after_id,
+                EMISchedule.id <= batch_end,
+                EMISchedule.is_paid == False,
+                EMISchedule.due_date < today,
+            )
 
-                    # Penal interest = Outstanding EMI amount * Penal rate * (Overdue days / 365)
-                    outstanding_emi = emi.emi_amount - emi.paid_amount
-                    emi.penal_interest = (
-                        outstanding_emi * penal_rate * (emi.overdue_days / 365)
-                    )
+            # Overdue days and flag
+            result = await db.execute(
+                update(EMISchedule)
+                .where(*in_batch)
+                .values(
+                    overdue_days=literal(today, Date) - EMISchedule.due_date,
+                    is_overdue=True,
+                )
+                .returning(EMISchedule.loan_id)
+                .execution_options(synchronize_session=False)
+            )
+            emi_loan_ids = result.scalars().all()
 
-                    summary["total_penal_interest"] += emi.penal_interest
+            # Penal interest = Outstanding EMI amount * Penal rate * (Overdue days / 365),
+            # only once overdue days reach the loan type's threshold
+            result = await db.execute(
+                update(EMISchedule)
+                .where(
+                    *in_batch,
+                    EMISchedule.loan_id == Loan.id,
+                    LoanTypeConfig.loan_type == Loan.loan_type,
+                    EMISchedule.overdue_days >= LoanTypeConfig.overdue_days_for_penalty,
+                )
+                .values(
+                    penal_interest=(EMISchedule.emi_amount - EMISchedule.paid_amount)
+                    * (LoanTypeConfig.penal_interest_rate / 100.0)
+                    * (EMISchedule.overdue_days / 365.0)
+                )
+                .returning(EMISchedule.penal_interest)
+                .execution_options(synchronize_session=False)
+            )
+            penal_amounts = result.scalars().all()
 
-                summary["total_overdue"] += 1
-                summary["loans_affected"].add(loan.id)
+            await db.commit()
+            await CalculationCacheService().invalidate_loans(set(emi_loan_ids))
 
-        await db.commit()
+            summary["total_overdue"] += len(emi_loan_ids)
+            summary["loans_affected"].update(emi_loan_ids)
+            summary["total_penal_interest"] += sum(penal_amounts)
+            after_id = batch_end
 
         summary["loans_affected"] = len(summary["loans_affected"])
         return summary
 
+    @staticmethod
+    async def _get_sweep_batch_end(
+        db: AsyncSession, today: date, after_id: int, batch_size: int
+    ) -> Optional[int]:
+        """Highest EMI id of the next batch of unpaid past-due EMIs, None when done"""
+        batch = (
+            select(EMISchedule.id)
+            .where(
+                EMISchedule.is_paid == False,
+                EMISchedule.due_date < today,
+                EMISchedule.id > after_id,
+            )
+            .order_by(EMISchedule.id)
+            .limit(batch_size)
+            .subquery()
+        )
+        return await db.scalar(select(func.max(batch.c.id)))
+
     @staticmethod
     async def get_overdue_emis_for_loan(
         db: AsyncSession, loan_id: int
@@ -91,60 +136,102 @@ class OverdueService:
         return result.scalars().all()
 
     @staticmethod
-    async def get_overdue_loans_summary(db: AsyncSession) -> Dict:
-        """Get summary of all overdue loans in the system"""
-        # Get all active loans with overdue EMIs
-        result = await db.execute(
-            select(Loan)
-            .join(EMISchedule)
-            .where(
-                Loan.status == LoanStatus.ACTIVE,
-                EMISchedule.is_overdue == True,
-                EMISchedule.is_paid == False,
-            )
-            .distinct()
-        )
-        overdue_loans = result.scalars().all()
-
-        summary = {"total_overdue_loans": len(overdue_loans), "loans": []}
+    async def get_overdue_loans_summary(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: Optional[int] = None,
+        sort_by: str = "severity",
+    ) -> Dict:
+        """
+        Get summary of all overdue loans in the system
 
-        for loan in overdue_loans:
-            # Get overdue EMIs for this loan
-            overdue_emis = await OverdueService.get_overdue_emis_for_loan(db, loan.id)
+        Overdue EMIs are aggregated per loan in one grouped query joined to
+        the loan and farmer, so the cost does not grow with the number of
+        overdue loans: one query for the page and one for the totals.
+        sort_by is severity (most days overdue first), amount, penal or
+        oldest (earliest overdue due date first).
+        """
+        if sort_by not in OverdueService.SUMMARY_SORTS:
+            raise ValueError(f"Unknown sort: {sort_by}")
 
-            total_overdue_amount = sum(
-                emi.emi_amount - emi.paid_amount for emi in overdue_emis
+        per_loan = (
+            select(
+                EMISchedule.loan_id.label("loan_id"),
+                func.count(EMISchedule.id).label("overdue_emis_count"),
+                func.sum(EMISchedule.emi_amount - EMISchedule.paid_amount).label(
+                    "total_overdue_amount"
+                ),
+                func.coalesce(func.sum(EMISchedule.penal_interest), 0).label(
+                    "total_penal_interest"
+                ),
+                func.max(EMISchedule.overdue_days).label("max_overdue_days"),
+                func.min(EMISchedule.due_date).label("oldest_overdue_date"),
             )
-            total_penal = sum(emi.penal_interest for emi in overdue_emis)
-            max_overdue_days = max(
-                (emi.overdue_days for emi in overdue_emis), default=0
+            .where(EMISchedule.is_overdue == True, EMISchedule.is_paid == False)
+            .group_by(EMISchedule.loan_id)
+            .subquery()
+        )
+        active = (Loan.id == per_loan.c.loan_id) & (Loan.status == LoanStatus.ACTIVE)
+
+        totals = (
+            await db.execute(
+                select(
+                    func.count(per_loan.c.loan_id),
+                    func.coalesce(func.sum(per_loan.c.total_overdue_amount), 0),
+                    func.coalesce(func.sum(per_loan.c.total_penal_interest), 0),
+                ).select_from(per_loan.join(Loan, active))
             )
+        ).one()
 
-            # Get farmer details
-            farmer_result = await db.execute(
-                select(User).where(User.id == loan.farmer_id)
+        order = {
+            "severity": (
+                per_loan.c.max_overdue_days.desc(),
+                per_loan.c.total_overdue_amount.desc(),
+            ),
+            "amount": (per_loan.c.total_overdue_amount.desc(),),
+            "penal": (per_loan.c.total_penal_interest.desc(),),
+            "oldest": (per_loan.c.oldest_overdue_date.asc(),),
+        }[sort_by]
+
+        query = (
+            select(
+                Loan.loan_number,
+                User.full_name.label("farmer_name"),
+                User.mobile.label("farmer_mobile"),
+                per_loan,
             )
-            farmer = farmer_result.scalar_one_or_none()
+            .select_from(per_loan)
+            .join(Loan, active)
+            .outerjoin(User, User.id == Loan.farmer_id)
+            .order_by(*order, Loan.id)
+            .offset(skip)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        rows = (await db.execute(query)).all()
 
-            summary["loans"].append(
+        return {
+            "total_overdue_loans": totals[0],
+            "total_overdue_amount": round(float(totals[1]), 2),
+            "total_penal_interest": round(float(totals[2]), 2),
+            "skip": skip,
+            "limit": limit,
+            "sort_by": sort_by,
+            "loans": [
                 {
-                    "loan_id": loan.id,
-                    "loan_number": loan.loan_number,
-                    "farmer_name": farmer.full_name if farmer else "Unknown",
-                    "farmer_mobile": farmer.mobile if farmer else None,
-                    "overdue_emis_count": len(overdue_emis),
-                    "total_overdue_amount": round(total_overdue_amount, 2),
-                    "total_penal_interest": round(total_penal, 2),
-                    "max_overdue_days": max_overdue_days,
-                    "oldest_overdue_date": (
-                        min(emi.due_date for emi in overdue_emis)
-                        if overdue_emis
-                        else None
-                    ),
+                    "loan_id": row.loan_id,
+                    "loan_number": row.loan_number,
+                    "farmer_name": row.farmer_name or "Unknown",
+                    "farmer_mobile": row.farmer_mobile,
+                    "overdue_emis_count": row.overdue_emis_count,
+                    "total_overdue_amount": round(float(row.total_overdue_amount), 2),
+                    "total_penal_interest": round(float(row.total_penal_interest), 2),
+                    "max_overdue_days": row.max_overdue_days or 0,
+                    "oldest_overdue_date": row.oldest_overdue_date,
                 }
-            )
-
-        return summary
+                for row in rows
+            ],
+        }
 
     @staticmethod
     async def mark_loan_as_defaulted(
@@ -167,6 +254,8 @@ class OverdueService:
             if emi.overdue_days >= days_threshold:
                 loan.status = LoanStatus.DEFAULTED
                 await db.commit()
+                await CalculationCacheService().invalidate_loan(loan_id)
+                await PortfolioSummaryService.mark_stale(db, [loan.branch_id])
                 return True
 
         return False
@@ -0,0 +1,241 @@
+"""
+Partition service
+Monthly range partitions of loan_ledgers and audit_logs: created ahead of
+time, and archived to compressed files once past their retention window
+"""
+
+import gzip
+import logging
+import os
+import re
+from datetime import date
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> partition key column
+PARTITIONED_TABLES = {
+    "loan_ledgers": "transaction_date",
+    "audit_logs": "created_at",
+}
+
+# How long archival waits for the table locks of a detach
+ARCHIVE_LOCK_TIMEOUT = "10s"
+
+PARTITIONS_QUERY = text(
+    """
+    SELECT child.relname
+    FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.relname = :table
+    """
+)
+
+
+def add_months(month: date, count: int) -> date:
+    """First day of the month count months after month"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """Name of the partition of table holding month, e.g. loan_ledgers_p202610"""
+    return f"{table}_p{month:%Y%m}"
+
+
+def retention_months(table: str) -> int:
+    if table == "loan_ledgers":
+        return settings.LEDGER_PARTITION_RETENTION_MONTHS
+    return settings.AUDIT_LOG_PARTITION_RETENTION_MONTHS
+
+
+class PartitionService:
+    """
+    Service for the monthly partitions of loan_ledgers and audit_logs.
+
+    Each month is a partition named <table>_pYYYYMM; rows outside every
+    monthly partition land in <table>_default. Queries filtered on the
+    partition key only scan the months they cover, and old months can be
+    detached without rewriting the table.
+    """
+
+    @staticmethod
+    async def list_partitions(db: AsyncSession, table: str) -> Dict[date, str]:
+        """Attached monthly partitions of table by month"""
+        result = await db.execute(PARTITIONS_QUERY, {"table": table})
+        pattern = re.compile(rf"^{table}_p(\d{{4}})(\d{{2}})$")
+
+        partitions = {}
+        for (name,) in result.all():
+            match = pattern.match(name)
+            if match:
+                partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+        return partitions
+
+    @staticmethod
+    async def create_partition(db: AsyncSession, table: str, month: date) -> str:
+        """
+        Create the partition of table for month. Rows of that month already
+        in the default partition are moved into it.
+        """
+        column = PARTITIONED_TABLES[table]
+        name = partition_name(table, month)
+        start, end = month.isoformat(), add_months(month, 1).isoformat()
+        bounds = f"FROM ('{start}') TO ('{end}')"
+        in_month = f"{column} >= '{start}' AND {column} < '{end}'"
+
+        misplaced = await db.scalar(
+            text(f"SELECT EXISTS (SELECT 1 FROM {table}_default WHERE {in_month})")
+        )
+        if not misplaced:
+            await db.execute(
+                text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}")
+            )
+            return name
+
+        # A partition overlapping rows in the default partition cannot be
+        # created in place: build it standalone, move the rows, then attach
+        await db.execute(
+            text(
+                f"CREATE TABLE {name} "
+                f"(LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            )
+        )
+        await db.execute(
+            text(
+                f"WITH moved AS (DELETE FROM {table}_default WHERE {in_month} "
+                f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+            )
+        )
+        await db.execute(
+            text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {bounds}")
+        )
+        logger.warning(f"Moved rows of {month:%Y-%m} from {table}_default to {name}")
+        return name
+
+    @staticmethod
+    async def ensure_partitions(
+        db: AsyncSession, months_ahead: int = None, today: date = None
+    ) -> List[str]:
+        """
+        Create missing partitions from the current month to months_ahead
+        (PARTITION_MONTHS_AHEAD) months ahead. Commits.
+        """
+        if months_ahead is None:
+            months_ahead = settings.PARTITION_MONTHS_AHEAD
+        current = (today or date.today()).replace(day=1)
+
+        created = []
+        for table in PARTITIONED_TABLES:
+            existing = await PartitionService.list_partitions(db, table)
+            for offset in range(months_ahead + 1):
+                month = add_months(current, offset)
+                if month not in existing:
+                    created.append(
+                        await PartitionService.create_partition(db, table, month)
+                    )
+
+        await db.commit()
+        if created:
+            logger.info(f"Created partitions: {', '.join(created)}")
+        return created
+
+    @staticmethod
+    async def archivable_partitions(db: AsyncSession, today: date = None) -> List[Dict]:
+        """
+        Attached partitions whose whole month is older than the table's
+        retention window (LEDGER_/AUDIT_LOG_PARTITION_RETENTION_MONTHS)
+        """
+        current = (today or date.today()).replace(day=1)
+
+        archivable = []
+        for table in PARTITIONED_TABLES:
+            cutoff = add_months(current, -retention_months(table))
+            partitions = await PartitionService.list_partitions(db, table)
+            for month in sorted(partitions):
+                if month < cutoff:
+                    archivable.append(
+                        {"table": table, "month": month, "partition": partitions[month]}
+                    )
+        return archivable
+
+    @staticmethod
+    async def archive_partition(
+        db: AsyncSession,
+        table: str,
+        partition: str,
+        archive_dir: str = None,
+        drop: bool = False,
+    ) -> Dict:
+        """
+        Dump a partition to <archive_dir>/<partition>.csv.gz and detach it
+        from table, dropping it afterwards when drop is set. Writes to the
+        partition are blocked while it is dumped, and the detach only
+        commits once the file is complete. Commits.
+        """
+        archive_dir = archive_dir or settings.PARTITION_ARCHIVE_DIR
+        os.makedirs(archive_dir, exist_ok=True)
+        path = os.path.join(archive_dir, f"{partition}.csv.gz")
+        partial_path = f"{path}.partial"
+
+        try:
+            await db.execute(text(f"SET LOCAL lock_timeout = '{ARCHIVE_LOCK_TIMEOUT}'"))
+            await db.execute(text(f"LOCK TABLE {partition} IN SHARE MODE"))
+
+            # COPY through the asyncpg connection of this session, so the
+            # dump sees the partition under the lock just taken
+            connection = await db.connection()
+            raw_connection = await connection.get_raw_connection()
+            with gzip.open(partial_path, "wb") as archive:
+
+                async def write(chunk: bytes):
+                    archive.write(chunk)
+
+                status = await raw_connection.driver_connection.copy_from_table(
+                    partition, output=write, format="csv", header=True
+                )
+            rows = int(status.split()[-1])
+
+            await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition}"))
+            if drop:
+                await db.execute(text(f"DROP TABLE {partition}"))
+
+            os.replace(partial_path, path)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+
+        logger.info(f"Archived {partition} ({rows} rows) to {path}")
+        return {
+            "table": table,
+            "partition": partition,
+            "rows": rows,
+            "file_path": path,
+            "dropped": drop,
+        }
+
+    @staticmethod
+    async def archive_old_partitions(
+        db: AsyncSession,
+        archive_dir: str = None,
+        drop: bool = False,
+        today: date = None,
+    ) -> List[Dict]:
+        """Archive every partition past its retention window, oldest first"""
+        archived = []
+        for candidate in await PartitionService.archivable_partitions(db, today):
+            archived.append(
+                await PartitionService.archive_partition(
+                    db, candidate["table"], candidate["partition"], archive_dir, drop
+                )
+            )
+        return archived
@@ -3,7 +3,8 @@ Payment processing service
 """
 
 from typing import Optional
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 import uuid
@@ -14,6 +15,9 @@ from app.models.loan import Loan, LoanStatus, EMISchedule
 from app.models.user import User
 from app.schemas.payment import PaymentCreate
 from app.services.interest_calculator import InterestCalculator
+from app.services.calculation_cache_service import CalculationCacheService
+from app.services.portfolio_summary_service import PortfolioSummaryService
+from app.services.loan_balance_service import LoanBalanceService
 
 
 class PaymentService:
@@ -87,25 +91,33 @@ class PaymentService:
         if loan.emi_amount:
             await PaymentService._update_emi_schedule(db, loan, payment)
 
-        # Create ledger entry
+        # Create ledger entry against the running balance as of the payment date
+        amount = Decimal(str(payment_data.amount))
+        prev_balance = await LoanBalanceService.get_balance(
+            db, loan.id, payment_data.payment_date + timedelta(days=1)
+        )
         ledger_entry = LoanLedger(
             loan_id=loan.id,
-            entry_date=payment_data.payment_date,
+            transaction_date=payment_data.payment_date,
             transaction_type="PAYMENT",
-            debit=0.0,
-            credit=payment_data.amount,
-            principal_amount=allocation["principal"],
-            interest_amount=allocation["interest"],
-            penal_interest_amount=allocation["penal"],
-            outstanding_principal=loan.outstanding_principal,
-            outstanding_interest=loan.outstanding_interest,
-            total_outstanding=loan.total_outstanding,
-            payment_id=payment.id,
-            narration=f"Payment received - {payment.transaction_id}",
+            debit_amount=Decimal(0),
+            credit_amount=amount,
+            balance=prev_balance - amount,
+            reference_type="PAYMENT",
+            reference_id=payment.id,
+            description=f"Payment received - {payment.transaction_id}",
+            narration=(
+                f"Penal ₹{allocation['penal']}, interest ₹{allocation['interest']}, "
+                f"principal ₹{allocation['principal']}"
+            ),
+            created_by="system",
         )
         db.add(ledger_entry)
+        await LoanBalanceService.apply_entries(db, [ledger_entry])
 
         await db.commit()
+        await CalculationCacheService().invalidate_loan(loan.id)
+        await PortfolioSummaryService.mark_stale(db, [loan.branch_id])
         await db.refresh(payment)
 
         return payment
@@ -172,6 +184,6 @@ class PaymentService:
         result = await db.execute(
             select(LoanLedger)
             .where(LoanLedger.loan_id == loan_id)
-            .order_by(LoanLedger.entry_date, LoanLedger.created_at)
+            .order_by(LoanLedger.transaction_date, LoanLedger.id)
         )
         return result.scalars().all()
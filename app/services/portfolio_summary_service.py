@@ -0,0 +1,332 @@
+"""
+Portfolio summary service
+Maintains portfolio_daily_summary, the materialized dashboard overview
+"""
+
+import json
+import logging
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select, func, case, and_, or_, delete, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.loan import Loan, LoanStatus
+from app.models.user import User, UserRole, Branch
+from app.models.portfolio_summary import PortfolioDailySummary, PortfolioSummaryVersion
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# PortfolioSummaryVersion key of loans without a branch
+NO_BRANCH_KEY = 0
+
+# pg_advisory_xact_lock key that serializes refresh() across sessions
+REFRESH_LOCK_KEY = 7_290_114
+
+
+class PortfolioSummaryService:
+    """Service for the materialized portfolio overview"""
+
+    @staticmethod
+    async def get_overview(db: AsyncSession, branch_id: Optional[int] = None) -> Dict:
+        """
+        Dashboard overview for a branch, or the whole portfolio when
+        branch_id is None. Served from today's summary row; a missing or
+        expired row, or one computed before the latest write to its branches,
+        is refreshed first.
+        """
+        today = date.today()
+        row = await PortfolioSummaryService._get_row(db, today, branch_id)
+
+        max_age = timedelta(seconds=settings.PORTFOLIO_SUMMARY_MAX_AGE_SECONDS)
+        if (
+            row is None
+            or row.refreshed_at is None
+            or datetime.utcnow() - row.refreshed_at > max_age
+            or row.source_version
+            != await PortfolioSummaryService._current_version(db, branch_id)
+        ):
+            await PortfolioSummaryService.refresh(db, branch_id)
+            await db.commit()
+            row = await PortfolioSummaryService._get_row(db, today, branch_id)
+
+        return PortfolioSummaryService._to_overview(row)
+
+    @staticmethod
+    async def refresh(db: AsyncSession, branch_id: Optional[int] = None):
+        """
+        Recompute today's summary rows from loans and users.
+        branch_id None refreshes every branch row and the portfolio row;
+        otherwise only that branch's row. Loans are aggregated in a single
+        GROUP BY (branch, status, loan type) pass and users in another.
+        Concurrent refreshes queue on an advisory lock held until the
+        caller's transaction ends, so their DELETE + INSERT can't interleave
+        into duplicate rows. Does not commit.
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            await db.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"), {"key": REFRESH_LOCK_KEY}
+            )
+
+        # Versions are read before the aggregates, so a write that commits
+        # after this point leaves the new rows behind the current version
+        version_query = select(
+            PortfolioSummaryVersion.branch_key, PortfolioSummaryVersion.version
+        )
+        if branch_id is not None:
+            version_query = version_query.where(
+                PortfolioSummaryVersion.branch_key == branch_id
+            )
+        versions = dict((await db.execute(version_query)).all())
+
+        today = date.today()
+        first_day_of_month = today.replace(day=1)
+        thirty_days_ago = today - timedelta(days=30)
+
+        active_condition = and_(
+            or_(Loan.status == LoanStatus.ACTIVE, Loan.status == LoanStatus.APPROVED),
+            Loan.disbursement_date.isnot(None),
+            Loan.total_outstanding > 0,
+        )
+        overdue_condition = and_(
+            Loan.status == LoanStatus.ACTIVE, Loan.total_outstanding > 0
+        )
+        disbursed_condition = and_(
+            Loan.disbursement_date >= first_day_of_month,
+            Loan.disbursement_date.isnot(None),
+        )
+
+        loan_query = select(
+            Loan.branch_id,
+            Loan.status,
+            Loan.loan_type,
+            func.count(Loan.id).label("count"),
+            func.sum(Loan.principal_amount).label("principal"),
+            func.count(case((active_condition, Loan.id))).label("active"),
+            func.count(case((overdue_condition, Loan.id))).label("overdue"),
+            func.sum(
+                case(
+                    (Loan.status == LoanStatus.ACTIVE, Loan.total_outstanding),
+                    else_=0,
+                )
+            ).label("outstanding"),
+            func.count(case((disbursed_condition, Loan.id))).label("disbursed_count"),
+            func.sum(
+                case((disbursed_condition, Loan.principal_amount), else_=0)
+            ).label("disbursed_amount"),
+            func.count(case((Loan.created_at >= thirty_days_ago, Loan.id))).label(
+                "recent"
+            ),
+        ).group_by(Loan.branch_id, Loan.status, Loan.loan_type)
+
+        user_query = select(
+            User.branch_id,
+            func.count(case((User.role == UserRole.FARMER, User.id))).label("farmers"),
+            func.count(User.id).label("users"),
+        ).group_by(User.branch_id)
+
+        if branch_id is not None:
+            loan_query = loan_query.where(Loan.branch_id == branch_id)
+            user_query = user_query.where(User.branch_id == branch_id)
+            branch_ids = [branch_id]
+        else:
+            result = await db.execute(select(Branch.id))
+            branch_ids = [row.id for row in result.all()]
+
+        summaries = {key: PortfolioSummaryService._empty() for key in branch_ids}
+        portfolio = PortfolioSummaryService._empty()
+
+        for row in (await db.execute(loan_query)).all():
+            targets = [
+                summaries.setdefault(row.branch_id, PortfolioSummaryService._empty())
+            ]
+            if branch_id is None:
+                targets.append(portfolio)
+            for summary in targets:
+                PortfolioSummaryService._add_loan_group(summary, row)
+
+        for row in (await db.execute(user_query)).all():
+            if row.branch_id in summaries:
+                summaries[row.branch_id]["total_farmers"] += row.farmers
+                summaries[row.branch_id]["total_users"] += row.users
+            portfolio["total_farmers"] += row.farmers
+            portfolio["total_users"] += row.users
+
+        scopes = dict(summaries)
+        if branch_id is None:
+            portfolio["total_branches"] = len(branch_ids)
+            scopes[None] = portfolio
+
+        # Replace today's rows for the refreshed scopes
+        scope_condition = PortfolioDailySummary.branch_id.in_(
+            [key for key in scopes if key is not None]
+        )
+        if branch_id is None:
+            scope_condition = or_(
+                scope_condition, PortfolioDailySummary.branch_id.is_(None)
+            )
+        await db.execute(
+            delete(PortfolioDailySummary).where(
+                PortfolioDailySummary.summary_date == today, scope_condition
+            )
+        )
+
+        refreshed_at = datetime.utcnow()
+        for key, summary in scopes.items():
+            db.add(
+                PortfolioDailySummary(
+                    summary_date=today,
+                    branch_id=key,
+                    total_loans=summary["total_loans"],
+                    pending_approvals=summary["status_breakdown"].get(
+                        LoanStatus.PENDING_APPROVAL.value, 0
+                    ),
+                    active_loans=summary["active_loans"],
+                    overdue_loans=summary["overdue_loans"],
+                    recent_loans_30_days=summary["recent_loans_30_days"],
+                    total_outstanding=summary["total_outstanding"],
+                    disbursed_this_month_count=summary["disbursed_this_month_count"],
+                    disbursed_this_month_amount=summary["disbursed_this_month_amount"],
+                    total_farmers=summary["total_farmers"],
+                    total_users=summary["total_users"],
+                    total_branches=summary["total_branches"],
+                    status_breakdown=json.dumps(summary["status_breakdown"]),
+                    loans_by_type=json.dumps(
+                        [
+                            {
+                                "loan_type": loan_type,
+                                "count": totals["count"],
+                                "total_amount": float(totals["total_amount"]),
+                            }
+                            for loan_type, totals in summary["loans_by_type"].items()
+                        ]
+                    ),
+                    source_version=(
+                        sum(versions.values()) if key is None else versions.get(key, 0)
+                    ),
+                    refreshed_at=refreshed_at,
+                )
+            )
+        await db.flush()
+
+    @staticmethod
+    async def mark_stale(db: AsyncSession, branch_ids: Iterable[Optional[int]]):
+        """
+        Bump the write version of these branches, so the next overview read
+        of them and of the portfolio recomputes. Call after the write
+        commits; runs its own short transaction and leaves db untouched.
+        A failure is logged: the summary then catches up on its max age.
+        """
+        keys = sorted({NO_BRANCH_KEY if key is None else key for key in branch_ids})
+        if not keys:
+            return
+
+        stmt = pg_insert(PortfolioSummaryVersion).values(
+            [{"branch_key": key, "version": 1} for key in keys]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PortfolioSummaryVersion.branch_key],
+            set_={"version": PortfolioSummaryVersion.version + 1},
+        )
+        try:
+            async with AsyncSession(db.bind) as session:
+                await session.execute(stmt)
+                await session.commit()
+        except SQLAlchemyError as e:
+            logger.warning(f"Portfolio summary version bump failed: {str(e)}")
+
+    @staticmethod
+    async def _current_version(db: AsyncSession, branch_id: Optional[int]) -> int:
+        """Write version of a branch, or the sum over all branches"""
+        query = select(func.coalesce(func.sum(PortfolioSummaryVersion.version), 0))
+        if branch_id is not None:
+            query = query.where(PortfolioSummaryVersion.branch_key == branch_id)
+        return int(await db.scalar(query))
+
+    @staticmethod
+    async def _get_row(
+        db: AsyncSession, summary_date: date, branch_id: Optional[int]
+    ) -> Optional[PortfolioDailySummary]:
+        branch_condition = (
+            PortfolioDailySummary.branch_id.is_(None)
+            if branch_id is None
+            else PortfolioDailySummary.branch_id == branch_id
+        )
+        result = await db.execute(
+            select(PortfolioDailySummary)
+            .where(PortfolioDailySummary.summary_date == summary_date, branch_condition)
+            .order_by(PortfolioDailySummary.refreshed_at.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    def _empty() -> Dict:
+        return {
+            "total_loans": 0,
+            "active_loans": 0,
+            "overdue_loans": 0,
+            "recent_loans_30_days": 0,
+            "total_outstanding": Decimal(0),
+            "disbursed_this_month_count": 0,
+            "disbursed_this_month_amount": Decimal(0),
+            "total_farmers": 0,
+            "total_users": 0,
+            "total_branches": 0,
+            "status_breakdown": {},
+            "loans_by_type": {},
+        }
+
+    @staticmethod
+    def _add_loan_group(summary: Dict, row):
+        """Fold one (branch, status, loan type) group into a summary"""
+        summary["total_loans"] += row.count
+        summary["active_loans"] += row.active
+        summary["overdue_loans"] += row.overdue
+        summary["recent_loans_30_days"] += row.recent
+        summary["total_outstanding"] += Decimal(str(row.outstanding or 0))
+        summary["disbursed_this_month_count"] += row.disbursed_count
+        summary["disbursed_this_month_amount"] += Decimal(str(row.disbursed_amount or 0))
+
+        status_key = row.status.value
+        summary["status_breakdown"][status_key] = (
+            summary["status_breakdown"].get(status_key, 0) + row.count
+        )
+
+        by_type = summary["loans_by_type"].setdefault(
+            row.loan_type.value, {"count": 0, "total_amount": Decimal(0)}
+        )
+        by_type["count"] += row.count
+        by_type["total_amount"] += Decimal(str(row.principal or 0))
+
+    @staticmethod
+    def _to_overview(row: PortfolioDailySummary) -> Dict:
+        """Summary row in the /dashboard/stats/overview response shape"""
+        status_counts: Dict[str, int] = json.loads(row.status_breakdown or "{}")
+        loans_by_type: List[Dict] = json.loads(row.loans_by_type or "[]")
+        total_disbursed = float(row.disbursed_this_month_amount or 0)
+
+        return {
+            "pendingApprovals": row.pending_approvals,
+            "totalLoans": row.total_loans,
+            "activeLoans": row.active_loans,
+            "totalFarmers": row.total_farmers,
+            "totalUsers": row.total_users if row.branch_id is None else 0,
+            "totalDisbursed": total_disbursed,
+            "overdueLoans": row.overdue_loans,
+            "collectionRate": 0,  # Can be calculated later
+            "monthlyDisbursement": total_disbursed,
+            "totalBranches": row.total_branches,
+            "status_breakdown": status_counts,
+            "total_disbursed_amount": total_disbursed,
+            "total_disbursed_count": row.disbursed_this_month_count,
+            "total_outstanding": float(row.total_outstanding or 0),
+            "loans_by_type": loans_by_type,
+            "recent_loans_30_days": row.recent_loans_30_days,
+            "as_of_date": row.summary_date.isoformat(),
+            "refreshed_at": row.refreshed_at.isoformat(),
+        }
@@ -0,0 +1,284 @@
+"""
+Report export service
+Streams large exports from a server-side cursor as CSV or XLSX
+"""
+
+import csv
+import io
+from datetime import date, datetime
+from typing import AsyncIterator, List, Optional
+
+import xlsxwriter
+from sqlalchemy import select, and_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User, Branch
+from app.models.loan import Loan, LoanStatus, LoanType, EMISchedule
+
+
+LOAN_EXPORT_HEADER = [
+    "Loan Number",
+    "Farmer Name",
+    "Branch Name",
+    "Loan Type",
+    "Principal Amount",
+    "Interest Rate",
+    "Tenure (Months)",
+    "EMI Amount",
+    "Total Payable",
+    "Total Outstanding",
+    "Status",
+    "Sanction Date",
+    "Disbursement Date",
+    "Created At",
+]
+
+EMI_SCHEDULE_EXPORT_HEADER = [
+    "Loan Number",
+    "Farmer Name",
+    "Installment Number",
+    "Due Date",
+    "EMI Amount",
+    "Principal Component",
+    "Interest Component",
+    "Outstanding Principal",
+    "Is Paid",
+    "Paid Date",
+    "Paid Amount",
+    "Is Overdue",
+    "Overdue Days",
+]
+
+
+class ReportExportService:
+    """Service for streaming report exports"""
+
+    # Rows fetched per round trip from the server-side cursor
+    FETCH_SIZE = 1000
+
+    # Rows per worksheet, header included (the XLSX format limit)
+    XLSX_MAX_ROWS = 1048576
+
+    @staticmethod
+    def loan_export_query(
+        branch_id: Optional[int] = None,
+        status_filter: Optional[LoanStatus] = None,
+        loan_type_filter: Optional[LoanType] = None,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+    ):
+        """Column-only select of the loan export, newest first"""
+        query = (
+            select(
+                Loan.loan_number,
+                User.full_name.label("farmer_name"),
+                Branch.name.label("branch_name"),
+                Loan.loan_type,
+                Loan.principal_amount,
+                Loan.interest_rate,
+                Loan.tenure_months,
+                Loan.emi_amount,
+                Loan.total_amount_payable,
+                Loan.total_outstanding,
+                Loan.status,
+                Loan.sanction_date,
+                Loan.disbursement_date,
+                Loan.created_at,
+            )
+            .outerjoin(User, Loan.farmer_id == User.id)
+            .outerjoin(Branch, Loan.branch_id == Branch.id)
+        )
+
+        filters = []
+        if branch_id is not None:
+            filters.append(Loan.branch_id == branch_id)
+        if status_filter:
+            filters.append(Loan.status == status_filter)
+        if loan_type_filter:
+            filters.append(Loan.loan_type == loan_type_filter)
+        if from_date:
+            filters.append(
+                Loan.created_at >= datetime.combine(from_date, datetime.min.time())
+            )
+        if to_date:
+            filters.append(
+                Loan.created_at <= datetime.combine(to_date, datetime.max.time())
+            )
+
+        if filters:
+            query = query.where(and_(*filters))
+
+        return query.order_by(Loan.created_at.desc())
+
+    @staticmethod
+    def loan_export_row(row) -> List:
+        """One export row, formatted as the CSV has always been"""
+        return [
+            row.loan_number,
+            row.farmer_name or "",
+            row.branch_name or "",
+            row.loan_type.value,
+            f"{row.principal_amount:.2f}",
+            f"{row.interest_rate:.2f}",
+            row.tenure_months,
+            f"{row.emi_amount:.2f}" if row.emi_amount else "",
+            f"{row.total_amount_payable:.2f}",
+            f"{row.total_outstanding:.2f}",
+            row.status.value,
+            row.sanction_date.isoformat() if row.sanction_date else "",
+            row.disbursement_date.isoformat() if row.disbursement_date else "",
+            row.created_at.isoformat(),
+        ]
+
+    @staticmethod
+    def loan_export_values(row) -> List:
+        """One export row with numeric cells kept as numbers (XLSX)"""
+        return [
+            row.loan_number,
+            row.farmer_name or "",
+            row.branch_name or "",
+            row.loan_type.value,
+            row.principal_amount,
+            row.interest_rate,
+            row.tenure_months,
+            row.emi_amount if row.emi_amount else "",
+            row.total_amount_payable,
+            row.total_outstanding,
+            row.status.value,
+            row.sanction_date.isoformat() if row.sanction_date else "",
+            row.disbursement_date.isoformat() if row.disbursement_date else "",
+            row.created_at.isoformat(),
+        ]
+
+    @staticmethod
+    def emi_schedule_export_query(
+        loan_id: Optional[int] = None, branch_id: Optional[int] = None
+    ):
+        """Column-only select of EMI schedules, by loan and installment"""
+        query = (
+            select(
+                Loan.loan_number,
+                User.full_name.label("farmer_name"),
+                EMISchedule.installment_number,
+                EMISchedule.due_date,
+                EMISchedule.emi_amount,
+                EMISchedule.principal_component,
+                EMISchedule.interest_component,
+                EMISchedule.outstanding_principal,
+                EMISchedule.is_paid,
+                EMISchedule.paid_date,
+                EMISchedule.paid_amount,
+                EMISchedule.is_overdue,
+                EMISchedule.overdue_days,
+            )
+            .join(Loan, EMISchedule.loan_id == Loan.id)
+            .outerjoin(User, Loan.farmer_id == User.id)
+        )
+
+        if loan_id is not None:
+            query = query.where(EMISchedule.loan_id == loan_id)
+        if branch_id is not None:
+            query = query.where(Loan.branch_id == branch_id)
+
+        return query.order_by(EMISchedule.loan_id, EMISchedule.installment_number)
+
+    @staticmethod
+    def emi_schedule_export_row(row) -> List:
+        return [
+            row.loan_number,
+            row.farmer_name or "",
+            row.installment_number,
+            row.due_date.isoformat(),
+            f"{row.emi_amount:.2f}",
+            f"{row.principal_component:.2f}",
+            f"{row.interest_component:.2f}",
+            f"{row.outstanding_principal:.2f}",
+            "Yes" if row.is_paid else "No",
+            row.paid_date.isoformat() if row.paid_date else "",
+            f"{row.paid_amount:.2f}" if row.paid_amount else "",
+            "Yes" if row.is_overdue else "No",
+            row.overdue_days or 0,
+        ]
+
+    @staticmethod
+    async def count_rows(db: AsyncSession, query) -> int:
+        """Row count of an export query, used for job progress"""
+        result = await db.execute(
+            select(func.count()).select_from(query.order_by(None).subquery())
+        )
+        return result.scalar() or 0
+
+    @staticmethod
+    async def iter_rows(db: AsyncSession, query) -> AsyncIterator[List]:
+        """Yield batches of result rows from a server-side cursor"""
+        result = await db.stream(
+            query.execution_options(yield_per=ReportExportService.FETCH_SIZE)
+        )
+        async for rows in result.partitions():
+            yield rows
+
+    @staticmethod
+    async def iter_csv(
+        db: AsyncSession, query, header: List[str], format_row
+    ) -> AsyncIterator[str]:
+        """Yield CSV text one fetched batch at a time"""
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(header)
+
+        async for rows in ReportExportService.iter_rows(db, query):
+            writer.writerows(format_row(row) for row in rows)
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+
+        if output.tell():
+            yield output.getvalue()
+
+    @staticmethod
+    async def write_xlsx(
+        db: AsyncSession,
+        query,
+        header: List[str],
+        format_row,
+        path: str,
+        sheet_name: str = "Export",
+    ) -> int:
+        """
+        Write the export to an XLSX file at path. xlsxwriter's
+        constant_memory mode flushes each row to disk as it is written.
+        Rows past XLSX_MAX_ROWS continue on further sheets ("Loans 2", ...).
+        Returns the number of data rows.
+        """
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        bold = workbook.add_format({"bold": True})
+
+        def add_sheet(number: int):
+            name = sheet_name if number == 1 else f"{sheet_name} {number}"
+            worksheet = workbook.add_worksheet(name)
+            worksheet.write_row(0, 0, header, bold)
+            return worksheet
+
+        sheet_count = 1
+        worksheet = add_sheet(sheet_count)
+        sheet_row = 0
+        row_count = 0
+        try:
+            async for rows in ReportExportService.iter_rows(db, query):
+                for row in rows:
+                    if sheet_row + 1 >= ReportExportService.XLSX_MAX_ROWS:
+                        sheet_count += 1
+                        worksheet = add_sheet(sheet_count)
+                        sheet_row = 0
+                    sheet_row += 1
+                    row_count += 1
+                    # -1 means the cell is outside the sheet; never truncate
+                    if worksheet.write_row(sheet_row, 0, format_row(row)) == -1:
+                        raise ValueError(
+                            f"XLSX row {sheet_row} of sheet {sheet_count} "
+                            "is out of range"
+                        )
+        finally:
+            workbook.close()
+
+        return row_count
@@ -0,0 +1,358 @@
+"""
+Report job service
+Runs heavy report exports off the request path into compressed artifacts
+"""
+
+import csv
+import gzip
+import hashlib
+import json
+import logging
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select, update, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.loan import LoanStatus, LoanType
+from app.models.report_job import ReportJob
+from app.services.report_export_service import (
+    ReportExportService,
+    LOAN_EXPORT_HEADER,
+    EMI_SCHEDULE_EXPORT_HEADER,
+)
+from app.services.report_service import ReportService
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ReportJobService:
+    """
+    Service for background report jobs.
+
+    A job is identified by the hash of its report type and parameters
+    (branch scope included). Submitting a request whose hash matches a
+    pending, running or unexpired completed job returns that job instead
+    of generating the report again.
+    """
+
+    REPORT_TYPES = ("loans_export", "monthly_report", "emi_schedules")
+
+    @staticmethod
+    def request_hash(report_type: str, params: Dict) -> str:
+        payload = json.dumps(
+            {"report_type": report_type, "params": params},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def branch_scope(job: ReportJob) -> Optional[int]:
+        """Branch a job's report covers; None for a portfolio-wide report"""
+        return json.loads(job.params_json or "{}").get("branch_id")
+
+    @staticmethod
+    async def submit(
+        db: AsyncSession,
+        report_type: str,
+        params: Dict,
+        requested_by: Optional[int] = None,
+        force: bool = False,
+    ) -> Tuple[ReportJob, bool]:
+        """
+        Create a job for the report, or reuse an equivalent one.
+        Returns (job, created); created is False when an existing job
+        was reused. Commits.
+        """
+        if report_type not in ReportJobService.REPORT_TYPES:
+            raise ValueError(f"Unknown report type: {report_type}")
+
+        request_hash = ReportJobService.request_hash(report_type, params)
+
+        if await ReportJobService.fail_abandoned(db, request_hash):
+            await db.commit()
+
+        if not force:
+            existing = await ReportJobService.find_reusable(db, request_hash)
+            if existing is not None:
+                return existing, False
+
+        job = ReportJob(
+            report_type=report_type,
+            params_json=json.dumps(params, sort_keys=True, default=str),
+            request_hash=request_hash,
+            requested_by=requested_by,
+            status="pending",
+            progress=0,
+            rows_written=0,
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        return job, True
+
+    @staticmethod
+    async def find_reusable(
+        db: AsyncSession, request_hash: str
+    ) -> Optional[ReportJob]:
+        """Newest in-flight or unexpired completed job for this request"""
+        result = await db.execute(
+            select(ReportJob)
+            .where(
+                ReportJob.request_hash == request_hash,
+                or_(
+                    ReportJob.status.in_(["pending", "running"]),
+                    and_(
+                        ReportJob.status == "completed",
+                        ReportJob.expires_at > datetime.utcnow(),
+                    ),
+                ),
+            )
+            .order_by(ReportJob.created_at.desc())
+            .limit(1)
+        )
+        job = result.scalar_one_or_none()
+
+        # A completed job whose artifact was removed cannot be reused
+        if (
+            job is not None
+            and job.status == "completed"
+            and not (job.file_path and os.path.exists(job.file_path))
+        ):
+            return None
+        return job
+
+    @staticmethod
+    async def fail_abandoned(
+        db: AsyncSession, request_hash: Optional[str] = None
+    ) -> int:
+        """
+        Mark jobs pending or running for longer than REPORT_JOB_STALE_MINUTES
+        as failed, e.g. after their worker crashed, so they are not reused.
+        Limited to one request when request_hash is given. Does not commit.
+        """
+        cutoff = datetime.utcnow() - timedelta(
+            minutes=settings.REPORT_JOB_STALE_MINUTES
+        )
+        stmt = (
+            update(ReportJob)
+            .where(
+                or_(
+                    and_(ReportJob.status == "pending", ReportJob.created_at < cutoff),
+                    and_(ReportJob.status == "running", ReportJob.started_at < cutoff),
+                )
+            )
+            .values(
+                status="failed",
+                error_message="Abandoned: no result within the stale job window",
+                completed_at=datetime.utcnow(),
+            )
+        )
+        if request_hash is not None:
+            stmt = stmt.where(ReportJob.request_hash == request_hash)
+        result = await db.execute(stmt)
+        return result.rowcount
+
+    @staticmethod
+    async def get_job(db: AsyncSession, job_id: int) -> Optional[ReportJob]:
+        result = await db.execute(select(ReportJob).where(ReportJob.id == job_id))
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def run(db: AsyncSession, stream_db: AsyncSession, job_id: int) -> Dict:
+        """
+        Generate a job's artifact. Job state and progress are committed
+        through db while report rows are read through stream_db, so
+        progress commits never close the server-side cursor.
+        """
+        job = await ReportJobService.get_job(db, job_id)
+        if job is None:
+            raise ValueError(f"Report job {job_id} not found")
+        if job.status != "pending":
+            return {"job_id": job.id, "status": job.status}
+
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        await db.commit()
+
+        params = json.loads(job.params_json or "{}")
+        os.makedirs(settings.REPORT_ARTIFACT_DIR, exist_ok=True)
+        path = None
+
+        try:
+            if job.report_type == "monthly_report":
+                file_name = (
+                    f"monthly_report_{params['year']}_{params['month']:02d}.json.gz"
+                )
+                path = ReportJobService._artifact_path(job.id, file_name)
+                report = await ReportService.monthly_report(
+                    stream_db, params["year"], params["month"], params.get("branch_id")
+                )
+                with gzip.open(path, "wt", encoding="utf-8") as artifact:
+                    json.dump(report, artifact, default=str)
+                rows_total = rows_written = 1
+            else:
+                query, header, format_row, file_name = ReportJobService._export_spec(
+                    job.report_type, params
+                )
+                path = ReportJobService._artifact_path(job.id, file_name)
+                rows_total = await ReportExportService.count_rows(stream_db, query)
+                await ReportJobService._set_progress(db, job.id, 0, rows_total)
+                rows_written = await ReportJobService._write_csv_gz(
+                    db, stream_db, job.id, query, header, format_row, path, rows_total
+                )
+
+            job.status = "completed"
+            job.progress = 100
+            job.rows_total = rows_total
+            job.rows_written = rows_written
+            job.file_path = path
+            job.file_name = file_name
+            job.file_size = os.path.getsize(path)
+            job.completed_at = datetime.utcnow()
+            job.expires_at = job.completed_at + timedelta(
+                hours=settings.REPORT_ARTIFACT_RETENTION_HOURS
+            )
+            await db.commit()
+
+        except Exception as e:
+            logger.error(f"Report job {job_id} failed: {str(e)}", exc_info=True)
+            if path and os.path.exists(path):
+                os.remove(path)
+            await db.rollback()
+            await db.execute(
+                update(ReportJob)
+                .where(ReportJob.id == job_id)
+                .values(
+                    status="failed",
+                    error_message=str(e),
+                    completed_at=datetime.utcnow(),
+                )
+            )
+            await db.commit()
+            raise
+
+        return {
+            "job_id": job.id,
+            "status": job.status,
+            "rows_written": job.rows_written,
+            "file_size": job.file_size,
+        }
+
+    @staticmethod
+    async def cleanup_expired(db: AsyncSession) -> int:
+        """
+        Delete artifacts past their retention window and fail abandoned
+        jobs. Commits.
+        """
+        await ReportJobService.fail_abandoned(db)
+        result = await db.execute(
+            select(ReportJob).where(
+                ReportJob.status == "completed",
+                ReportJob.expires_at <= datetime.utcnow(),
+            )
+        )
+        jobs = result.scalars().all()
+
+        for job in jobs:
+            if job.file_path and os.path.exists(job.file_path):
+                try:
+                    os.remove(job.file_path)
+                except OSError as e:
+                    logger.warning(
+                        f"Could not remove report artifact {job.file_path}: {str(e)}"
+                    )
+                    continue
+            job.status = "expired"
+
+        await db.commit()
+        return len(jobs)
+
+    @staticmethod
+    def _artifact_path(job_id: int, file_name: str) -> str:
+        return os.path.join(settings.REPORT_ARTIFACT_DIR, f"{job_id}_{file_name}")
+
+    @staticmethod
+    def _export_spec(report_type: str, params: Dict):
+        """Query, header, row formatter and file name of a tabular export"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        if report_type == "loans_export":
+            query = ReportExportService.loan_export_query(
+                branch_id=params.get("branch_id"),
+                status_filter=(
+                    LoanStatus(params["status_filter"])
+                    if params.get("status_filter")
+                    else None
+                ),
+                loan_type_filter=(
+                    LoanType(params["loan_type_filter"])
+                    if params.get("loan_type_filter")
+                    else None
+                ),
+                from_date=(
+                    date.fromisoformat(params["from_date"])
+                    if params.get("from_date")
+                    else None
+                ),
+                to_date=(
+                    date.fromisoformat(params["to_date"])
+                    if params.get("to_date")
+                    else None
+                ),
+            )
+            return (
+                query,
+                LOAN_EXPORT_HEADER,
+                ReportExportService.loan_export_row,
+                f"loans_export_{timestamp}.csv.gz",
+            )
+
+        query = ReportExportService.emi_schedule_export_query(
+            loan_id=params.get("loan_id"), branch_id=params.get("branch_id")
+        )
+        return (
+            query,
+            EMI_SCHEDULE_EXPORT_HEADER,
+            ReportExportService.emi_schedule_export_row,
+            f"emi_schedules_{timestamp}.csv.gz",
+        )
+
+    @staticmethod
+    async def _write_csv_gz(
+        db: AsyncSession,
+        stream_db: AsyncSession,
+        job_id: int,
+        query,
+        header,
+        format_row,
+        path: str,
+        rows_total: int,
+    ) -> int:
+        rows_written = 0
+        with gzip.open(path, "wt", encoding="utf-8", newline="") as artifact:
+            writer = csv.writer(artifact)
+            writer.writerow(header)
+            async for rows in ReportExportService.iter_rows(stream_db, query):
+                writer.writerows(format_row(row) for row in rows)
+                rows_written += len(rows)
+                await ReportJobService._set_progress(
+                    db, job_id, rows_written, rows_total
+                )
+        return rows_written
+
+    @staticmethod
+    async def _set_progress(
+        db: AsyncSession, job_id: int, rows_written: int, rows_total: int
+    ):
+        # Capped below 100 until the artifact is finalized
+        progress = min(99, rows_written * 100 // rows_total) if rows_total else 0
+        await db.execute(
+            update(ReportJob)
+            .where(ReportJob.id == job_id)
+            .values(rows_written=rows_written, rows_total=rows_total, progress=progress)
+        )
+        await db.commit()
@@ -0,0 +1,249 @@
+"""
+Report service
+Report computations shared by the API and background report jobs
+"""
+
+from calendar import monthrange
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import (
+    select,
+    func,
+    case,
+    extract,
+    literal_column,
+    null,
+    union_all,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.loan import Loan, EMISchedule
+from app.models.payment import Payment, PaymentStatus
+
+
+class ReportService:
+    """Service for report computations"""
+
+    @staticmethod
+    async def monthly_report(
+        db: AsyncSession, year: int, month: int, branch_id: Optional[int] = None
+    ) -> Dict:
+        """
+        Monthly performance report: loans created and disbursed, EMIs due
+        and collected, and payments in the month. branch_id limits the
+        report to one branch.
+        """
+        series = await ReportService.monthly_series(
+            db, year, month, year, month, branch_id
+        )
+        return series[0]
+
+    @staticmethod
+    async def monthly_series(
+        db: AsyncSession,
+        from_year: int,
+        from_month: int,
+        to_year: int,
+        to_month: int,
+        branch_id: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        Monthly reports for every month from from_year/from_month to
+        to_year/to_month inclusive, in one query: grouped aggregates of
+        loans created, loans disbursed, payments and EMIs due, bucketed by
+        month and combined with UNION ALL. Branch scoping is a join on
+        loans, so no rows are filtered in Python.
+        """
+        first_day = date(from_year, from_month, 1)
+        last_day = date(to_year, to_month, monthrange(to_year, to_month)[1])
+        generated_at = datetime.now().isoformat()
+
+        def by_month(column):
+            return extract("year", column), extract("month", column)
+
+        def scoped(query, *joins):
+            for target, on in joins:
+                query = query.join(target, on)
+            if branch_id is not None:
+                query = query.where(Loan.branch_id == branch_id)
+            return query
+
+        # Loans created, per month and status
+        created_year, created_month = by_month(Loan.created_at)
+        created = scoped(
+            select(
+                literal_column("'created'").label("source"),
+                created_year.label("year"),
+                created_month.label("month"),
+                Loan.status.label("status"),
+                func.count(Loan.id).label("count"),
+                func.sum(Loan.principal_amount).label("amount"),
+                literal_column("0").label("paid_count"),
+                literal_column("0").label("paid_amount"),
+            )
+            .where(
+                Loan.created_at >= datetime.combine(first_day, datetime.min.time()),
+                Loan.created_at <= datetime.combine(last_day, datetime.max.time()),
+            )
+            .group_by(created_year, created_month, Loan.status)
+        )
+
+        # Loans disbursed
+        disbursed_year, disbursed_month = by_month(Loan.disbursement_date)
+        disbursed = scoped(
+            select(
+                literal_column("'disbursed'"),
+                disbursed_year,
+                disbursed_month,
+                null(),
+                func.count(Loan.id),
+                func.sum(Loan.principal_amount),
+                literal_column("0"),
+                literal_column("0"),
+            )
+            .where(
+                Loan.disbursement_date >= first_day,
+                Loan.disbursement_date <= last_day,
+            )
+            .group_by(disbursed_year, disbursed_month)
+        )
+
+        # Successful payments
+        payment_year, payment_month = by_month(Payment.payment_date)
+        payment_query = select(
+            literal_column("'payments'"),
+            payment_year,
+            payment_month,
+            null(),
+            func.count(Payment.id),
+            func.sum(Payment.amount),
+            literal_column("0"),
+            literal_column("0"),
+        ).where(
+            Payment.payment_date >= first_day,
+            Payment.payment_date <= last_day,
+            Payment.status == PaymentStatus.SUCCESS,
+        )
+        if branch_id is not None:
+            payment_query = scoped(payment_query, (Loan, Payment.loan_id == Loan.id))
+        payments = payment_query.group_by(payment_year, payment_month)
+
+        # EMIs due, and how many of them are paid
+        emi_year, emi_month = by_month(EMISchedule.due_date)
+        emi_query = select(
+            literal_column("'emis'"),
+            emi_year,
+            emi_month,
+            null(),
+            func.count(EMISchedule.id),
+            func.sum(EMISchedule.emi_amount),
+            func.count(case((EMISchedule.is_paid == True, EMISchedule.id))),
+            func.sum(
+                case(
+                    (EMISchedule.is_paid == True, EMISchedule.paid_amount),
+                    else_=0,
+                )
+            ),
+        ).where(EMISchedule.due_date >= first_day, EMISchedule.due_date <= last_day)
+        if branch_id is not None:
+            emi_query = scoped(emi_query, (Loan, EMISchedule.loan_id == Loan.id))
+        emis = emi_query.group_by(emi_year, emi_month)
+
+        result = await db.execute(union_all(created, disbursed, payments, emis))
+
+        months = {}
+        cursor = first_day
+        while cursor <= last_day:
+            months[(cursor.year, cursor.month)] = ReportService._empty_month(
+                cursor, generated_at
+            )
+            cursor = (cursor + timedelta(days=32)).replace(day=1)
+
+        for row in result.all():
+            report = months[(int(row.year), int(row.month))]
+            amount = float(row.amount or 0)
+
+            if row.source == "created":
+                loan_stats = report["loan_statistics"]
+                loan_stats["loans_created"] += row.count
+                loan_stats["amount_sanctioned"] += amount
+                status_val = row.status.value
+                loan_stats["loans_by_status"][status_val] = (
+                    loan_stats["loans_by_status"].get(status_val, 0) + row.count
+                )
+            elif row.source == "disbursed":
+                report["loan_statistics"]["loans_disbursed"] = row.count
+                report["loan_statistics"]["amount_disbursed"] = amount
+            elif row.source == "payments":
+                report["payment_statistics"]["total_payments"] = row.count
+                report["payment_statistics"]["total_amount"] = amount
+            else:
+                collection_stats = report["collection_statistics"]
+                collection_stats["emis_due"] = row.count
+                collection_stats["amount_due"] = amount
+                collection_stats["emis_paid"] = row.paid_count
+                collection_stats["amount_collected"] = float(row.paid_amount or 0)
+
+        return [ReportService._finish_month(report) for report in months.values()]
+
+    @staticmethod
+    def _empty_month(first_day: date, generated_at: str) -> Dict:
+        return {
+            "report_period": {
+                "month": first_day.month,
+                "year": first_day.year,
+                "month_name": first_day.strftime("%B %Y"),
+                "generated_at": generated_at,
+            },
+            "loan_statistics": {
+                "loans_created": 0,
+                "amount_sanctioned": 0.0,
+                "loans_disbursed": 0,
+                "amount_disbursed": 0.0,
+                "loans_by_status": {},
+            },
+            "collection_statistics": {
+                "emis_due": 0,
+                "amount_due": 0.0,
+                "emis_paid": 0,
+                "amount_collected": 0.0,
+                "collection_rate_percentage": 0,
+                "collection_efficiency_percentage": 0,
+            },
+            "payment_statistics": {
+                "total_payments": 0,
+                "total_amount": 0.0,
+            },
+        }
+
+    @staticmethod
+    def _finish_month(report: Dict) -> Dict:
+        """Round amounts and derive the collection percentages"""
+        loan_stats = report["loan_statistics"]
+        collection_stats = report["collection_statistics"]
+        payment_stats = report["payment_statistics"]
+
+        emis_due = collection_stats["emis_due"]
+        amount_due = collection_stats["amount_due"]
+        collection_rate = (
+            (collection_stats["emis_paid"] / emis_due * 100) if emis_due > 0 else 0
+        )
+        collection_efficiency = (
+            (collection_stats["amount_collected"] / amount_due * 100)
+            if amount_due > 0
+            else 0
+        )
+
+        loan_stats["amount_sanctioned"] = round(loan_stats["amount_sanctioned"], 2)
+        loan_stats["amount_disbursed"] = round(loan_stats["amount_disbursed"], 2)
+        collection_stats["amount_due"] = round(amount_due, 2)
+        collection_stats["amount_collected"] = round(
+            collection_stats["amount_collected"], 2
+        )
+        collection_stats["collection_rate_percentage"] = round(collection_rate, 2)
+        collection_stats["collection_efficiency_percentage"] = round(
+            collection_efficiency, 2
+        )
+        payment_stats["total_amount"] = round(payment_stats["total_amount"], 2)
+        return report
@@ -5,20 +5,36 @@ Advanced loan calculation system with AI assistance
 
 from datetime import datetime, timedelta, date
 from typing import Dict, List, Optional, Tuple
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, func, event, delete, or_
+import hashlib
 import logging
 import json
 import math
 
-from app.models.loan import Loan, LoanStatus, InterestCalculationType, EMISchedule
+import numpy as np
+
+from app.models.loan import (
+    Loan,
+    LoanStatus,
+    LoanType,
+    LoanTypeConfig,
+    InterestCalculationType,
+    EMISchedule,
+)
 from app.models.payment import Payment
-from app.models.loan_ledger import LoanLedger
+from app.models.loan_ledger import LoanLedger, CalculationCache
+from app.services.calculation_cache_service import CalculationCacheService
+from app.services.amortization_engine import amortize, round_paisa
+from app.services.loan_type_config_cache import LoanTypeConfigCache
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Calculation cache hit/miss counters for this process, per calculation type
+CACHE_STATS: Dict[str, Dict[str, int]] = {}
+
 # Try to configure Gemini AI, but don't fail if not available
 try:
     import google.generativeai as genai
@@ -34,12 +50,62 @@ except ImportError:
     logger.warning("Gemini AI package not installed")
 
 
+SESSION_MEMO_KEY = "smart_calculator_memo"
+
+
+def _new_memo() -> Dict[str, Dict]:
+    return {"loans": {}, "payments": {}, "loan_type_configs": {}}
+
+
+def _clear_session_memo(session, *args):
+    """Session after_flush / after_rollback hook: drop the session's memo"""
+    for rows in session.info.get(SESSION_MEMO_KEY, {}).values():
+        rows.clear()
+
+
+def _session_memo(db: AsyncSession) -> Dict[str, Dict]:
+    """
+    Identity memo shared by every calculator on db. The session hooks are
+    registered once, when the memo is created, and live as long as the
+    session; they hold no reference to any calculator.
+    """
+    session = db.sync_session
+    memo = session.info.get(SESSION_MEMO_KEY)
+    if memo is None:
+        memo = session.info[SESSION_MEMO_KEY] = _new_memo()
+        # Anything flushed through the session may change loans or
+        # payments, and a rollback expires the memoized instances
+        event.listen(session, "after_flush", _clear_session_memo)
+        event.listen(session, "after_rollback", _clear_session_memo)
+    return memo
+
+
 class SmartCalculator:
     """Smart loan calculator with caching, simulation, and AI assistance"""
 
     def __init__(self, db: AsyncSession, redis_client=None):
         self.db = db
         self.redis = redis_client
+        self.shared_cache = CalculationCacheService(redis_client)
+
+        # Session-scoped identity memo: one SELECT per loan / payment set /
+        # loan type config for the life of the session (one request)
+        memo = _session_memo(db) if db is not None else _new_memo()
+        self._loans: Dict[int, Loan] = memo["loans"]
+        self._payments: Dict[int, List[Payment]] = memo["payments"]
+        self._loan_type_configs: Dict[LoanType, Optional[LoanTypeConfig]] = memo[
+            "loan_type_configs"
+        ]
+
+    def invalidate(self, loan_id: Optional[int] = None):
+        """Drop memoized rows for one loan, or everything when loan_id is None"""
+        if loan_id is None:
+            self._loans.clear()
+            self._payments.clear()
+            self._loan_type_configs.clear()
+        else:
+            self._loans.pop(loan_id, None)
+            self._payments.pop(loan_id, None)
 
     # ==================== INSTANT CALCULATIONS ====================
 
@@ -228,6 +294,37 @@ class SmartCalculator:
             ),
         }
 
+    async def calculate_interest_for_days(
+        self, loan_id: int, days: int = 1, from_date: Optional[date] = None
+    ) -> Dict:
+        """
+        Interest on the outstanding principal for a number of days
+        starting at from_date, at the rate applicable on from_date
+        """
+        loan = await self._get_loan(loan_id)
+        if loan.disbursement_date is None:
+            raise ValueError("Loan has no disbursement date")
+
+        from_date = from_date or date.today()
+        principal = await self._get_outstanding_principal(loan_id, from_date)
+        annual_rate = await self._get_rate_for_period(loan, from_date)
+        interest = self._calculate_daily_interest(principal, annual_rate, days)
+
+        return {
+            "loan_id": loan_id,
+            "from_date": from_date.isoformat(),
+            "days": days,
+            "principal": float(principal),
+            "annual_rate": float(annual_rate),
+            "interest_amount": float(interest),
+        }
+
+    async def calculate_interest_for_tomorrow(self, loan_id: int) -> Dict:
+        """Interest the loan will accrue over the next day"""
+        return await self.calculate_interest_for_days(
+            loan_id, days=1, from_date=date.today()
+        )
+
     async def calculate_overdue_with_penalty(
         self, loan_id: int, overdue_amount: Decimal, overdue_days: int
     ) -> Dict:
@@ -290,6 +387,15 @@ class SmartCalculator:
         }
 
     async def generate_full_loan_ledger(self, loan_id: int) -> Dict:
+        """Full loan ledger, served from the calculation cache when fresh"""
+        return await self._read_through(
+            loan_id,
+            date.today(),
+            "LOAN_LEDGER",
+            lambda: self._build_full_loan_ledger(loan_id),
+        )
+
+    async def _build_full_loan_ledger(self, loan_id: int) -> Dict:
         """
         Generate complete loan ledger like banks
 
@@ -305,12 +411,7 @@ class SmartCalculator:
         loan = await self._get_loan(loan_id)
 
         # Get all payments
-        payments_result = await self.db.execute(
-            select(Payment)
-            .where(Payment.loan_id == loan_id)
-            .order_by(Payment.payment_date)
-        )
-        payments = payments_result.scalars().all()
+        payments = await self._get_payments(loan_id)
 
         # Get all EMI schedules
         emi_result = await self.db.execute(
@@ -363,15 +464,15 @@ class SmartCalculator:
         all_events.sort(key=lambda x: x["date"])
 
         # Generate ledger
-        for event in all_events:
-            if event["type"] == "emi_due":
-                emi = event["emi"]
+        for entry in all_events:
+            if entry["type"] == "emi_due":
+                emi = entry["emi"]
                 interest_component = emi.interest_amount
                 principal_component = emi.principal_amount
 
                 ledger_entries.append(
                     {
-                        "date": event["date"].isoformat(),
+                        "date": entry["date"].isoformat(),
                         "description": f"EMI #{emi.installment_number} Due",
                         "credit": 0,
                         "debit": float(emi.emi_amount),
@@ -380,13 +481,13 @@ class SmartCalculator:
                     }
                 )
 
-            elif event["type"] == "payment":
-                payment = event["payment"]
+            elif entry["type"] == "payment":
+                payment = entry["payment"]
                 running_balance -= payment.amount
 
                 ledger_entries.append(
                     {
-                        "date": event["date"].isoformat(),
+                        "date": entry["date"].isoformat(),
                         "description": f"Payment Received - {payment.payment_method}",
                         "credit": float(payment.amount),
                         "debit": 0,
@@ -417,6 +518,15 @@ class SmartCalculator:
         }
 
     async def generate_emi_amortization_table(self, loan_id: int) -> Dict:
+        """EMI amortization table, served from the calculation cache when fresh"""
+        return await self._read_through(
+            loan_id,
+            date.today(),
+            "EMI_AMORTIZATION",
+            lambda: self._build_emi_amortization_table(loan_id),
+        )
+
+    async def _build_emi_amortization_table(self, loan_id: int) -> Dict:
         """
         Generate EMI amortization table (like HDFC/Union Bank)
 
@@ -450,37 +560,37 @@ class SmartCalculator:
             else Decimal(str(loan.emi_amount))
         )
 
-        monthly_rate = interest_rate / Decimal(1200)  # Annual % to monthly decimal
         tenure = loan.tenure_months
 
-        amortization_schedule = []
-        outstanding = principal
-        total_interest_paid = Decimal(0)
-
-        for month in range(1, tenure + 1):
-            # Calculate interest for this month
-            interest_component = outstanding * monthly_rate
-            principal_component = emi - interest_component
-
-            # Update outstanding
-            outstanding -= principal_component
-            total_interest_paid += interest_component
-
-            # Handle last EMI adjustment
-            if month == tenure:
-                principal_component += outstanding
-                outstanding = Decimal(0)
-
-            amortization_schedule.append(
-                {
-                    "installment_number": month,
-                    "emi_amount": float(emi),
-                    "principal_component": float(principal_component),
-                    "interest_component": float(interest_component),
-                    "outstanding_balance": float(max(outstanding, Decimal(0))),
-                    "total_interest_paid": float(total_interest_paid),
-                }
-            )
+        columns = amortize([principal], [interest_rate], [tenure], [emi])
+        interest_column = columns["interest"][0, :tenure]
+        total_interest_column = np.cumsum(interest_column)
+
+        principal_components = round_paisa(
+            columns["principal"][0, :tenure], ROUND_HALF_UP
+        ).tolist()
+        interest_components = round_paisa(interest_column, ROUND_HALF_UP).tolist()
+        outstanding_balances = round_paisa(
+            np.maximum(columns["outstanding"][0, :tenure], 0), ROUND_HALF_UP
+        ).tolist()
+        total_interest_paid_column = round_paisa(
+            total_interest_column, ROUND_HALF_UP
+        ).tolist()
+
+        amortization_schedule = [
+            {
+                "installment_number": month,
+                "emi_amount": float(emi),
+                "principal_component": principal_components[month - 1],
+                "interest_component": interest_components[month - 1],
+                "outstanding_balance": outstanding_balances[month - 1],
+                "total_interest_paid": total_interest_paid_column[month - 1],
+            }
+            for month in range(1, tenure + 1)
+        ]
+        total_interest_paid = Decimal(
+            str(total_interest_paid_column[-1] if tenure else 0)
+        )
 
         total_payment = emi * Decimal(tenure)
 
@@ -509,6 +619,17 @@ class SmartCalculator:
         }
 
     async def get_loan_snapshot_on_date(self, loan_id: int, as_of_date: date) -> Dict:
+        """Loan snapshot on a date, served from the calculation cache when fresh"""
+        return await self._read_through(
+            loan_id,
+            as_of_date,
+            "SNAPSHOT",
+            lambda: self._build_loan_snapshot_on_date(loan_id, as_of_date),
+        )
+
+    async def _build_loan_snapshot_on_date(
+        self, loan_id: int, as_of_date: date
+    ) -> Dict:
         """
         Get EMI schedule and outstanding balance as of any date
         Shows what the loan looks like on that specific date
@@ -524,12 +645,9 @@ class SmartCalculator:
         emis = result.scalars().all()
 
         # Get payments up to as_of_date
-        payments_result = await self.db.execute(
-            select(Payment).where(
-                and_(Payment.loan_id == loan_id, Payment.payment_date <= as_of_date)
-            )
-        )
-        payments = payments_result.scalars().all()
+        payments = [
+            p for p in await self._get_payments(loan_id) if p.payment_date <= as_of_date
+        ]
         total_paid = sum(p.amount for p in payments)
 
         # Calculate outstanding
@@ -565,6 +683,12 @@ class SmartCalculator:
             "explanation": f"As of {as_of_date}, outstanding balance is ₹{outstanding:,.2f}",
         }
 
+    async def get_emi_schedule_as_of_date(
+        self, loan_id: int, as_of_date: date
+    ) -> Dict:
+        """EMI schedule with paid/pending/overdue status as of a date"""
+        return await self.get_loan_snapshot_on_date(loan_id, as_of_date)
+
     # ==================== SIMULATION / WHAT-IF ====================
 
     async def simulate_early_payment(
@@ -697,7 +821,7 @@ class SmartCalculator:
         days_elapsed = (as_of_date - loan.disbursement_date).days
         years_elapsed = days_elapsed / 365
 
-        current_rate = loan.interest_rate
+        current_rate = Decimal(str(loan.interest_rate))
         new_rate = current_rate
         rule_applied = None
 
@@ -866,13 +990,167 @@ class SmartCalculator:
     # ==================== HELPER METHODS ====================
 
     async def _get_loan(self, loan_id: int) -> Loan:
-        """Get loan by ID"""
+        """Get loan by ID (memoized for this calculator)"""
+        loan = self._loans.get(loan_id)
+        if loan is not None:
+            return loan
+
         result = await self.db.execute(select(Loan).where(Loan.id == loan_id))
         loan = result.scalar_one_or_none()
         if not loan:
             raise ValueError(f"Loan {loan_id} not found")
+        self._loans[loan_id] = loan
         return loan
 
+    async def _get_payments(self, loan_id: int) -> List[Payment]:
+        """Get all payments for a loan ordered by date (memoized)"""
+        payments = self._payments.get(loan_id)
+        if payments is not None:
+            return payments
+
+        result = await self.db.execute(
+            select(Payment)
+            .where(Payment.loan_id == loan_id)
+            .order_by(Payment.payment_date, Payment.id)
+        )
+        payments = list(result.scalars().all())
+        self._payments[loan_id] = payments
+        return payments
+
+    async def _get_loan_type_config(
+        self, loan_type: LoanType
+    ) -> Optional[LoanTypeConfig]:
+        """Get configuration for a loan type (memoized)"""
+        if loan_type in self._loan_type_configs:
+            return self._loan_type_configs[loan_type]
+
+        result = await self.db.execute(
+            select(LoanTypeConfig).where(LoanTypeConfig.loan_type == loan_type)
+        )
+        config = result.scalar_one_or_none()
+        self._loan_type_configs[loan_type] = config
+        return config
+
+    # ==================== CALCULATION CACHE ====================
+
+    async def _calculation_hash(self, loan_id: int) -> str:
+        """
+        Hash of everything a cached result depends on:
+        the loan row version and the loan's payment set
+        """
+        loan = await self._get_loan(loan_id)
+        payments = await self._get_payments(loan_id)
+
+        state = {
+            "loan": [
+                loan.id,
+                loan.updated_at.isoformat() if loan.updated_at else None,
+                loan.principal_amount,
+                loan.interest_rate,
+                loan.emi_amount,
+                loan.tenure_months,
+                loan.status.value if hasattr(loan.status, "value") else loan.status,
+            ],
+            "payments": [
+                [
+                    p.id,
+                    p.amount,
+                    p.payment_date.isoformat(),
+                    p.updated_at.isoformat() if p.updated_at else None,
+                ]
+                for p in payments
+            ],
+        }
+        return hashlib.sha256(
+            json.dumps(state, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+    async def _read_through(
+        self, loan_id: int, as_of_date: date, calculation_type: str, compute
+    ) -> Dict:
+        """
+        Serve a result from the shared Redis cache (no database round trip),
+        then from calculation_cache keyed by
+        (loan_id, as_of_date, calculation_type, cache_hash), computing and
+        storing it on a miss. Entries whose hash no longer matches the loan
+        state are never read and are replaced on the next miss.
+        """
+        stats = CACHE_STATS.setdefault(
+            calculation_type, {"hits": 0, "redis_hits": 0, "misses": 0}
+        )
+
+        generation, value = await self.shared_cache.get(
+            loan_id, as_of_date, calculation_type
+        )
+        if value is not None:
+            stats["redis_hits"] += 1
+            return value
+
+        cache_hash = await self._calculation_hash(loan_id)
+        now = datetime.utcnow()
+
+        result = await self.db.execute(
+            select(CalculationCache).where(
+                CalculationCache.loan_id == loan_id,
+                CalculationCache.as_of_date == as_of_date,
+                CalculationCache.calculation_type == calculation_type,
+                CalculationCache.cache_hash == cache_hash,
+                or_(
+                    CalculationCache.expires_at.is_(None),
+                    CalculationCache.expires_at > now,
+                ),
+            )
+        )
+        entry = result.scalars().first()
+
+        if entry:
+            stats["hits"] += 1
+            entry.accessed_count = (entry.accessed_count or 0) + 1
+            entry.last_accessed_at = now
+            value = json.loads(entry.result_json)
+            await self.shared_cache.set(
+                loan_id, as_of_date, calculation_type, value, generation
+            )
+            return value
+
+        stats["misses"] += 1
+        value = await compute()
+        if "error" in value:
+            return value
+
+        # Replace stale entries for this loan and calculation
+        await self.db.execute(
+            delete(CalculationCache).where(
+                CalculationCache.loan_id == loan_id,
+                CalculationCache.as_of_date == as_of_date,
+                CalculationCache.calculation_type == calculation_type,
+            )
+        )
+        self.db.add(
+            CalculationCache(
+                loan_id=loan_id,
+                as_of_date=as_of_date,
+                calculation_type=calculation_type,
+                result_json=json.dumps(value, default=str),
+                cache_hash=cache_hash,
+                expires_at=now
+                + timedelta(seconds=settings.CALCULATION_CACHE_TTL_SECONDS),
+                accessed_count=0,
+            )
+        )
+        await self.shared_cache.set(
+            loan_id, as_of_date, calculation_type, value, generation
+        )
+        return value
+
+    @staticmethod
+    def get_cache_stats() -> Dict[str, Dict[str, int]]:
+        """Calculation cache hit/miss counts for this process"""
+        return {
+            calculation_type: dict(counts)
+            for calculation_type, counts in CACHE_STATS.items()
+        }
+
     async def _get_outstanding_principal(
         self, loan_id: int, as_of_date: date
     ) -> Decimal:
@@ -887,12 +1165,9 @@ class SmartCalculator:
         )
 
         # Get total payments up to as_of_date
-        result = await self.db.execute(
-            select(Payment).where(
-                and_(Payment.loan_id == loan_id, Payment.payment_date <= as_of_date)
-            )
-        )
-        payments = result.scalars().all()
+        payments = [
+            p for p in await self._get_payments(loan_id) if p.payment_date <= as_of_date
+        ]
         total_paid = (
             sum(
                 (
@@ -955,6 +1230,10 @@ class SmartCalculator:
             else:
                 return base_rate + Decimal("2.0")  # Default +2%
 
+    def _get_rate_switch_date(self, loan: Loan) -> date:
+        """First date on which _get_rate_for_period applies the post-1-year rate"""
+        return loan.disbursement_date + timedelta(days=366)
+
     def _calculate_daily_interest(
         self, principal: Decimal, annual_rate: Decimal, days: int
     ) -> Decimal:
@@ -1024,8 +1303,6 @@ class SmartCalculator:
         if monthly_rate == 0:
             return int(principal / emi)
 
-        import math
-
         tenure = math.log(emi / (emi - principal * monthly_rate)) / math.log(
             1 + float(monthly_rate)
         )
@@ -1065,45 +1342,18 @@ class SmartCalculator:
         Compare multiple loan schemes for the same principal and tenure
         Returns comparison with total interest, EMI, and recommendations
         """
-        from app.models.loan import LoanTypeConfig, LoanType
-
         # Convert principal to Decimal if needed
         if not isinstance(principal, Decimal):
             principal = Decimal(str(principal))
 
         comparisons = []
+        configs = await LoanTypeConfigCache.get_all(self.db)
 
         for loan_type_str in loan_types:
             try:
-                # Get loan type configuration
-                loan_type_enum = LoanType(loan_type_str)
-                result = await self.db.execute(
-                    select(LoanTypeConfig).where(
-                        LoanTypeConfig.loan_type == loan_type_enum
-                    )
+                interest_rate, display_name, rate_after_year = self._scheme_rates(
+                    LoanType(loan_type_str).value, configs.get(loan_type_str)
                 )
-                config = result.scalar_one_or_none()
-
-                if not config:
-                    # Use default values if config not found
-                    interest_rate = Decimal("12.0")  # Default rate
-                    display_name = loan_type_str.upper()
-                    rate_after_year = Decimal("14.0")  # Default rate after 1 year
-                else:
-                    interest_rate = Decimal(str(config.default_interest_rate))
-                    display_name = config.display_name
-
-                    # Get rate after 1 year based on loan type (matching _get_rate_for_period logic)
-                    if loan_type_str == "sao":
-                        rate_after_year = Decimal("13.75")
-                    elif loan_type_str in ["rythu_bandhu", "rythu_nethany"]:
-                        rate_after_year = Decimal("14.5")
-                    elif loan_type_str == "long_term_emi":
-                        rate_after_year = Decimal("12.75")
-                    elif loan_type_str == "amul_loan":
-                        rate_after_year = Decimal("14.0")
-                    else:
-                        rate_after_year = interest_rate + Decimal("2.0")
 
                 # Calculate BOTH scenarios: within 1 year AND full tenure with rate switching
 
@@ -1254,6 +1504,129 @@ class SmartCalculator:
             "early_closure_comparison": early_closure_comparison,
         }
 
+    def _scheme_rates(
+        self, loan_type_str: str, config: Optional[Dict]
+    ) -> Tuple[Decimal, str, Decimal]:
+        """Base rate, display name and rate after one year for a scheme"""
+        if not config:
+            # Use default values if config not found
+            return Decimal("12.0"), loan_type_str.upper(), Decimal("14.0")
+
+        interest_rate = Decimal(str(config["default_interest_rate"]))
+
+        # Rate after 1 year based on loan type (matching _get_rate_for_period logic)
+        if loan_type_str == "sao":
+            rate_after_year = Decimal("13.75")
+        elif loan_type_str in ["rythu_bandhu", "rythu_nethany"]:
+            rate_after_year = Decimal("14.5")
+        elif loan_type_str == "long_term_emi":
+            rate_after_year = Decimal("12.75")
+        elif loan_type_str == "amul_loan":
+            rate_after_year = Decimal("14.0")
+        else:
+            rate_after_year = interest_rate + Decimal("2.0")
+
+        return interest_rate, config["display_name"], rate_after_year
+
+    async def compare_loan_schemes_grid(
+        self,
+        principals: List[Decimal],
+        tenures: List[int],
+        loan_types: Optional[List[str]] = None,
+    ) -> Dict:
+        """
+        Compare schemes across a grid of principals and tenures in one pass
+
+        Uses the same rules as compare_loan_schemes (base rate within the
+        first year, tenure-weighted blended rate beyond it) for every
+        scheme × principal × tenure cell. Metric matrices are indexed
+        [scheme][principal][tenure]; all active schemes are compared when
+        loan_types is not given.
+        """
+        if loan_types:
+            all_configs = await LoanTypeConfigCache.get_all(self.db)
+            configs = {
+                LoanType(loan_type).value: all_configs.get(loan_type)
+                for loan_type in loan_types
+            }
+        else:
+            configs = await LoanTypeConfigCache.get_active(self.db)
+
+        schemes = []
+        for loan_type_str, config in configs.items():
+            interest_rate, display_name, rate_after_year = self._scheme_rates(
+                loan_type_str, config
+            )
+            schemes.append(
+                {
+                    "loan_type": loan_type_str,
+                    "display_name": display_name,
+                    "base_rate": float(interest_rate),
+                    "rate_after_year": float(rate_after_year),
+                }
+            )
+
+        principal = np.array([float(p) for p in principals])
+        tenure = np.array(tenures, dtype=np.int64)
+        base_rate = np.array([scheme["base_rate"] for scheme in schemes])[:, None]
+        rate_after_year = np.array(
+            [scheme["rate_after_year"] for scheme in schemes]
+        )[:, None]
+
+        # scheme × tenure rates and EMI per rupee of principal
+        months_year1 = np.minimum(tenure, 12)
+        blended_rate = np.where(
+            tenure > 12,
+            (base_rate * 12 + rate_after_year * (tenure - 12)) / tenure,
+            base_rate,
+        )
+        within_year_factor = self._emi_factor(base_rate, months_year1)
+        full_tenure_factor = self._emi_factor(blended_rate, tenure)
+
+        # scheme × principal × tenure
+        emi = principal[None, :, None] * full_tenure_factor[:, None, :]
+        total_payable = emi * tenure
+        total_interest = total_payable - principal[None, :, None]
+        within_year_interest = (
+            principal[None, :, None] * within_year_factor[:, None, :] * months_year1
+            - principal[None, :, None]
+        )
+        early_closure_savings = np.where(
+            tenure > 12, total_interest - within_year_interest, 0.0
+        )
+
+        best_scheme = (
+            [
+                [schemes[index]["loan_type"] for index in row]
+                for row in np.argmin(total_interest, axis=0).tolist()
+            ]
+            if schemes
+            else []
+        )
+
+        return {
+            "principals": principal.tolist(),
+            "tenures": tenure.tolist(),
+            "schemes": schemes,
+            "interest_rate": np.round(blended_rate, 4).tolist(),
+            "emi_amount": round_paisa(emi, ROUND_HALF_UP).tolist(),
+            "total_interest": round_paisa(total_interest, ROUND_HALF_UP).tolist(),
+            "total_payable": round_paisa(total_payable, ROUND_HALF_UP).tolist(),
+            "early_closure_savings": round_paisa(
+                early_closure_savings, ROUND_HALF_UP
+            ).tolist(),
+            "best_scheme": best_scheme,
+        }
+
+    @staticmethod
+    def _emi_factor(annual_rate: np.ndarray, months: np.ndarray) -> np.ndarray:
+        """EMI per rupee of principal for reducing-balance repayment"""
+        monthly_rate = annual_rate / 1200
+        with np.errstate(divide="ignore", invalid="ignore"):
+            growth = np.power(1 + monthly_rate, months)
+            factor = monthly_rate * growth / (growth - 1)
+        return np.where(monthly_rate > 0, factor, 1 / months)
+
     async def get_smart_recommendations(
         self, loan_id: int, farmer_monthly_income: Optional[Decimal] = None
     ) -> Dict:
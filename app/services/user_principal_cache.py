@@ -0,0 +1,189 @@
+"""
+User principal cache
+Authenticated-user facts for authorization, cached in-process and in Redis
+"""
+
+import json
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from redis.asyncio.client import Redis as RedisClient
+from redis.asyncio import from_url as redis_from_url
+
+from app.models.user import User, UserRole
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class UserPrincipal:
+    """
+    The authenticated user as seen by authorization checks.
+    Endpoints that need the full users row (profile reads and updates,
+    password changes) depend on get_current_user_record instead.
+    """
+
+    __slots__ = (
+        "id",
+        "email",
+        "full_name",
+        "role",
+        "branch_id",
+        "is_active",
+        "token_version",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        email: str,
+        full_name: str,
+        role: UserRole,
+        branch_id: Optional[int],
+        is_active: bool,
+        token_version: int = 0,
+    ):
+        self.id = id
+        self.email = email
+        self.full_name = full_name
+        self.role = role
+        self.branch_id = branch_id
+        self.is_active = is_active
+        self.token_version = token_version
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserPrincipal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+            branch_id=user.branch_id,
+            is_active=bool(user.is_active),
+            token_version=user.token_version or 0,
+        )
+
+    def to_dict(self) -> Dict:
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["role"] = self.role.value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "UserPrincipal":
+        return cls(**{**data, "role": UserRole(data["role"])})
+
+    def __repr__(self):
+        return f"<UserPrincipal {self.email} ({self.role})>"
+
+
+class UserPrincipalCache:
+    """
+    Two-level principal cache: a short-lived in-process map in front of
+    Redis. Writes that change a user's role, branch, active flag or
+    password call invalidate(); other workers' in-process entries expire
+    within USER_PRINCIPAL_LOCAL_TTL_SECONDS.
+    """
+
+    KEY_PREFIX = "auth:principal:"
+
+    _redis: Optional[RedisClient] = None
+    _local: Dict[int, Tuple[float, UserPrincipal]] = {}
+
+    @classmethod
+    async def _get_redis(cls) -> Optional[RedisClient]:
+        if not settings.REDIS_URL:
+            return None
+
+        if cls._redis is None:
+            try:
+                cls._redis = redis_from_url(settings.REDIS_URL, decode_responses=True)
+            except Exception:
+                cls._redis = None
+        return cls._redis
+
+    @classmethod
+    async def get(cls, db: AsyncSession, user_id: int) -> Optional[UserPrincipal]:
+        """Principal for user_id from the cache, else from the users table"""
+        if not settings.USER_PRINCIPAL_CACHE_ENABLED:
+            return await cls._load(db, user_id)
+
+        cached = cls._local.get(user_id)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        principal = await cls._read_redis(user_id)
+        if principal is None:
+            principal = await cls._load(db, user_id)
+            if principal is None:
+                return None
+            await cls._write_redis(principal)
+
+        cls._remember(principal)
+        return principal
+
+    @classmethod
+    async def invalidate(cls, *user_ids: int):
+        """Drop cached principals after a user's auth facts change"""
+        for user_id in user_ids:
+            cls._local.pop(user_id, None)
+
+        redis = await cls._get_redis()
+        if redis is not None and user_ids:
+            try:
+                await redis.delete(*(f"{cls.KEY_PREFIX}{uid}" for uid in user_ids))
+            except Exception as e:
+                logger.warning(f"Principal cache invalidation failed: {str(e)}")
+                cls._redis = None
+
+    @classmethod
+    def clear_local(cls):
+        """Drop every in-process entry of this worker"""
+        cls._local.clear()
+
+    @staticmethod
+    async def _load(db: AsyncSession, user_id: int) -> Optional[UserPrincipal]:
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        return UserPrincipal.from_user(user) if user else None
+
+    @classmethod
+    def _remember(cls, principal: UserPrincipal):
+        if len(cls._local) >= settings.USER_PRINCIPAL_LOCAL_MAX_ENTRIES:
+            # Evict the oldest insertion
+            cls._local.pop(next(iter(cls._local)))
+        cls._local[principal.id] = (
+            time.monotonic() + settings.USER_PRINCIPAL_LOCAL_TTL_SECONDS,
+            principal,
+        )
+
+    @classmethod
+    async def _read_redis(cls, user_id: int) -> Optional[UserPrincipal]:
+        redis = await cls._get_redis()
+        if redis is None:
+            return None
+        try:
+            payload = await redis.get(f"{cls.KEY_PREFIX}{user_id}")
+            return UserPrincipal.from_dict(json.loads(payload)) if payload else None
+        except Exception as e:
+            logger.warning(f"Principal cache read failed: {str(e)}")
+            cls._redis = None
+            return None
+
+    @classmethod
+    async def _write_redis(cls, principal: UserPrincipal):
+        redis = await cls._get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.set(
+                f"{cls.KEY_PREFIX}{principal.id}",
+                json.dumps(principal.to_dict()),
+                ex=settings.USER_PRINCIPAL_CACHE_TTL_SECONDS,
+            )
+        except Exception as e:
+            logger.warning(f"Principal cache write failed: {str(e)}")
+            cls._redis = None
@@ -7,7 +7,11 @@ from datetime import date, datetime
 import logging
 import asyncio
 
-from app.db.session import async_session_maker
+from celery import chord
+
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
 from app.services.daily_accrual_service import DailyAccrualService
 
 logging.basicConfig(level=logging.INFO)
@@ -21,7 +25,7 @@ async def run_daily_accrual_task():
     """
     logger.info(f"Starting daily accrual task for {date.today()}")
 
-    async with async_session_maker() as session:
+    async with AsyncSessionLocal() as session:
         try:
             service = DailyAccrualService(session)
             result = await service.run_daily_accrual()
@@ -54,7 +58,7 @@ async def run_penalty_calculation_task():
     """
     logger.info(f"Starting penalty calculation task for {date.today()}")
 
-    async with async_session_maker() as session:
+    async with AsyncSessionLocal() as session:
         try:
             service = DailyAccrualService(session)
             result = await service.run_batch_calculation(
@@ -74,6 +78,95 @@ async def run_penalty_calculation_task():
             raise
 
 
+# ==================== FAN-OUT (MULTI-WORKER) ACCRUAL ====================
+
+
+@celery_app.task(name="app.tasks.daily_accrual.run_daily_accrual_fanout")
+def run_daily_accrual_fanout(
+    accrual_date: str = None, shard_by: str = None, shard_count: int = None
+):
+    """
+    Coordinator: shard accruing loans by branch_id or loan-id hash and
+    dispatch one accrual sub-task per shard, with a chord finalizer that
+    combines shard totals into the AccrualJob
+    """
+    accrual_date = accrual_date or date.today().isoformat()
+    shard_by = shard_by or settings.ACCRUAL_SHARD_BY
+
+    async def process():
+        async with AsyncSessionLocal() as session:
+            service = DailyAccrualService(session)
+            return await service.start_sharded_accrual(
+                date.fromisoformat(accrual_date), shard_by, shard_count
+            )
+
+    plan = asyncio.run(process())
+
+    if plan["status"] == "already_completed":
+        return f"Accrual for {accrual_date} already completed"
+
+    if not plan["shards"]:
+        finalize_daily_accrual.delay([], accrual_date)
+        return f"No accruing loans for {accrual_date}"
+
+    chord(
+        run_accrual_shard.s(
+            accrual_date, plan["shard_by"], shard_key, plan["shard_count"]
+        )
+        for shard_key in plan["shards"]
+    )(finalize_daily_accrual.s(accrual_date))
+
+    logger.info(
+        f"Dispatched {len(plan['shards'])} accrual shards by {shard_by} "
+        f"for {accrual_date}"
+    )
+    return f"Dispatched {len(plan['shards'])} accrual shards for {accrual_date}"
+
+
+@celery_app.task(name="app.tasks.daily_accrual.run_accrual_shard")
+def run_accrual_shard(
+    accrual_date: str, shard_by: str, shard_key: int, shard_count: int = None
+):
+    """
+    Accrue one shard of loans
+    Failures are returned rather than raised so the chord finalizer still
+    runs and can mark the job failed
+    """
+
+    async def process():
+        async with AsyncSessionLocal() as session:
+            service = DailyAccrualService(session)
+            return await service.run_accrual_shard(
+                date.fromisoformat(accrual_date), shard_by, shard_key, shard_count
+            )
+
+    try:
+        return asyncio.run(process())
+    except Exception as e:
+        logger.error(f"Accrual shard {shard_key} failed: {str(e)}", exc_info=True)
+        return {"shard_key": shard_key, "failed": True, "error": str(e)}
+
+
+@celery_app.task(name="app.tasks.daily_accrual.finalize_daily_accrual")
+def finalize_daily_accrual(shard_results: list, accrual_date: str):
+    """Chord callback: roll shard totals up into the AccrualJob"""
+
+    async def process():
+        async with AsyncSessionLocal() as session:
+            service = DailyAccrualService(session)
+            return await service.finalize_sharded_accrual(
+                date.fromisoformat(accrual_date), shard_results
+            )
+
+    result = asyncio.run(process())
+
+    logger.info(
+        f"Fan-out accrual {result['status']}: {result['loans_processed']} loans "
+        f"across {result['shards']} shards, Total accrual: ₹{result['total_accrual']}"
+    )
+    return result
+
+
 if __name__ == "__main__":
     # Run accrual task
     asyncio.run(run_daily_accrual_task())
@@ -0,0 +1,21 @@
+"""
+Scheduled maintenance of the monthly loan_ledgers and audit_logs partitions
+"""
+
+import asyncio
+
+from app.core.celery_app import celery_app
+from app.db.session import AsyncSessionLocal
+from app.services.partition_service import PartitionService
+
+
+@celery_app.task(name="app.tasks.partitions.ensure_partitions")
+def ensure_partitions():
+    """Create the partitions of the coming months ahead of time"""
+
+    async def process():
+        async with AsyncSessionLocal() as session:
+            return await PartitionService.ensure_partitions(session)
+
+    created = asyncio.run(process())
+    return f"Created {len(created)} partitions"
@@ -2,14 +2,36 @@
 Celery tasks for reports
 """
 
+import asyncio
+from datetime import date, timedelta
+
 from app.core.celery_app import celery_app
+from app.db.session import AsyncSessionLocal, get_read_sessionmaker
+from app.services.branch_analytics_service import BranchAnalyticsService
+from app.services.report_job_service import ReportJobService
 
 
 @celery_app.task(name="app.tasks.reports.generate_monthly_report")
-def generate_monthly_report():
-    """Generate monthly loan report"""
-    # Implementation for monthly report generation
-    return "Monthly report generated"
+def generate_monthly_report(year: int = None, month: int = None):
+    """
+    Generate the portfolio-wide monthly loan report as a report job.
+    Defaults to the previous month.
+    """
+    if not year or not month:
+        last_month = date.today().replace(day=1) - timedelta(days=1)
+        year, month = last_month.year, last_month.month
+
+    async def process():
+        async with AsyncSessionLocal() as session:
+            job, created = await ReportJobService.submit(
+                session, "monthly_report", {"year": year, "month": month}
+            )
+            return job.id, created
+
+    job_id, created = asyncio.run(process())
+    if created:
+        run_report_job.delay(job_id)
+    return f"Monthly report {year}-{month:02d} queued as job {job_id}"
 
 
 @celery_app.task(name="app.tasks.reports.generate_npa_report")
@@ -17,3 +39,41 @@ def generate_npa_report():
     """Generate NPA (Non-Performing Assets) report"""
     # Implementation for NPA report
     return "NPA report generated"
+
+
+@celery_app.task(name="app.tasks.reports.refresh_branch_analytics")
+def refresh_branch_analytics():
+    """Recompute the cached admin branch analytics"""
+
+    async def process():
+        async with AsyncSessionLocal() as session:
+            return await BranchAnalyticsService.refresh(session)
+
+    analytics = asyncio.run(process())
+    return f"Branch analytics refreshed for {analytics['branch_count']} branches"
+
+
+@celery_app.task(name="app.tasks.reports.run_report_job")
+def run_report_job(job_id: int):
+    """Generate the artifact of a submitted report job"""
+
+    async def process():
+        # Report rows are read from the replica when one is usable
+        stream_factory = await get_read_sessionmaker()
+        async with AsyncSessionLocal() as session, stream_factory() as stream:
+            return await ReportJobService.run(session, stream, job_id)
+
+    result = asyncio.run(process())
+    return f"Report job {job_id} {result['status']}"
+
+
+@celery_app.task(name="app.tasks.reports.cleanup_report_artifacts")
+def cleanup_report_artifacts():
+    """Delete report artifacts past their retention window"""
+
+    async def process():
+        async with AsyncSessionLocal() as session:
+            return await ReportJobService.cleanup_expired(session)
+
+    removed = asyncio.run(process())
+    return f"Expired {removed} report artifacts"
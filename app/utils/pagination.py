@@ -0,0 +1,78 @@
+"""
+Keyset (cursor) pagination helpers
+Cursors are opaque tokens over (created_at, id), newest first; rows with
+a NULL created_at come before all others, as in a descending index scan
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, or_, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: int) -> str:
+    payload = json.dumps(
+        [created_at.isoformat() if created_at else None, row_id],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Decode a cursor token; an invalid token is a 400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if created_at is not None:
+            created_at = datetime.fromisoformat(created_at)
+        return created_at, int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def keyset_page(query, created_column, id_column, cursor: Optional[str], limit: int):
+    """
+    Order query newest first by (created_column, id_column) and start it
+    after cursor. Fetches limit + 1 rows so the caller can tell whether
+    there is a next page.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        if created_at is None:
+            query = query.where(
+                or_(
+                    and_(created_column.is_(None), id_column < row_id),
+                    created_column.isnot(None),
+                )
+            )
+        else:
+            # A NULL created_at compares as NULL, so undated rows (already
+            # paged past) drop out here
+            query = query.where(
+                tuple_(created_column, id_column) < tuple_(created_at, row_id)
+            )
+    return query.order_by(
+        created_column.desc().nulls_first(), id_column.desc()
+    ).limit(limit + 1)
+
+
+def split_page(rows, limit: int, response: Response, created_attr: str = "created_at"):
+    """
+    Trim the extra keyset row and set the X-Next-Cursor header when a
+    next page exists. Returns the rows of this page.
+    """
+    rows = list(rows)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            getattr(last, created_attr), last.id
+        )
+    return rows
@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react'
 import { useAuthStore } from '../stores/authStore'
-import { api } from '../services/api'
+import { api, userApi } from '../services/api'
 import toast from 'react-hot-toast'
 import {
     UserCircleIcon,
@@ -12,7 +12,7 @@ import {
 } from '@heroicons/react/24/outline'
 
 export default function Profile() {
-    const { user } = useAuthStore()
+    const { user, setToken } = useAuthStore()
     const [loading, setLoading] = useState(false)
     const [profileData, setProfileData] = useState(null)
     const [activeTab, setActiveTab] = useState('info')
@@ -44,17 +44,18 @@ export default function Profile() {
             return
         }
 
-        if (passwordData.newPassword.length < 6) {
-            toast.error('Password must be at least 6 characters')
+        if (passwordData.newPassword.length < 8) {
+            toast.error('Password must be at least 8 characters')
             return
         }
 
         try {
             setLoading(true)
-            await api.post('/users/change-password', {
-                current_password: passwordData.currentPassword,
+            const { access_token } = await userApi.changePassword({
+                old_password: passwordData.currentPassword,
                 new_password: passwordData.newPassword
             })
+            setToken(access_token)
             toast.success('Password changed successfully')
             setPasswordData({
                 currentPassword: '',
@@ -249,10 +250,10 @@ export default function Profile() {
                                             onChange={(e) => setPasswordData({ ...passwordData, newPassword: e.target.value })}
                                             className="w-full pl-10 pr-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-indigo-500"
                                             required
-                                            minLength={6}
+                                            minLength={8}
                                         />
                                     </div>
-                                    <p className="text-xs text-gray-500 mt-1">Minimum 6 characters</p>
+                                    <p className="text-xs text-gray-500 mt-1">Minimum 8 characters</p>
                                 </div>
 
                                 <div>
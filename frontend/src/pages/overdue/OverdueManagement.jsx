@@ -16,15 +16,27 @@ export default function OverdueManagement() {
     const [loading, setLoading] = useState(true)
     const [checking, setChecking] = useState(false)
     const [uploading, setUploading] = useState(false)
+    const [sortBy, setSortBy] = useState('severity')
+    const [pagination, setPagination] = useState({
+        page: 1,
+        pageSize: 50
+    })
     const navigate = useNavigate()
 
     useEffect(() => {
         loadOverdueSummary()
-    }, [])
+    }, [sortBy, pagination.page])
 
     const loadOverdueSummary = async () => {
         try {
-            const response = await api.get('/overdue/summary')
+            // Totals cover every overdue loan; loans holds one page
+            const response = await api.get('/overdue/summary', {
+                params: {
+                    skip: (pagination.page - 1) * pagination.pageSize,
+                    limit: pagination.pageSize,
+                    sort_by: sortBy
+                }
+            })
             setOverdueSummary(response.data)
         } catch (error) {
             toast.error('Failed to load overdue summary')
@@ -48,6 +60,11 @@ export default function OverdueManagement() {
         }
     }
 
+    const handleSortChange = (value) => {
+        setSortBy(value)
+        setPagination(prev => ({ ...prev, page: 1 }))
+    }
+
     const handleViewLoanOverdue = (loanId) => {
         navigate(`/loans/${loanId}`)
     }
@@ -85,6 +102,8 @@ export default function OverdueManagement() {
         }
     }
 
+    const total = overdueSummary?.total_overdue_loans || 0
+
     if (loading) {
         return (
             <div className="flex items-center justify-center h-64">
@@ -164,7 +183,7 @@ export default function OverdueManagement() {
                         <div>
                             <p className="text-sm text-gray-600">Total Overdue Amount</p>
                             <p className="text-3xl font-bold text-orange-600 mt-2">
-                                ₹{overdueSummary?.loans?.reduce((sum, loan) => sum + loan.total_overdue_amount, 0).toLocaleString('en-IN') || 0}
+                                ₹{(overdueSummary?.total_overdue_amount || 0).toLocaleString('en-IN')}
                             </p>
                         </div>
                         <CurrencyRupeeIcon className="h-12 w-12 text-orange-500" />
@@ -176,7 +195,7 @@ export default function OverdueManagement() {
                         <div>
                             <p className="text-sm text-gray-600">Total Penal Interest</p>
                             <p className="text-3xl font-bold text-yellow-600 mt-2">
-                                ₹{overdueSummary?.loans?.reduce((sum, loan) => sum + loan.total_penal_interest, 0).toLocaleString('en-IN') || 0}
+                                ₹{(overdueSummary?.total_penal_interest || 0).toLocaleString('en-IN')}
                             </p>
                         </div>
                         <ChartBarIcon className="h-12 w-12 text-yellow-500" />
@@ -186,8 +205,18 @@ export default function OverdueManagement() {
 
             {/* Overdue Loans Table */}
             <div className="bg-white rounded-lg shadow">
-                <div className="px-6 py-4 border-b border-gray-200">
+                <div className="px-6 py-4 border-b border-gray-200 flex justify-between items-center">
                     <h2 className="text-lg font-semibold text-gray-900">Overdue Loans</h2>
+                    <select
+                        value={sortBy}
+                        onChange={(e) => handleSortChange(e.target.value)}
+                        className="px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-indigo-500"
+                    >
+                        <option value="severity">Most Days Overdue</option>
+                        <option value="amount">Highest Overdue Amount</option>
+                        <option value="penal">Highest Penal Interest</option>
+                        <option value="oldest">Oldest Due Date</option>
+                    </select>
                 </div>
                 <div className="overflow-x-auto">
                     <table className="min-w-full divide-y divide-gray-200">
@@ -270,6 +299,32 @@ export default function OverdueManagement() {
                         </tbody>
                     </table>
                 </div>
+
+                {total > 0 && (
+                    <div className="flex items-center justify-between px-6 py-4 border-t border-gray-200">
+                        <p className="text-sm text-gray-700">
+                            Showing {(pagination.page - 1) * pagination.pageSize + 1} to{' '}
+                            {Math.min(pagination.page * pagination.pageSize, total)} of{' '}
+                            {total} overdue loans
+                        </p>
+                        <div className="flex gap-2">
+                            <button
+                                onClick={() => setPagination(prev => ({ ...prev, page: prev.page - 1 }))}
+                                disabled={pagination.page === 1}
+                                className="px-4 py-2 border border-gray-300 rounded-lg disabled:opacity-50 disabled:cursor-not-allowed hover:bg-gray-50"
+                            >
+                                Previous
+                            </button>
+                            <button
+                                onClick={() => setPagination(prev => ({ ...prev, page: prev.page + 1 }))}
+                                disabled={pagination.page * pagination.pageSize >= total}
+                                className="px-4 py-2 border border-gray-300 rounded-lg disabled:opacity-50 disabled:cursor-not-allowed hover:bg-gray-50"
+                            >
+                                Next
+                            </button>
+                        </div>
+                    </div>
+                )}
             </div>
         </div>
     )
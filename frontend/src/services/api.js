@@ -119,9 +119,10 @@ export const userApi = {
         return response.data
     },
 
-    // Change password
+    // Change password; the old token is revoked, so keep the new one
     changePassword: async (passwordData) => {
         const response = await api.post(`/auth/change-password`, passwordData)
+        localStorage.setItem('token', response.data.access_token)
         return response.data
     },
 }
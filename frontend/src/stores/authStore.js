@@ -99,6 +99,13 @@ export const useAuthStore = create(
                 })
             },
 
+            // Replace the token, e.g. after a password change revokes the old one
+            setToken: (access_token) => {
+                localStorage.setItem('token', access_token)
+                axios.defaults.headers.common['Authorization'] = `Bearer ${access_token}`
+                set({ token: access_token })
+            },
+
             // Set active role for dashboard switching
             setActiveRole: (role) => {
                 set({ activeRole: role })
@@ -0,0 +1,68 @@
+"""
+Archive old monthly partitions of loan_ledgers and audit_logs.
+
+Partitions older than LEDGER_PARTITION_RETENTION_MONTHS /
+AUDIT_LOG_PARTITION_RETENTION_MONTHS are dumped to gzip-compressed CSV
+files (<partition>.csv.gz) and detached from their table.
+
+Usage (from the project root):
+    python scripts/archive_partitions.py --dry-run
+    python scripts/archive_partitions.py --dir /backups/archives --drop
+
+A dump can be restored into a table with the same columns:
+    gunzip -c loan_ledgers_p202301.csv.gz | psql -c "\\copy loan_ledgers FROM STDIN CSV HEADER"
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.session import AsyncSessionLocal
+from app.services.partition_service import PartitionService
+
+
+async def archive_partitions(archive_dir: str = None, drop: bool = False, dry_run: bool = False):
+    async with AsyncSessionLocal() as db:
+        candidates = await PartitionService.archivable_partitions(db)
+        if not candidates:
+            print("No partitions past their retention window")
+            return
+
+        for candidate in candidates:
+            if dry_run:
+                print(f"Would archive {candidate['partition']}")
+                continue
+
+            archived = await PartitionService.archive_partition(
+                db, candidate["table"], candidate["partition"], archive_dir, drop
+            )
+            action = "dropped" if drop else "detached"
+            print(
+                f"✅ {archived['partition']}: {archived['rows']} rows -> "
+                f"{archived['file_path']} ({action})"
+            )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Archive loan_ledgers and audit_logs partitions past retention"
+    )
+    parser.add_argument(
+        "--dir", type=str, help="Archive directory (default PARTITION_ARCHIVE_DIR)"
+    )
+    parser.add_argument(
+        "--drop",
+        action="store_true",
+        help="Drop each partition once archived instead of leaving it detached",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="List the partitions to archive"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(archive_partitions(args.dir, args.drop, args.dry_run))
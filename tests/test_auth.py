@@ -64,3 +64,57 @@ async def test_invalid_credentials(client: AsyncClient):
         }
     )
     assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_on_work_factor_change(
+    client: AsyncClient, test_db, test_user, monkeypatch
+):
+    """Test login upgrades a hash made with an outdated bcrypt work factor"""
+    from app.core.config import settings
+    from app.core.security import password_needs_rehash
+
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ROUNDS", 5)
+    assert password_needs_rehash(test_user.hashed_password)
+
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={"username": "test@example.com", "password": "Test@123"},
+    )
+    assert response.status_code == 200
+
+    await test_db.refresh(test_user)
+    assert test_user.hashed_password.startswith("$2b$05$")
+    assert not password_needs_rehash(test_user.hashed_password)
+
+
+@pytest.mark.asyncio
+async def test_change_password_revokes_existing_tokens(
+    client: AsyncClient, auth_headers
+):
+    """Test tokens issued before a password change are rejected"""
+    response = await client.get("/api/v1/auth/me", headers=auth_headers)
+    assert response.status_code == 200
+
+    response = await client.post(
+        "/api/v1/auth/change-password",
+        json={"old_password": "Test@123", "new_password": "Changed@123"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    fresh_headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = await client.get("/api/v1/auth/me", headers=auth_headers)
+    assert response.status_code == 401
+
+    response = await client.get("/api/v1/auth/me", headers=fresh_headers)
+    assert response.status_code == 200
+
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={"username": "test@example.com", "password": "Changed@123"},
+    )
+    assert response.status_code == 200
+    new_headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    response = await client.get("/api/v1/auth/me", headers=new_headers)
+    assert response.status_code == 200
@@ -0,0 +1,91 @@
+"""
+Tests for the generation-tagged Redis calculation cache
+"""
+import pytest
+from datetime import date
+
+import fakeredis
+
+
+@pytest.fixture
+def cache_server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def calculation_cache(cache_server):
+    from app.services.calculation_cache_service import CalculationCacheService
+
+    redis = fakeredis.aioredis.FakeRedis(server=cache_server, decode_responses=True)
+    return CalculationCacheService(redis)
+
+
+@pytest.mark.asyncio
+async def test_cached_result_is_a_hit(calculation_cache):
+    """Test a stored result is returned for the same loan, type and date"""
+    as_of = date(2025, 6, 1)
+
+    generation, value = await calculation_cache.get(1, as_of, "SNAPSHOT")
+    assert value is None
+
+    await calculation_cache.set(1, as_of, "SNAPSHOT", {"outstanding": 100}, generation)
+
+    assert await calculation_cache.get(1, as_of, "SNAPSHOT") == (
+        generation,
+        {"outstanding": 100},
+    )
+    assert (await calculation_cache.get(1, date(2025, 6, 2), "SNAPSHOT"))[1] is None
+    assert (await calculation_cache.get(2, as_of, "SNAPSHOT"))[1] is None
+
+
+@pytest.mark.asyncio
+async def test_generation_bump_invalidates_loan(calculation_cache):
+    """Test invalidating a loan hides its results but not other loans'"""
+    as_of = date(2025, 6, 1)
+    await calculation_cache.set(1, as_of, "SNAPSHOT", {"outstanding": 100})
+    await calculation_cache.set(2, as_of, "SNAPSHOT", {"outstanding": 200})
+    old_generation, _ = await calculation_cache.get(1, as_of, "SNAPSHOT")
+
+    await calculation_cache.invalidate_loans([1])
+
+    generation, value = await calculation_cache.get(1, as_of, "SNAPSHOT")
+    assert generation == old_generation + 1
+    assert value is None
+    assert (await calculation_cache.get(2, as_of, "SNAPSHOT"))[1] == {"outstanding": 200}
+
+    # A result computed before the bump stays under the old generation
+    await calculation_cache.set(
+        1, as_of, "SNAPSHOT", {"outstanding": 90}, old_generation
+    )
+    assert (await calculation_cache.get(1, as_of, "SNAPSHOT"))[1] is None
+
+
+@pytest.mark.asyncio
+async def test_oversize_entry_is_not_cached(calculation_cache, monkeypatch):
+    """Test results above CALC_REDIS_CACHE_MAX_ENTRY_BYTES are skipped"""
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "CALC_REDIS_CACHE_MAX_ENTRY_BYTES", 64)
+    as_of = date(2025, 6, 1)
+
+    await calculation_cache.set(1, as_of, "SCHEDULE", {"rows": "x" * 100})
+    await calculation_cache.set(1, as_of, "SNAPSHOT", {"outstanding": 100})
+
+    assert (await calculation_cache.get(1, as_of, "SCHEDULE"))[1] is None
+    assert (await calculation_cache.get(1, as_of, "SNAPSHOT"))[1] == {"outstanding": 100}
+
+
+@pytest.mark.asyncio
+async def test_redis_down_degrades_to_miss(calculation_cache, cache_server):
+    """Test Redis errors are cache misses, never exceptions"""
+    as_of = date(2025, 6, 1)
+    await calculation_cache.set(1, as_of, "SNAPSHOT", {"outstanding": 100})
+
+    cache_server.connected = False
+
+    assert await calculation_cache.get(1, as_of, "SNAPSHOT") == (None, None)
+    await calculation_cache.set(1, as_of, "SNAPSHOT", {"outstanding": 90})
+    await calculation_cache.invalidate_loans([1])
+
+    cache_server.connected = True
+    assert (await calculation_cache.get(1, as_of, "SNAPSHOT"))[1] == {"outstanding": 100}
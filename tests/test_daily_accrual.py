@@ -0,0 +1,217 @@
+"""
+Tests for daily interest accrual
+"""
+import pytest
+from datetime import date
+from sqlalchemy import select, func
+
+
+@pytest.mark.asyncio
+async def test_bulk_accrual_posts_one_entry_per_loan(test_db, test_active_loans):
+    """Test bulk accrual posts a DAILY_ACCRUAL row for every active loan"""
+    from app.models.loan_ledger import LoanLedger
+    from app.services.daily_accrual_service import DailyAccrualService
+
+    service = DailyAccrualService(test_db)
+    result = await service.run_daily_accrual(date(2025, 6, 1), bulk=True)
+
+    assert result["status"] == "completed"
+    assert result["loans_processed"] == len(test_active_loans)
+    # 100000 × 7% / 365 for one day
+    assert result["total_accrual"] == pytest.approx(19.18 * len(test_active_loans))
+
+    count = await test_db.scalar(
+        select(func.count(LoanLedger.id)).where(
+            LoanLedger.transaction_date == date(2025, 6, 1)
+        )
+    )
+    assert count == len(test_active_loans)
+
+
+@pytest.mark.asyncio
+async def test_bulk_accrual_is_idempotent(test_db, test_active_loans):
+    """Test re-running accrual for the same date does not post twice"""
+    from app.models.loan_ledger import LoanLedger
+    from app.services.daily_accrual_service import DailyAccrualService
+
+    service = DailyAccrualService(test_db)
+    await service.run_daily_accrual(date(2025, 6, 1))
+    result = await service.run_daily_accrual(date(2025, 6, 1))
+
+    assert result["status"] == "already_completed"
+
+    count = await test_db.scalar(
+        select(func.count(LoanLedger.id)).where(
+            LoanLedger.transaction_date == date(2025, 6, 1)
+        )
+    )
+    assert count == len(test_active_loans)
+
+
+@pytest.mark.asyncio
+async def test_failed_accrual_resumes_from_checkpoint(test_db, test_active_loans):
+    """Test a failed chunked run resumes after the last committed chunk"""
+    from app.models.loan_ledger import LoanLedger, AccrualJob
+    from app.services.daily_accrual_service import DailyAccrualService
+
+    service = DailyAccrualService(test_db)
+    run_chunk = service._run_bulk_accrual
+    calls = []
+
+    async def fail_on_second_chunk(accrual_date, id_range):
+        calls.append(id_range)
+        if len(calls) == 2:
+            raise RuntimeError("worker lost")
+        return await run_chunk(accrual_date, id_range)
+
+    service._run_bulk_accrual = fail_on_second_chunk
+    with pytest.raises(RuntimeError):
+        await service.run_daily_accrual(date(2025, 6, 1), chunk_size=1)
+
+    job = await test_db.scalar(
+        select(AccrualJob).where(AccrualJob.job_date == date(2025, 6, 1))
+    )
+    assert job.status == "failed"
+    assert job.last_loan_id == test_active_loans[0].id
+
+    service._run_bulk_accrual = run_chunk
+    result = await service.run_daily_accrual(date(2025, 6, 1), chunk_size=1)
+
+    assert result["status"] == "completed"
+    assert result["resumed_from_loan_id"] == test_active_loans[0].id
+    assert result["loans_processed"] == len(test_active_loans)
+
+    count = await test_db.scalar(
+        select(func.count(LoanLedger.id)).where(
+            LoanLedger.transaction_date == date(2025, 6, 1)
+        )
+    )
+    assert count == len(test_active_loans)
+
+
+@pytest.mark.asyncio
+async def test_failed_accrual_keeps_per_loan_errors(test_db, test_active_loans):
+    """Test a fatal error is kept apart from the per-loan errors of a run"""
+    import json
+    from app.models.loan_ledger import AccrualJob
+    from app.services.daily_accrual_service import DailyAccrualService
+
+    service = DailyAccrualService(test_db)
+    run_chunk = service._run_bulk_accrual
+    loan_error = {"loan_id": test_active_loans[0].id, "error": "bad rate"}
+    calls = []
+
+    async def fail_on_second_chunk(accrual_date, id_range):
+        calls.append(id_range)
+        if len(calls) == 2:
+            raise RuntimeError("worker lost")
+        processed, accrued, errors = await run_chunk(accrual_date, id_range)
+        return processed, accrued, errors + [loan_error]
+
+    service._run_bulk_accrual = fail_on_second_chunk
+    with pytest.raises(RuntimeError):
+        await service.run_daily_accrual(date(2025, 6, 1), chunk_size=1)
+
+    job = await test_db.scalar(
+        select(AccrualJob).where(AccrualJob.job_date == date(2025, 6, 1))
+    )
+    assert job.status == "failed"
+    assert job.failure_reason == "worker lost"
+    assert json.loads(job.error_details) == [loan_error]
+
+    service._run_bulk_accrual = run_chunk
+    result = await service.run_daily_accrual(date(2025, 6, 1), chunk_size=1)
+
+    assert result["errors"] == [loan_error]
+    await test_db.refresh(job)
+    assert job.failure_reason is None
+    assert job.errors_count == 1
+
+
+@pytest.mark.asyncio
+async def test_sharded_accrual_rolls_up_into_job(test_db, test_active_loans):
+    """Test fan-out shards by loan-id hash and the finalizer's job totals"""
+    from app.models.loan_ledger import AccrualJob
+    from app.services.daily_accrual_service import DailyAccrualService
+
+    service = DailyAccrualService(test_db)
+    plan = await service.start_sharded_accrual(date(2025, 6, 1), "hash", 2)
+    assert plan["shards"] == [0, 1]
+
+    shard_results = [
+        await service.run_accrual_shard(date(2025, 6, 1), "hash", shard_key, 2)
+        for shard_key in plan["shards"]
+    ]
+    result = await service.finalize_sharded_accrual(date(2025, 6, 1), shard_results)
+
+    assert result["status"] == "completed"
+    assert result["loans_processed"] == len(test_active_loans)
+
+    job = await test_db.scalar(
+        select(AccrualJob).where(AccrualJob.job_date == date(2025, 6, 1))
+    )
+    assert job.status == "completed"
+    assert job.job_type == "DAILY_ACCRUAL_FANOUT"
+
+
+@pytest.mark.asyncio
+async def test_catch_up_matches_day_by_day_totals(test_db, test_active_loans):
+    """Test catch-up posts one entry per loan per missed day"""
+    from app.models.loan_ledger import LoanLedger, AccrualJob
+    from app.services.daily_accrual_service import DailyAccrualService
+
+    service = DailyAccrualService(test_db)
+    result = await service.catch_up_accrual(date(2025, 6, 1), date(2025, 6, 3))
+
+    assert result["status"] == "completed"
+    assert result["days_processed"] == 3
+    assert result["entries_posted"] == 3 * len(test_active_loans)
+    assert result["total_accrual"] == pytest.approx(19.18 * 3 * len(test_active_loans))
+
+    balance = await test_db.scalar(
+        select(LoanLedger.balance).where(
+            LoanLedger.loan_id == test_active_loans[0].id,
+            LoanLedger.transaction_date == date(2025, 6, 3),
+        )
+    )
+    assert float(balance) == pytest.approx(100000 + 19.18 * 3)
+
+    completed = await test_db.scalar(
+        select(func.count(AccrualJob.id)).where(AccrualJob.status == "completed")
+    )
+    assert completed == 3
+
+    again = await service.catch_up_accrual(date(2025, 6, 1), date(2025, 6, 3))
+    assert again["status"] == "already_completed"
+
+
+@pytest.mark.asyncio
+async def test_balance_snapshot_tracks_latest_ledger_entry(test_db, test_active_loans):
+    """Test accrual keeps the balance snapshot on the latest ledger balance"""
+    from app.models.loan_ledger import LoanLedger, LoanBalanceSnapshot
+    from app.services.daily_accrual_service import DailyAccrualService
+    from app.services.loan_balance_service import LoanBalanceService
+
+    service = DailyAccrualService(test_db)
+    await service.run_daily_accrual(date(2025, 6, 1))
+    await service.run_daily_accrual(date(2025, 6, 2))
+
+    loan_id = test_active_loans[0].id
+    snapshot = await test_db.scalar(
+        select(LoanBalanceSnapshot).where(LoanBalanceSnapshot.loan_id == loan_id)
+    )
+    latest = await test_db.scalar(
+        select(LoanLedger.balance)
+        .where(LoanLedger.loan_id == loan_id)
+        .order_by(LoanLedger.transaction_date.desc(), LoanLedger.id.desc())
+        .limit(1)
+    )
+    assert snapshot.balance == latest
+    assert snapshot.last_transaction_date == date(2025, 6, 2)
+    assert snapshot.last_accrual_date == date(2025, 6, 2)
+
+    # Reads before the snapshot's date fall back to the ledger
+    before = await LoanBalanceService.get_balance(test_db, loan_id, date(2025, 6, 2))
+    assert float(before) == pytest.approx(100000 + 19.18)
+    after = await LoanBalanceService.get_balance(test_db, loan_id, date(2025, 6, 3))
+    assert after == latest
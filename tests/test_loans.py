@@ -67,3 +67,107 @@ async def test_unauthorized_loan_access(client: AsyncClient):
     """Test accessing loans without authentication"""
     response = await client.get("/api/v1/loans/")
     assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_loan_listing_cursor_pagination(
+    client: AsyncClient, auth_headers, test_active_loans
+):
+    """Test paging the loan listing with the X-Next-Cursor header"""
+    response = await client.get("/api/v1/loans/?limit=2", headers=auth_headers)
+    assert response.status_code == 200
+    first_page = response.json()
+    cursor = response.headers["X-Next-Cursor"]
+    assert len(first_page) == 2
+
+    response = await client.get(
+        f"/api/v1/loans/?limit=2&cursor={cursor}", headers=auth_headers
+    )
+    assert response.status_code == 200
+    second_page = response.json()
+    assert "X-Next-Cursor" not in response.headers
+
+    ids = [loan["id"] for loan in first_page + second_page]
+    assert sorted(ids) == sorted(loan.id for loan in test_active_loans)
+
+    response = await client.get("/api/v1/loans/?cursor=bogus", headers=auth_headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_keyset_pagination_with_null_created_at(test_db):
+    """Test rows without a created_at are paged, not skipped or crashing"""
+    from datetime import datetime
+    from fastapi import Response
+    from sqlalchemy import Column, DateTime, Integer, MetaData, Table, insert, select
+    from app.utils.pagination import NEXT_CURSOR_HEADER, keyset_page, split_page
+
+    rows = Table(
+        "keyset_rows",
+        MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("created_at", DateTime),
+        prefixes=["TEMPORARY"],
+    )
+    connection = await test_db.connection()
+    await connection.run_sync(rows.create)
+    await test_db.execute(
+        insert(rows),
+        [
+            {"id": 1, "created_at": datetime(2025, 1, 1)},
+            {"id": 2, "created_at": None},
+            {"id": 3, "created_at": datetime(2025, 1, 2)},
+            {"id": 4, "created_at": None},
+        ],
+    )
+
+    seen, cursor = [], None
+    while True:
+        response = Response()
+        query = keyset_page(select(rows), rows.c.created_at, rows.c.id, cursor, 1)
+        page = split_page((await test_db.execute(query)).all(), 1, response)
+        seen.extend(row.id for row in page)
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+
+    assert seen == [4, 2, 3, 1]
+
+
+@pytest.mark.asyncio
+async def test_loan_listing_field_projection(
+    client: AsyncClient, auth_headers, test_active_loans
+):
+    """Test the loan listing returns only the requested fields"""
+    response = await client.get(
+        "/api/v1/loans/?fields=loan_number,branch_name,status", headers=auth_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == len(test_active_loans)
+    assert set(data[0]) == {"loan_number", "branch_name", "status"}
+    assert data[0]["branch_name"] == "Accrual Branch"
+
+    response = await client.get(
+        "/api/v1/loans/?fields=hashed_password", headers=auth_headers
+    )
+    assert response.status_code == 400
+
+
+def test_batch_emi_schedules_match_single_schedule():
+    """Test vectorized batch schedules match per-loan schedules to the paisa"""
+    from datetime import date
+    from app.services.interest_calculator import InterestCalculator
+
+    loans = [
+        (300000, 12.0, 108, date(2025, 1, 1)),
+        (50000, 7.0, 12, date(2025, 2, 1)),
+        (120000, 0.0, 24, date(2025, 3, 1)),
+    ]
+    schedules = InterestCalculator.generate_emi_schedules(loans)
+
+    for loan, schedule in zip(loans, schedules):
+        assert schedule == InterestCalculator.generate_emi_schedule(*loan)
+        assert len(schedule) == loan[2]
+        assert schedule[-1]["outstanding_principal"] == 0
+        assert schedule[0]["emi_amount"] == InterestCalculator.calculate_emi(*loan[:3])
@@ -0,0 +1,168 @@
+"""
+Tests for Alembic migrations on a database built by the migrations
+
+No migration creates the core tables (users, branches, loans), so those are
+created from the models; loan_ledgers and audit_logs are created by
+smart_calc_001, as on deployments that run alembic upgrade head.
+"""
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from conftest import TEST_DATABASE_URL
+
+PROJECT_ROOT = Path(__file__).parent.parent
+MIGRATION_DATABASE = "dccb_loan_migration_test"
+
+
+def _dependencies(table, found):
+    """table and every table it references, transitively"""
+    if table.name not in found:
+        found[table.name] = table
+        for fk in table.foreign_keys:
+            _dependencies(fk.column.table, found)
+    return found
+
+
+@pytest.fixture
+def migration_engine():
+    """Engine on a fresh database, dropped afterwards"""
+    url = make_url(TEST_DATABASE_URL).set(drivername="postgresql")
+    admin = create_engine(url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f"DROP DATABASE IF EXISTS {MIGRATION_DATABASE}"))
+        conn.execute(text(f"CREATE DATABASE {MIGRATION_DATABASE}"))
+
+    engine = create_engine(url.set(database=MIGRATION_DATABASE))
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+        with admin.connect() as conn:
+            conn.execute(text(f"DROP DATABASE IF EXISTS {MIGRATION_DATABASE}"))
+        admin.dispose()
+
+
+def _alembic_config(engine) -> Config:
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "alembic"))
+    config.set_main_option(
+        "sqlalchemy.url", engine.url.render_as_string(hide_password=False)
+    )
+    return config
+
+
+def test_partition_migration_on_migrated_schema(migration_engine):
+    """Test partition_001 upgrades and downgrades tables built by smart_calc_001"""
+    from app.models.user import User, UserRole, Branch
+    from app.models.loan import Loan, LoanType, LoanStatus
+
+    config = _alembic_config(migration_engine)
+    core_tables = _dependencies(Base.metadata.tables["loans"], {})
+    Base.metadata.create_all(migration_engine, tables=list(core_tables.values()))
+    command.upgrade(config, "smart_calc_001")
+
+    with Session(migration_engine) as session:
+        branch = Branch(name="Migration Branch", code="MIG001", address="A", district="D")
+        session.add(branch)
+        session.flush()
+        farmer = User(
+            email="migration@example.com",
+            mobile="6666666666",
+            hashed_password="x",
+            full_name="Migration Farmer",
+            role=UserRole.FARMER,
+        )
+        session.add(farmer)
+        session.flush()
+        loan = Loan(
+            loan_number="MIG-1",
+            farmer_id=farmer.id,
+            branch_id=branch.id,
+            loan_type=LoanType.SAO,
+            principal_amount=100000,
+            interest_rate=7.0,
+            tenure_months=12,
+            sanction_date=date(2025, 1, 1),
+            disbursement_date=date(2025, 1, 1),
+            maturity_date=date(2026, 1, 1),
+            status=LoanStatus.ACTIVE,
+            purpose="Crop cultivation",
+        )
+        session.add(loan)
+        session.flush()
+        loan_id = loan.id
+        session.commit()
+
+    with migration_engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO loan_ledgers (loan_id, transaction_date, transaction_type, "
+                "balance) VALUES (:loan_id, '2025-03-10', 'DISBURSEMENT', 100000)"
+            ),
+            {"loan_id": loan_id},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO audit_logs (actor_type, action, metadata, created_at) "
+                "VALUES ('system', 'migrated', '{\"k\": 1}', '2025-04-02 10:00')"
+            )
+        )
+
+    command.stamp(config, "balance_snapshot_001")
+    command.upgrade(config, "partition_001")
+
+    with migration_engine.begin() as conn:
+        kinds = dict(
+            conn.execute(
+                text(
+                    "SELECT relname, relkind FROM pg_class "
+                    "WHERE relname IN ('loan_ledgers', 'audit_logs', "
+                    "'loan_ledgers_p202503', 'audit_logs_p202504')"
+                )
+            ).all()
+        )
+        assert kinds == {
+            "loan_ledgers": "p",
+            "audit_logs": "p",
+            "loan_ledgers_p202503": "r",
+            "audit_logs_p202504": "r",
+        }
+        assert conn.execute(
+            text("SELECT extra_data FROM audit_logs WHERE action = 'migrated'")
+        ).scalar() == '{"k": 1}'
+
+        # Ids keep coming from the original sequences
+        new_id = conn.execute(
+            text(
+                "INSERT INTO audit_logs (actor_type, action) "
+                "VALUES ('system', 'after') RETURNING id, created_at"
+            )
+        ).one()
+        assert new_id.id == 2
+        assert new_id.created_at.date() == datetime.now().date()
+        assert conn.execute(text("SELECT count(*) FROM loan_ledgers")).scalar() == 1
+
+    command.downgrade(config, "balance_snapshot_001")
+
+    with migration_engine.begin() as conn:
+        kinds = dict(
+            conn.execute(
+                text(
+                    "SELECT relname, relkind FROM pg_class "
+                    "WHERE relname IN ('loan_ledgers', 'audit_logs')"
+                )
+            ).all()
+        )
+        assert kinds == {"loan_ledgers": "r", "audit_logs": "r"}
+        assert conn.execute(
+            text("SELECT metadata FROM audit_logs WHERE action = 'migrated'")
+        ).scalar() == '{"k": 1}'
+        assert conn.execute(text("SELECT count(*) FROM audit_logs")).scalar() == 2
@@ -58,3 +58,134 @@ async def test_farmer_cannot_check_overdue(client: AsyncClient, auth_headers):
         headers=auth_headers
     )
     assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_overdue_sweep_updates_in_batches(test_db, test_active_loans):
+    """Test the set-based sweep sets overdue days and penal interest"""
+    from sqlalchemy import select
+    from app.models.loan import EMISchedule, LoanType, LoanTypeConfig
+    from app.services.overdue_service import OverdueService
+
+    config = (
+        await test_db.execute(
+            select(LoanTypeConfig).where(LoanTypeConfig.loan_type == LoanType.SAO)
+        )
+    ).scalar_one_or_none()
+    if config is None:
+        config = LoanTypeConfig(
+            loan_type=LoanType.SAO,
+            display_name="SAO",
+            default_interest_rate=7.0,
+            default_tenure_months=12,
+        )
+        test_db.add(config)
+    config.penal_interest_rate = 2.0
+    config.overdue_days_for_penalty = 30
+
+    today = date.today()
+    emis = []
+    for loan in test_active_loans:
+        for days_overdue in (10, 60):
+            emi = EMISchedule(
+                loan_id=loan.id,
+                installment_number=len(emis) + 1,
+                due_date=today - timedelta(days=days_overdue),
+                emi_amount=1000.0,
+                principal_component=900.0,
+                interest_component=100.0,
+                outstanding_principal=0.0,
+                paid_amount=0.0,
+            )
+            test_db.add(emi)
+            emis.append(emi)
+    await test_db.commit()
+
+    summary = await OverdueService.check_and_update_overdue_emis(
+        test_db, batch_size=2
+    )
+    assert summary["total_overdue"] >= len(emis)
+    assert summary["loans_affected"] >= len(test_active_loans)
+
+    for emi in emis:
+        await test_db.refresh(emi)
+        assert emi.is_overdue
+        assert emi.overdue_days == (today - emi.due_date).days
+        if emi.overdue_days >= 30:
+            assert emi.penal_interest == pytest.approx(1000.0 * 0.02 * 60 / 365)
+        else:
+            assert emi.penal_interest == 0.0
+
+
+@pytest.mark.asyncio
+async def test_overdue_summary_pagination(
+    client: AsyncClient, test_db, test_employee, test_active_loans
+):
+    """Test the overdue summary is paged and sorted, with totals over all loans"""
+    from app.core.security import create_access_token
+    from app.models.loan import EMISchedule
+
+    today = date.today()
+    # (overdue days, outstanding) per loan: severity and amount orders differ
+    overdue = [(15, 3000.0), (95, 1000.0), (45, 2000.0)]
+    for loan, (days, amount) in zip(test_active_loans, overdue):
+        test_db.add(
+            EMISchedule(
+                loan_id=loan.id,
+                installment_number=1,
+                due_date=today - timedelta(days=days),
+                emi_amount=amount,
+                principal_component=amount,
+                interest_component=0.0,
+                outstanding_principal=0.0,
+                paid_amount=0.0,
+                is_overdue=True,
+                overdue_days=days,
+                penal_interest=days / 10,
+            )
+        )
+    await test_db.commit()
+
+    token = create_access_token(
+        data={
+            "user_id": test_employee.id,
+            "email": test_employee.email,
+            "role": test_employee.role.value,
+        }
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def page(**params):
+        response = await client.get(
+            "/api/v1/overdue/summary", params=params, headers=headers
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    first = await page(limit=2, sort_by="severity")
+    assert first["total_overdue_loans"] == 3
+    assert first["total_overdue_amount"] == 6000.0
+    assert first["total_penal_interest"] == pytest.approx(15.5)
+    assert [loan["max_overdue_days"] for loan in first["loans"]] == [95, 45]
+    assert [loan["loan_id"] for loan in first["loans"]] == [
+        test_active_loans[1].id,
+        test_active_loans[2].id,
+    ]
+
+    second = await page(skip=2, limit=2, sort_by="severity")
+    assert second["total_overdue_loans"] == 3
+    assert [loan["max_overdue_days"] for loan in second["loans"]] == [15]
+
+    by_amount = await page(limit=3, sort_by="amount")
+    assert [loan["total_overdue_amount"] for loan in by_amount["loans"]] == [
+        3000.0,
+        2000.0,
+        1000.0,
+    ]
+
+    response = await client.get(
+        "/api/v1/overdue/summary",
+        params={"sort_by": "unknown"},
+        headers=headers
+    )
+    assert response.status_code == 422
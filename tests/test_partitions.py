@@ -0,0 +1,76 @@
+"""
+Tests for the monthly loan_ledgers and audit_logs partitions
+"""
+import csv
+import gzip
+import io
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import text
+
+
+async def _partition_of(test_db, table, row_id):
+    return await test_db.scalar(
+        text(f"SELECT tableoid::regclass::text FROM {table} WHERE id = :id"),
+        {"id": row_id},
+    )
+
+
+@pytest.mark.asyncio
+async def test_ensure_partitions_moves_rows_out_of_default(test_db):
+    """Test future partitions are created and take over default-partition rows"""
+    from app.models.loan_ledger import AuditLog
+    from app.services.partition_service import PartitionService, add_months
+
+    log = AuditLog(actor_type="system", action="partition_test")
+    test_db.add(log)
+    await test_db.commit()
+
+    current = date.today().replace(day=1)
+    await PartitionService.ensure_partitions(test_db, months_ahead=2)
+
+    for table in ("loan_ledgers", "audit_logs"):
+        partitions = await PartitionService.list_partitions(test_db, table)
+        for offset in range(3):
+            assert add_months(current, offset) in partitions
+
+    assert await _partition_of(test_db, "audit_logs", log.id) == (
+        f"audit_logs_p{current:%Y%m}"
+    )
+    assert await PartitionService.ensure_partitions(test_db, months_ahead=2) == []
+
+
+@pytest.mark.asyncio
+async def test_archive_partition_dumps_and_drops_month(test_db, tmp_path):
+    """Test an expired partition is dumped to a gzip file and removed"""
+    from app.models.loan_ledger import AuditLog
+    from app.services.partition_service import PartitionService
+
+    log = AuditLog(
+        actor_type="system",
+        action="archive_test",
+        created_at=datetime(2020, 1, 15, 10, 30),
+    )
+    test_db.add(log)
+    await test_db.commit()
+
+    await PartitionService.create_partition(test_db, "audit_logs", date(2020, 1, 1))
+    await test_db.commit()
+    assert await _partition_of(test_db, "audit_logs", log.id) == "audit_logs_p202001"
+
+    archivable = await PartitionService.archivable_partitions(test_db)
+    assert "audit_logs_p202001" in [c["partition"] for c in archivable]
+
+    result = await PartitionService.archive_partition(
+        test_db, "audit_logs", "audit_logs_p202001", str(tmp_path), drop=True
+    )
+    assert result["rows"] == 1
+
+    with gzip.open(result["file_path"], "rt") as archive:
+        rows = list(csv.DictReader(io.StringIO(archive.read())))
+    assert [row["action"] for row in rows] == ["archive_test"]
+
+    partitions = await PartitionService.list_partitions(test_db, "audit_logs")
+    assert date(2020, 1, 1) not in partitions
+    assert await _partition_of(test_db, "audit_logs", log.id) is None
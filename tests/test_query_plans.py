@@ -0,0 +1,162 @@
+"""
+Query-plan regression tests for EMI, ledger and payment hot paths
+
+Each statement mirrors a query of DailyAccrualService, OverdueService,
+PaymentService or SmartCalculator. Sequential scans are disabled for the
+EXPLAIN so the planner has to show which index it would use; a plan that
+still scans the table, or that uses an index other than the one added for
+the path, fails. On partitioned tables the scans are of partitions and their
+indexes, which are mapped back to the table and its partitioned indexes.
+"""
+import json
+from datetime import date
+
+import pytest
+from sqlalchemy import select, func, text
+
+from app.models.loan import EMISchedule
+from app.models.loan_ledger import LoanLedger
+from app.models.payment import Payment
+
+AS_OF = date(2026, 1, 1)
+
+HOT_PATHS = {
+    # PaymentService: unpaid EMIs of a loan in due order
+    "payment_allocation": (
+        lambda: select(EMISchedule)
+        .where(EMISchedule.loan_id == 1, EMISchedule.is_paid == False)
+        .order_by(EMISchedule.due_date),
+        "emi_schedules",
+        {"ix_emi_schedules_loan_due_date"},
+    ),
+    # OverdueService: next batch of the overdue sweep
+    "overdue_sweep_batch": (
+        lambda: select(EMISchedule.id)
+        .where(
+            EMISchedule.is_paid == False,
+            EMISchedule.due_date < AS_OF,
+            EMISchedule.id > 0,
+        )
+        .order_by(EMISchedule.id)
+        .limit(5000),
+        "emi_schedules",
+        {"ix_emi_schedules_unpaid_id"},
+    ),
+    # OverdueService: overdue EMIs of a loan
+    "overdue_emis_for_loan": (
+        lambda: select(EMISchedule.due_date, EMISchedule.overdue_days)
+        .where(
+            EMISchedule.loan_id == 1,
+            EMISchedule.is_overdue == True,
+            EMISchedule.is_paid == False,
+        )
+        .order_by(EMISchedule.due_date),
+        "emi_schedules",
+        {"ix_emi_schedules_overdue_loan"},
+    ),
+    # OverdueService: grouped overdue loans summary
+    "overdue_summary": (
+        lambda: select(
+            EMISchedule.loan_id,
+            func.sum(EMISchedule.emi_amount - EMISchedule.paid_amount),
+            func.max(EMISchedule.overdue_days),
+        )
+        .where(EMISchedule.is_overdue == True, EMISchedule.is_paid == False)
+        .group_by(EMISchedule.loan_id),
+        "emi_schedules",
+        {"ix_emi_schedules_overdue_loan"},
+    ),
+    # DailyAccrualService: latest balance before a date
+    "latest_balance": (
+        lambda: select(LoanLedger.balance)
+        .where(LoanLedger.loan_id == 1, LoanLedger.transaction_date < AS_OF)
+        .order_by(LoanLedger.transaction_date.desc(), LoanLedger.id.desc())
+        .limit(1),
+        "loan_ledgers",
+        {"ix_loan_ledgers_loan_date_id"},
+    ),
+    # DailyAccrualService: ledger entry of a loan, day and type
+    "ledger_entry": (
+        lambda: select(LoanLedger.id).where(
+            LoanLedger.loan_id == 1,
+            LoanLedger.transaction_date == AS_OF,
+            LoanLedger.transaction_type == "DAILY_ACCRUAL",
+        ),
+        "loan_ledgers",
+        {"ix_loan_ledgers_loan_date_id"},
+    ),
+    # SmartCalculator: payment history of a loan
+    "loan_payments": (
+        lambda: select(Payment.id, Payment.amount)
+        .where(Payment.loan_id == 1)
+        .order_by(Payment.payment_date, Payment.id),
+        "payments",
+        {"ix_payments_loan_date"},
+    ),
+    # DailyAccrualService: payment totals per loan per day
+    "payments_by_day": (
+        lambda: select(Payment.loan_id, Payment.payment_date, func.sum(Payment.amount))
+        .where(
+            Payment.loan_id.in_([1, 2, 3]),
+            Payment.payment_date.between(date(2025, 12, 1), AS_OF),
+        )
+        .group_by(Payment.loan_id, Payment.payment_date),
+        "payments",
+        {"ix_payments_loan_date"},
+    ),
+}
+
+
+def _plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", sorted(HOT_PATHS))
+async def test_hot_path_uses_index(test_db, path):
+    """Test a hot query is planned on its index, not a sequential scan"""
+    if test_db.bind.dialect.name != "postgresql":
+        pytest.skip("Query plans are checked on PostgreSQL only")
+
+    build_query, table, expected_indexes = HOT_PATHS[path]
+    sql = build_query().compile(
+        dialect=test_db.bind.dialect, compile_kwargs={"literal_binds": True}
+    )
+
+    try:
+        await test_db.execute(text("SET LOCAL enable_seqscan = off"))
+        result = await test_db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+        plan = result.scalar()
+    finally:
+        await test_db.rollback()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    nodes = list(_plan_nodes(plan[0]["Plan"]))
+
+    result = await test_db.execute(
+        text("SELECT relid::text FROM pg_partition_tree(CAST(:table AS regclass))"),
+        {"table": table},
+    )
+    relations = {table} | set(result.scalars().all())
+    seq_scans = [
+        node
+        for node in nodes
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in relations
+    ]
+    assert not seq_scans, f"{path} falls back to a sequential scan of {table}"
+
+    result = await test_db.execute(
+        text(
+            "SELECT coalesce(pg_partition_root(CAST(name AS regclass))::text, name) "
+            "FROM unnest(CAST(:names AS text[])) AS name"
+        ),
+        {"names": sorted({node["Index Name"] for node in nodes if "Index Name" in node})},
+    )
+    used_indexes = set(result.scalars().all())
+    assert used_indexes & expected_indexes, (
+        f"{path} uses {sorted(used_indexes)}, expected one of "
+        f"{sorted(expected_indexes)}"
+    )
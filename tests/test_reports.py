@@ -0,0 +1,301 @@
+"""
+Tests for report exports and report jobs
+"""
+import gzip
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+async def _employee_headers(test_db, email, mobile, branch_id):
+    """Auth headers for a new employee of the branch"""
+    from app.core.security import create_access_token
+    from app.models.user import User, UserRole
+
+    employee = User(
+        email=email,
+        mobile=mobile,
+        hashed_password="x",
+        full_name="Report Employee",
+        role=UserRole.EMPLOYEE,
+        branch_id=branch_id,
+        is_active=True,
+    )
+    test_db.add(employee)
+    await test_db.commit()
+
+    token = create_access_token(
+        data={"user_id": employee.id, "email": email, "role": "employee"}
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.asyncio
+async def test_report_job_writes_artifact_and_dedups(
+    test_engine, test_db, test_active_loans, tmp_path, monkeypatch
+):
+    """Test a loans export job writes a gzip artifact reused by equal requests"""
+    from app.core.config import settings
+    from app.services.report_job_service import ReportJobService
+
+    monkeypatch.setattr(settings, "REPORT_ARTIFACT_DIR", str(tmp_path))
+    params = {"branch_id": test_active_loans[0].branch_id}
+
+    job, created = await ReportJobService.submit(test_db, "loans_export", params)
+    assert created
+
+    stream_session = async_sessionmaker(
+        test_engine, class_=AsyncSession, expire_on_commit=False
+    )
+    async with stream_session() as stream_db:
+        await ReportJobService.run(test_db, stream_db, job.id)
+
+    job = await ReportJobService.get_job(test_db, job.id)
+    assert job.status == "completed"
+    assert job.progress == 100
+    assert job.rows_written == len(test_active_loans)
+
+    with gzip.open(job.file_path, "rt") as artifact:
+        lines = artifact.read().splitlines()
+    assert lines[0].startswith("Loan Number,")
+    assert len(lines) == len(test_active_loans) + 1
+
+    reused, created = await ReportJobService.submit(test_db, "loans_export", params)
+    assert not created
+    assert reused.id == job.id
+
+
+@pytest.mark.asyncio
+async def test_monthly_series_matches_single_months(test_db, test_active_loans):
+    """Test the range report returns the same months as single-month reports"""
+    from datetime import date
+    from app.services.report_service import ReportService
+
+    today = date.today()
+    start = date(today.year - 1, today.month, 1)
+    branch_id = test_active_loans[0].branch_id
+
+    series = await ReportService.monthly_series(
+        test_db, start.year, start.month, today.year, today.month, branch_id
+    )
+    assert len(series) == 13
+
+    current = await ReportService.monthly_report(
+        test_db, today.year, today.month, branch_id
+    )
+    for report in (series[-1], current):
+        report["report_period"].pop("generated_at")
+    assert series[-1] == current
+    assert sum(m["loan_statistics"]["loans_created"] for m in series) == len(
+        test_active_loans
+    )
+
+
+@pytest.mark.asyncio
+async def test_abandoned_report_job_is_failed_not_reused(test_db, test_active_loans):
+    """Test a job left running by a crashed worker is failed and replaced"""
+    from datetime import datetime, timedelta
+    from app.core.config import settings
+    from app.services.report_job_service import ReportJobService
+
+    params = {"branch_id": test_active_loans[0].branch_id, "from_date": "2020-01-01"}
+    job, created = await ReportJobService.submit(test_db, "loans_export", params)
+    assert created
+
+    job.status = "running"
+    job.started_at = datetime.utcnow() - timedelta(
+        minutes=settings.REPORT_JOB_STALE_MINUTES + 1
+    )
+    await test_db.commit()
+
+    replacement, created = await ReportJobService.submit(
+        test_db, "loans_export", params
+    )
+    assert created
+    assert replacement.id != job.id
+
+    await test_db.refresh(job)
+    assert job.status == "failed"
+
+
+@pytest.mark.asyncio
+async def test_failed_export_removes_partial_artifact(
+    test_engine, test_db, test_active_loans, tmp_path, monkeypatch
+):
+    """Test an export that fails midway leaves no artifact behind"""
+    from app.core.config import settings
+    from app.services.report_job_service import ReportJobService
+    from app.services.report_export_service import ReportExportService
+
+    monkeypatch.setattr(settings, "REPORT_ARTIFACT_DIR", str(tmp_path))
+
+    async def broken_rows(stream_db, query, *args, **kwargs):
+        raise RuntimeError("stream lost")
+        yield
+
+    monkeypatch.setattr(ReportExportService, "iter_rows", broken_rows)
+    params = {"branch_id": test_active_loans[0].branch_id}
+    job, _ = await ReportJobService.submit(
+        test_db, "loans_export", params, force=True
+    )
+
+    stream_session = async_sessionmaker(
+        test_engine, class_=AsyncSession, expire_on_commit=False
+    )
+    async with stream_session() as stream_db:
+        with pytest.raises(RuntimeError):
+            await ReportJobService.run(test_db, stream_db, job.id)
+
+    job = await ReportJobService.get_job(test_db, job.id)
+    assert job.status == "failed"
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_reused_report_job_is_open_to_branch_employees(
+    client, test_db, test_active_loans, monkeypatch
+):
+    """Test a second employee of the branch can open the job they reused"""
+    from app.api.v1.endpoints import reports
+    from app.models.user import Branch
+
+    class NoBroker:
+        @staticmethod
+        def delay(job_id):
+            pass
+
+    monkeypatch.setattr(reports, "run_report_job", NoBroker)
+
+    branch_id = test_active_loans[0].branch_id
+    other_branch = Branch(name="Other Branch", code="OTH002", address="A", district="D")
+    test_db.add(other_branch)
+    await test_db.commit()
+
+    first = await _employee_headers(test_db, "first@example.com", "5555500001", branch_id)
+    second = await _employee_headers(test_db, "second@example.com", "5555500002", branch_id)
+    outsider = await _employee_headers(
+        test_db, "outsider@example.com", "5555500003", other_branch.id
+    )
+
+    request = {"report_type": "loans_export"}
+    response = await client.post("/api/v1/reports/jobs", json=request, headers=first)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    response = await client.post("/api/v1/reports/jobs", json=request, headers=second)
+    assert response.json()["reused"] is True
+    assert response.json()["job_id"] == job_id
+
+    response = await client.get(f"/api/v1/reports/jobs/{job_id}", headers=second)
+    assert response.status_code == 200
+    assert response.json()["status"] == "pending"
+
+    response = await client.get(f"/api/v1/reports/jobs/{job_id}", headers=outsider)
+    assert response.status_code == 403
+    response = await client.get(
+        f"/api/v1/reports/jobs/{job_id}/download", headers=outsider
+    )
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_loan_csv_export_is_scoped_to_employee_branch(
+    client, test_engine, test_db, test_active_loans, monkeypatch
+):
+    """Test the streamed CSV has the header and only the employee's branch"""
+    import csv
+    import io
+    from datetime import date
+    from app.api.v1.endpoints import reports
+    from app.models.user import Branch
+    from app.models.loan import Loan, LoanType, LoanStatus
+    from app.services.report_export_service import LOAN_EXPORT_HEADER
+
+    stream_session = async_sessionmaker(
+        test_engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+    async def test_sessionmaker():
+        return stream_session
+
+    monkeypatch.setattr(reports, "get_read_sessionmaker", test_sessionmaker)
+
+    other_branch = Branch(
+        name="Other Branch", code="OTH001", address="Test Address", district="D"
+    )
+    test_db.add(other_branch)
+    await test_db.flush()
+    test_db.add(
+        Loan(
+            loan_number="OTH-1",
+            farmer_id=test_active_loans[0].farmer_id,
+            branch_id=other_branch.id,
+            loan_type=LoanType.SAO,
+            principal_amount=50000,
+            interest_rate=7.0,
+            tenure_months=12,
+            sanction_date=date(2025, 1, 1),
+            disbursement_date=date(2025, 1, 1),
+            maturity_date=date(2026, 1, 1),
+            status=LoanStatus.ACTIVE,
+            purpose="Crop cultivation",
+        )
+    )
+    headers = await _employee_headers(
+        test_db,
+        "export.employee@example.com",
+        "5555555555",
+        test_active_loans[0].branch_id,
+    )
+    response = await client.get("/api/v1/reports/loans/export", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == LOAN_EXPORT_HEADER
+    assert sorted(row[0] for row in rows[1:]) == sorted(
+        loan.loan_number for loan in test_active_loans
+    )
+    assert all(row[2] == "Accrual Branch" for row in rows[1:])
+
+
+@pytest.mark.asyncio
+async def test_loan_xlsx_export_splits_sheets(
+    test_db, test_active_loans, tmp_path, monkeypatch
+):
+    """Test the XLSX export opens and continues on a new sheet when one is full"""
+    from openpyxl import load_workbook
+    from app.services.report_export_service import (
+        LOAN_EXPORT_HEADER,
+        ReportExportService,
+    )
+
+    monkeypatch.setattr(ReportExportService, "XLSX_MAX_ROWS", 3)
+    path = tmp_path / "loans.xlsx"
+    query = ReportExportService.loan_export_query(
+        branch_id=test_active_loans[0].branch_id
+    )
+
+    row_count = await ReportExportService.write_xlsx(
+        test_db,
+        query,
+        LOAN_EXPORT_HEADER,
+        ReportExportService.loan_export_values,
+        str(path),
+        sheet_name="Loans",
+    )
+    assert row_count == len(test_active_loans)
+
+    workbook = load_workbook(path, read_only=True)
+    assert workbook.sheetnames == ["Loans", "Loans 2"]
+    sheets = [
+        list(workbook[name].iter_rows(values_only=True))
+        for name in workbook.sheetnames
+    ]
+    assert [len(rows) for rows in sheets] == [3, 2]
+    assert all(list(rows[0]) == LOAN_EXPORT_HEADER for rows in sheets)
+
+    loan_numbers = [row[0] for rows in sheets for row in rows[1:]]
+    assert sorted(loan_numbers) == sorted(loan.loan_number for loan in test_active_loans)
+    assert sheets[0][1][4] == 100000
+    workbook.close()
@@ -0,0 +1,130 @@
+"""
+Tests for the smart calculator service
+"""
+import pytest
+from datetime import date
+from decimal import Decimal
+
+
+@pytest.mark.asyncio
+async def test_calculator_memoizes_loan_and_payments(test_db, test_active_loans):
+    """Test loan and payment rows are fetched once per session"""
+    from app.services.smart_calculator import SmartCalculator
+
+    loan_id = test_active_loans[0].id
+    calculator = SmartCalculator(test_db)
+
+    loan = await calculator._get_loan(loan_id)
+    payments = await calculator._get_payments(loan_id)
+
+    assert await calculator._get_loan(loan_id) is loan
+    assert await calculator._get_payments(loan_id) is payments
+
+
+@pytest.mark.asyncio
+async def test_calculators_share_one_memo_per_session(test_db, test_active_loans):
+    """Test calculators on one session share the memo and its session hooks"""
+    from app.services.smart_calculator import SmartCalculator, _clear_session_memo
+
+    loan_id = test_active_loans[0].id
+    first = SmartCalculator(test_db)
+    loan = await first._get_loan(loan_id)
+
+    for _ in range(3):
+        calculator = SmartCalculator(test_db)
+    assert await calculator._get_loan(loan_id) is loan
+
+    hooks = [
+        listener
+        for listener in test_db.sync_session.dispatch.after_flush
+        if listener is _clear_session_memo
+    ]
+    assert len(hooks) == 1
+
+
+@pytest.mark.asyncio
+async def test_calculator_memo_invalidated_on_write(
+    test_db, test_user, test_active_loans
+):
+    """Test a flushed payment is seen by the next outstanding calculation"""
+    from app.models.payment import Payment, PaymentMode, PaymentType
+    from app.services.smart_calculator import SmartCalculator
+
+    loan_id = test_active_loans[0].id
+    calculator = SmartCalculator(test_db)
+
+    before = await calculator._get_outstanding_principal(loan_id, date(2025, 6, 1))
+
+    test_db.add(
+        Payment(
+            transaction_id="MEMO-TXN-1",
+            loan_id=loan_id,
+            payment_date=date(2025, 3, 1),
+            payment_mode=PaymentMode.CASH,
+            payment_type=PaymentType.PART_PAYMENT,
+            amount=10000,
+            paid_by_user_id=test_user.id,
+        )
+    )
+    await test_db.flush()
+
+    after = await calculator._get_outstanding_principal(loan_id, date(2025, 6, 1))
+    assert before - after == 10000
+
+
+@pytest.mark.asyncio
+async def test_snapshot_served_from_calculation_cache(test_db, test_active_loans):
+    """Test a repeated snapshot is a cache hit and recorded on the entry"""
+    from sqlalchemy import select
+    from app.models.loan_ledger import CalculationCache
+    from app.services.smart_calculator import SmartCalculator
+
+    loan_id = test_active_loans[0].id
+    as_of = date(2025, 6, 1)
+
+    first = await SmartCalculator(test_db).get_loan_snapshot_on_date(loan_id, as_of)
+    await test_db.flush()
+    hits_before = SmartCalculator.get_cache_stats()["SNAPSHOT"]["hits"]
+
+    second = await SmartCalculator(test_db).get_loan_snapshot_on_date(loan_id, as_of)
+    await test_db.flush()
+
+    assert second == first
+    assert SmartCalculator.get_cache_stats()["SNAPSHOT"]["hits"] == hits_before + 1
+
+    entry = await test_db.scalar(
+        select(CalculationCache).where(
+            CalculationCache.loan_id == loan_id,
+            CalculationCache.calculation_type == "SNAPSHOT",
+        )
+    )
+    assert entry.accessed_count == 1
+
+
+@pytest.mark.asyncio
+async def test_scheme_grid_matches_single_comparison(test_db):
+    """Test every grid cell agrees with compare_loan_schemes for that cell"""
+    from app.services.loan_type_config_cache import LoanTypeConfigCache
+    from app.services.smart_calculator import SmartCalculator
+
+    LoanTypeConfigCache.invalidate()
+    calculator = SmartCalculator(test_db)
+    loan_types = ["sao", "long_term_emi"]
+    grid = await calculator.compare_loan_schemes_grid(
+        [Decimal("50000"), Decimal("250000")], [12, 60], loan_types
+    )
+
+    for p, principal in enumerate(grid["principals"]):
+        for t, tenure in enumerate(grid["tenures"]):
+            single = await calculator.compare_loan_schemes(
+                Decimal(str(principal)), tenure, loan_types
+            )
+            by_type = {c["loan_type"]: c for c in single["comparisons"]}
+            for s, scheme in enumerate(grid["schemes"]):
+                expected = by_type[scheme["loan_type"]]
+                assert grid["emi_amount"][s][p][t] == pytest.approx(
+                    expected["emi_amount"], abs=0.005
+                )
+                assert grid["total_interest"][s][p][t] == pytest.approx(
+                    expected["total_interest"], abs=0.01
+                )